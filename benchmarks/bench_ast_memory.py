@@ -0,0 +1,49 @@
+import tracemalloc
+
+from common import generate_program, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--functions', type=int, default=3000, help='functions in the generated source, 16 lines each')
+
+
+def count_nodes(prog):
+    # Works for nodes with or without __dict__, so older trees can be measured too
+    from oxygen.oxyast import OxyAST
+
+    seen = set()
+    pending = [prog]
+    nodes = 0
+    while pending:
+        value = pending.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, OxyAST):
+            nodes += 1
+            pending.extend(vars(value).values() if hasattr(value, '__dict__') else
+                           [child for _, child in value.attributes()])
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+    return nodes
+
+
+def measure(args):
+    from oxygen.lexer import Lexer
+    from oxygen.parser import Parser
+
+    # The token store is built before tracing starts, so only the AST and its child lists are counted
+    parser = Parser(Lexer(generate_program(args.functions), 'program.oxy'))
+    tracemalloc.start()
+    prog = parser.parse()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(prog)
+    print('  {} nodes, {:.1f} MB retained, {:.0f} bytes per node'.format(nodes, retained / 1e6, retained / nodes))
+
+
+if __name__ == '__main__':
+    main('Memory retained by the AST of a generated program, in bytes per node.', measure, add_arguments)
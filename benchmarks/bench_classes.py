@@ -0,0 +1,30 @@
+from common import best_compile_phases, format_phases, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--classes', type=int, default=500)
+    parser.add_argument('--methods', type=int, default=10, help='methods in each class')
+    parser.add_argument('--repeat', type=int, default=3)
+
+
+def class_program(classes, methods):
+    # Each class declares all its methods before any body is built, which used to mean a scan of
+    # every function in the module per method
+    lines = []
+    for k in range(classes):
+        lines += ['object C{}'.format(k), '    x: int']
+        for m in range(methods):
+            lines += ['    fun m{}(a: int) -> int'.format(m), '        return a + {}'.format(k * methods + m)]
+        lines.append('')
+    lines.append('print(1)')
+    return '\n'.join(lines) + '\n'
+
+
+def measure(args):
+    source = class_program(args.classes, args.methods)
+    print('  {} classes, {} methods: {}'.format(args.classes, args.classes * args.methods,
+                                                format_phases(best_compile_phases(source, args.repeat))))
+
+
+if __name__ == '__main__':
+    main('Compile time of a program with many classes and methods.', measure, add_arguments)
@@ -0,0 +1,15 @@
+from common import best_compile_phases, format_phases, generate_program, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--functions', type=int, default=1000, help='functions in the generated source, 16 lines each')
+    parser.add_argument('--repeat', type=int, default=3)
+
+
+def measure(args):
+    source = generate_program(args.functions)
+    print('  {} lines: {}'.format(source.count('\n'), format_phases(best_compile_phases(source, args.repeat))))
+
+
+if __name__ == '__main__':
+    main('Time spent in each compiler phase on a generated program.', measure, add_arguments)
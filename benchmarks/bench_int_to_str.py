@@ -0,0 +1,25 @@
+from common import execution_time, format_seconds, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--count', type=int, default=1000000, help='conversions per program')
+    parser.add_argument('--repeat', type=int, default=5)
+
+
+def measure(args):
+    programs = (
+        ('print(n as str), 19 digits', 'for i in 0..{}\n    n = i * 7919 + 1000000000000000000\n    print(n as str)\n'),
+        ('compare n as str', 'count = 0\nfor i in 0..{}\n    s = (i * 7919 - 4611686018427387904) as str\n'
+                             '    if s < "-3"\n        count += 1\nprint(count)\n'),
+        ('build "a,b" strings', 'count = 0\nfor i in 0..{}\n    line = (i as str) + "," + ((i * 31) as str)\n'
+                                '    if line > "5"\n        count += 1\nprint(count)\n'),
+        ('i128 as str, 30 digits', 'big = 1000000000000000000000000000000 as i128\nfor i in 0..{}\n'
+                                   '    n = big + (i as i128)\n    print(n as str)\n'),
+    )
+    for name, source in programs:
+        seconds = execution_time(args.src, source.format(args.count), args.repeat)
+        print('  {:<28} {}'.format(name, format_seconds(seconds)))
+
+
+if __name__ == '__main__':
+    main('Execution time of programs that convert many integers to strings.', measure, add_arguments)
@@ -0,0 +1,25 @@
+from common import best_of, generate_program, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--functions', type=int, default=3000, help='functions in the generated source, 16 lines each')
+    parser.add_argument('--repeat', type=int, default=5)
+
+
+def measure(args):
+    from oxygen.lexer import Lexer
+
+    source = generate_program(args.functions)
+
+    # analyse_tokens yields the whole token stream in this lexer and in the char-at-a-time one it replaced
+    def lex():
+        return sum(1 for _ in Lexer(source, 'program.oxy').analyse_tokens())
+
+    tokens = lex()
+    seconds = best_of(args.repeat, lex)
+    print('  {} lines, {} tokens: {:.3f}s, {:.0f}k tokens/s'.format(
+        source.count('\n'), tokens, seconds, tokens / seconds / 1000))
+
+
+if __name__ == '__main__':
+    main('Lexing throughput on a generated source, in tokens per second.', measure, add_arguments)
@@ -0,0 +1,49 @@
+import time
+
+from common import generate_program, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--functions', type=int, default=3000, help='functions in the generated source, 16 lines each')
+    parser.add_argument('--terms', type=int, default=1500, help='terms in the parenthesized expression')
+
+
+def count_lexing(source):
+    # Parses source and returns (tokens, lexer invocations, seconds). An invocation is a
+    # get_next_token call that scans the source rather than handing back a queued token.
+    from oxygen.lexer import Lexer
+    from oxygen.parser import Parser
+
+    tokens = sum(1 for _ in Lexer(source, 'program.oxy').analyse_tokens())
+    invocations = 0
+    get_next_token = Lexer.get_next_token
+
+    def counted(self):
+        nonlocal invocations
+        if not getattr(self, 'pending', None):
+            invocations += 1
+        return get_next_token(self)
+
+    Lexer.get_next_token = counted
+    try:
+        start = time.perf_counter()
+        Parser(Lexer(source, 'program.oxy')).parse()
+        seconds = time.perf_counter() - start
+    finally:
+        Lexer.get_next_token = get_next_token
+    return tokens, invocations, seconds
+
+
+def measure(args):
+    sources = (
+        ('generated program', generate_program(args.functions)),
+        ('parenthesized expression', 'x = (' + ' + '.join(str(k) for k in range(args.terms)) + ')\nprint(x)\n'),
+    )
+    for name, source in sources:
+        tokens, invocations, seconds = count_lexing(source)
+        print('  {}: {} tokens, {} lexer invocations, {:.2f} per token, parsed in {:.3f}s'.format(
+            name, tokens, invocations, invocations / tokens, seconds))
+
+
+if __name__ == '__main__':
+    main('Lexer invocations per token while parsing.', measure, add_arguments)
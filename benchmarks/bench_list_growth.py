@@ -0,0 +1,27 @@
+from common import end_to_end, execution_time, format_end_to_end, format_seconds, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--repeat', type=int, default=5)
+
+
+PROGRAMS = (
+    ('200 x 100k i8 appends', 'x = 0 as i8\ntotal = 0\nfor r in 0..200\n    a = [x]\n    for i in 0..100000\n'
+                              '        a.append(x)\n    total += a[r] as int\nprint(total)\n'),
+    ('2M 20-element literals', 'total = 0\nfor r in 0..2000000\n'
+                               '    a = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, r]\n'
+                               '    total += a[19]\nprint(total)\n'),
+    ('1M int appends', 'a: list<int>\nfor i in 0..1000000\n    a.append(i)\nprint(a[999999])\n'),
+    ('1M int appends, reserved', 'a: list<int>\na.reserve(1000000)\nfor i in 0..1000000\n    a.append(i)\n'
+                                 'print(a[999999])\n'),
+)
+
+
+def measure(args):
+    for name, source in PROGRAMS:
+        print('  {:<26} run {}, {}'.format(name, format_seconds(execution_time(args.src, source, args.repeat)),
+                                           format_end_to_end(end_to_end(args.src, source, 1))))
+
+
+if __name__ == '__main__':
+    main('Execution time of programs that build and grow lists.', measure, add_arguments)
@@ -0,0 +1,43 @@
+from common import execution_time, format_seconds, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--size', type=int, default=1000000, help='elements in the scanned and sorted lists')
+    parser.add_argument('--repeat', type=int, default=5)
+
+
+# {size} elements, filled with i or with a linear congruential sequence
+COUNTING = 'a = [0]\nfor i in 1..{size}\n    a.append(i)\n'
+RANDOM = 'seed = 12345\na = [{zero}]\nfor i in 1..{size}\n    seed = (seed * 1103515245 + 12345) % 2147483648\n' \
+         '    a.append(seed{cast})\n'
+
+# Method calls sit inside an `if` so nothing after them in the loop body is lost
+PROGRAMS = (
+    ('count, 200 scans', COUNTING + 'for r in 0..200\n    if r >= 0\n        c: int = a.count({size} - 1 - r)\n'
+                                    '        print(c)\n'),
+    ('  hand loop', COUNTING + 'for r in 0..200\n    c = 0\n    for k in 0..{size}\n        if a[k] == {size} - 1 - r\n'
+                               '            c += 1\n    print(c)\n'),
+    ('index, 200 scans', COUNTING + 'for r in 0..200\n    if r >= 0\n        c: int = a.index({size} - 1 - r)\n'
+                                    '        print(c)\n'),
+    ('  hand loop', COUNTING + 'for r in 0..200\n    k = 0\n    while a[k] != {size} - 1 - r\n        k += 1\n'
+                               '    print(k)\n'),
+    ('extend, 20k x 1001', 'b = [0]\nfor i in 0..1000\n    b.append(i)\nfor r in 0..20000\n    a = [1]\n'
+                           '    a.extend(b)\nprint(a[1000])\n'),
+    ('  append loop', 'b = [0]\nfor i in 0..1000\n    b.append(i)\nfor r in 0..20000\n    a = [1]\n'
+                      '    for k in 0..1001\n        a.append(b[k])\nprint(a[1000])\n'),
+    ('fill only, ints', RANDOM + 'print(a[{size} - 1])\n'),
+    ('sort ints', RANDOM + 'a.sort()\nprint(a[{size} - 1])\n'),
+    ('fill only, floats', RANDOM + 'print(a[{size} - 1])\n'),
+    ('sort floats', RANDOM + 'a.sort()\nprint(a[{size} - 1])\n'),
+)
+
+
+def measure(args):
+    for name, source in PROGRAMS:
+        floats = 'floats' in name
+        source = source.format(size=args.size, zero='0.0' if floats else '0', cast=' as float' if floats else '')
+        print('  {:<20} {}'.format(name, format_seconds(execution_time(args.src, source, args.repeat))))
+
+
+if __name__ == '__main__':
+    main('Execution time of the native list methods next to the loops they replace.', measure, add_arguments)
@@ -0,0 +1,28 @@
+from common import end_to_end, execution_time, format_end_to_end, format_seconds, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--elements', type=int, default=10000, help='elements in the large table literal')
+    parser.add_argument('--repeat', type=int, default=3)
+
+
+def measure(args):
+    table = '[' + ', '.join(str(k * 7 % 1000) for k in range(args.elements)) + ']'
+    sources = (
+        ('{}-element table'.format(args.elements),
+         't = {}\ntotal = 0\nfor x in t\n    total += x\nprint(total)\n'.format(table)),
+        ('1M 16-element lists',
+         'total = 0\nfor r in 0..1000000\n    a = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16]\n'
+         '    total += a[r % 16]\nprint(total)\n'),
+        ('1M 16-element tuples',
+         'total = 0\nfor r in 0..1000000\n    a = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16)\n'
+         '    total += a[r % 16]\nprint(total)\n'),
+    )
+    for name, source in sources:
+        print('  {:<22} run {}, {}'.format(name, format_seconds(execution_time(args.src, source, args.repeat)),
+                                           format_end_to_end(end_to_end(args.src, source, args.repeat))))
+
+
+if __name__ == '__main__':
+    main('Compile and execution time of programs built around constant list and tuple literals.', measure,
+         add_arguments)
@@ -0,0 +1,29 @@
+from common import best_compile_phases, format_phases, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--functions', type=int, default=3000, help='functions in the generated source')
+    parser.add_argument('--statements', type=int, default=5000, help='arithmetic statements after the functions')
+    parser.add_argument('--repeat', type=int, default=3)
+
+
+def operator_program(functions, statements):
+    # Operators used to look for an overload by scanning every function in the module
+    lines = []
+    for k in range(functions):
+        lines += ['fun f{}(a: int, b: int) -> int'.format(k), '    c = a * {} + b'.format(k), '    d = c % 7 - a',
+                  '    return d * 2 + c', '']
+    lines.append('a = 1')
+    lines += ['a = a * 3 + {}'.format(k) for k in range(statements)]
+    lines.append('print(a)')
+    return '\n'.join(lines) + '\n'
+
+
+def measure(args):
+    source = operator_program(args.functions, args.statements)
+    print('  {} functions, {} statements: {}'.format(args.functions, args.statements,
+                                                     format_phases(best_compile_phases(source, args.repeat))))
+
+
+if __name__ == '__main__':
+    main('Compile time of operators in a module with many functions.', measure, add_arguments)
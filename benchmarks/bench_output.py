@@ -0,0 +1,23 @@
+from common import execution_time, format_seconds, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--lines', type=int, default=2000000, help='lines printed by each program')
+    parser.add_argument('--repeat', type=int, default=5)
+
+
+def measure(args):
+    programs = (
+        ('print(i)', 'for i in 0..{}\n    print(i)\n'),
+        ('print(s), 43 bytes', 's = "the quick brown fox jumps over a lazy dog"\nfor i in 0..{}\n    print(s)\n'),
+        ('print(x), float', 'x = 0.5\nfor i in 0..{}\n    x = x + 1.25\n    print(x)\n'),
+        ('print(b), bool', 'for i in 0..{}\n    b = i % 3 == 0\n    print(b)\n'),
+    )
+    for name, source in programs:
+        seconds = execution_time(args.src, source.format(args.lines), args.repeat)
+        rate = '' if seconds is None else ', {:.1f}M lines/s'.format(args.lines / seconds / 1e6)
+        print('  {:<20} {}{}'.format(name, format_seconds(seconds), rate))
+
+
+if __name__ == '__main__':
+    main('Output throughput of print loops, with stdout sent to a file.', measure, add_arguments)
@@ -0,0 +1,27 @@
+from common import end_to_end, execution_time, format_end_to_end, format_seconds, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--iterations', type=int, default=20000000, help='iterations of each power loop')
+    parser.add_argument('--exponent', type=int, default=100000, help='constant exponent of the compile-time program')
+    parser.add_argument('--repeat', type=int, default=5)
+
+
+def measure(args):
+    programs = (
+        ('(i % 7) ^ 20', 'total = 0\nfor i in 0..{}\n    total += (i % 7) ^ 20\nprint(total)\n'),
+        ('3 ^ (i % 40)', 'total = 0\nfor i in 0..{}\n    e = i % 40\n    total += 3 ^ e\nprint(total)\n'),
+        ('float x ^ 7', 'total = 0.0\nx = 1.0\nfor i in 0..{}\n    x = x + 0.000001\n    total += x ^ 7\n'
+                        'print(total)\n'),
+    )
+    for name, source in programs:
+        seconds = execution_time(args.src, source.format(args.iterations), args.repeat)
+        print('  {:<22} run {}'.format(name, format_seconds(seconds)))
+
+    source = 'y = 1\nz = y ^ {}\nprint(z)\n'.format(args.exponent)
+    print('  {:<22} {}'.format('y ^ {}'.format(args.exponent), format_end_to_end(end_to_end(args.src, source, 1))))
+
+
+if __name__ == '__main__':
+    main('Execution time of integer and float power loops, and the cost of compiling a large constant exponent.',
+         measure, add_arguments)
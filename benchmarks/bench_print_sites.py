@@ -0,0 +1,23 @@
+from common import best_compile_phases, compiled_ir, format_phases, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--prints', type=int, default=3000, help='print statements in the generated program')
+    parser.add_argument('--repeat', type=int, default=3)
+
+
+def measure(args):
+    source = 'x = 1\n' + ''.join('print(x + {0})\nprint("line")\n'.format(k) for k in range(args.prints))
+    ir_text = compiled_ir(source)
+    if ir_text is None:
+        print('  failed to compile')
+        return
+    lines = ir_text.splitlines()
+    print('  {} print sites: {} IR lines, {} allocas, {} globals'.format(
+        2 * args.prints, len(lines), sum(' = alloca ' in line for line in lines),
+        sum(line.startswith('@') for line in lines)))
+    print('  {}'.format(format_phases(best_compile_phases(source, args.repeat))))
+
+
+if __name__ == '__main__':
+    main('IR size and compile time of a print-heavy program.', measure, add_arguments)
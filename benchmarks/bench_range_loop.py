@@ -0,0 +1,19 @@
+from common import execution_time, format_seconds, main
+
+
+def add_arguments(parser):
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000000, 10000000, 100000000],
+                        help='iteration counts to time')
+    parser.add_argument('--repeat', type=int, default=5)
+
+
+def measure(args):
+    for size in args.sizes:
+        source = 'total = 0\nfor i in 0..{}\n    total = total * 31 + i\nprint(total)\n'.format(size)
+        seconds = execution_time(args.src, source, args.repeat)
+        rate = '' if seconds is None else ', {:.0f}M iterations/s'.format(size / seconds / 1e6)
+        print('  for i in 0..{}: {}{}'.format(size, format_seconds(seconds), rate))
+
+
+if __name__ == '__main__':
+    main('Execution time of a counted loop over a range.', measure, add_arguments)
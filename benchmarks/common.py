@@ -0,0 +1,213 @@
+import argparse
+import io
+import os
+import pickle
+import re
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+EXECUTED = re.compile(r'Executed in ([0-9.]+) sec')
+
+
+def export_src(rev: str, directory: str) -> str:
+    # The compiler as it was at a git revision, so a benchmark can measure the code it replaced
+    archive = subprocess.run(['git', 'archive', rev, 'src'], cwd=ROOT, stdout=subprocess.PIPE, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return os.path.join(directory, 'src')
+
+
+def main(description: str, measure: Callable[[argparse.Namespace], None],
+         add_arguments: Optional[Callable[[argparse.ArgumentParser], None]] = None) -> None:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--against', metavar='REV', action='append', default=[],
+                        help='also measure the compiler as of this git revision')
+    parser.add_argument('--src', help=argparse.SUPPRESS)
+    if add_arguments is not None:
+        add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.src is not None:
+        sys.path.insert(0, args.src)
+        sys.setrecursionlimit(100000)
+        measure(args)
+        return
+
+    # Every tree is measured in its own interpreter, so their oxygen packages never mix
+    with tempfile.TemporaryDirectory() as directory:
+        trees = [('working tree', SRC)]
+        for index, rev in enumerate(args.against):
+            trees.append((rev, export_src(rev, os.path.join(directory, str(index)))))
+        for label, src in trees:
+            print('{}:'.format(label), flush=True)
+            subprocess.run([sys.executable, os.path.abspath(sys.argv[0])] + sys.argv[1:] + ['--src', src])
+
+
+def best_of(repeat: int, function: Callable[[], Any]) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def in_child(function: Callable[..., Any], *args: Any) -> Any:
+    # Runs function in a forked copy of this process and returns its result, or None if it failed.
+    # The compiler keeps module-level state, so every compile has to start from fresh modules.
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        try:
+            result = function(*args)
+        except BaseException:
+            result = None
+        with os.fdopen(write_fd, 'wb') as pipe:
+            pickle.dump(result, pipe)
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as pipe:
+        data = pipe.read()
+    os.waitpid(pid, 0)
+    return pickle.loads(data) if data else None
+
+
+def compile_phases(source: str) -> Optional[Dict[str, float]]:
+    # Seconds spent parsing, type checking and generating IR for one compile of source
+    def phases() -> Dict[str, float]:
+        from oxygen.lexer import Lexer
+        from oxygen.parser import Parser
+        from oxygen.type_checker import Preprocessor
+        from oxygen.compiler.code_generator import OxyCodeGenerator
+
+        start = time.perf_counter()
+        prog = Parser(Lexer(source, 'program.oxy')).parse()
+        parsed = time.perf_counter()
+        Preprocessor('program.oxy').check(prog)
+        checked = time.perf_counter()
+        OxyCodeGenerator('program.oxy').generate_code(prog)
+        generated = time.perf_counter()
+        return {'parse': parsed - start, 'check': checked - parsed, 'codegen': generated - checked}
+
+    return in_child(phases)
+
+
+def compiled_ir(source: str) -> Optional[str]:
+    # Unoptimized LLVM IR of source, as `oxygenc run -d` would see it before the pass manager
+    def module() -> str:
+        import oxygenc
+
+        with tempfile.TemporaryDirectory() as directory:
+            oxy_file = os.path.join(directory, 'program.oxy')
+            with open(oxy_file, 'w') as out:
+                out.write(source)
+            return str(oxygenc.process_file(oxy_file).module)
+
+    return in_child(module)
+
+
+def best_compile_phases(source: str, repeat: int) -> Optional[Dict[str, float]]:
+    best = None
+    for _ in range(repeat):
+        phases = compile_phases(source)
+        if phases is None:
+            return None
+        if best is None or sum(phases.values()) < sum(best.values()):
+            best = phases
+    return best
+
+
+def format_phases(phases: Optional[Dict[str, float]]) -> str:
+    if phases is None:
+        return 'failed to compile'
+    return '  '.join('{} {:.3f}s'.format(name, seconds) for name, seconds in phases.items()) + \
+        '  total {:.3f}s'.format(sum(phases.values()))
+
+
+def execution_time(src: str, source: str, repeat: int) -> Optional[float]:
+    # Best `oxygenc run -t` time of source: the JIT-compiled program alone, with its output sent to a file
+    with tempfile.TemporaryDirectory() as directory:
+        oxy_file = os.path.join(directory, 'program.oxy')
+        with open(oxy_file, 'w') as out:
+            out.write(source)
+
+        best = None
+        for _ in range(repeat):
+            with open(os.path.join(directory, 'stdout'), 'w+b') as out:
+                result = subprocess.run([sys.executable, 'oxygenc.py', 'run', '-t', oxy_file], cwd=src, stdout=out,
+                                        stderr=subprocess.DEVNULL)
+                out.seek(max(0, out.tell() - 200))
+                executed = EXECUTED.findall(out.read().decode(errors='replace'))
+            if result.returncode != 0 or not executed:
+                return None
+            best = float(executed[-1]) if best is None else min(best, float(executed[-1]))
+        return best
+
+
+def end_to_end(src: str, source: str, repeat: int) -> Optional[Tuple[float, float]]:
+    # Best wall time of a whole `oxygenc run` of source, compiler and JIT included, and its peak resident set in MB
+    with tempfile.TemporaryDirectory() as directory:
+        oxy_file = os.path.join(directory, 'program.oxy')
+        with open(oxy_file, 'w') as out:
+            out.write(source)
+
+        best_seconds, peak = float('inf'), 0.0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            process = subprocess.Popen([sys.executable, 'oxygenc.py', 'run', oxy_file], cwd=src,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            if process.returncode != 0:
+                return None
+            best_seconds = min(best_seconds, time.perf_counter() - start)
+            peak = max(peak, usage.ru_maxrss / 1024)
+        return best_seconds, peak
+
+
+def format_end_to_end(stats: Optional[Tuple[float, float]]) -> str:
+    return 'failed' if stats is None else '{:.2f}s / {:.0f}MB end to end'.format(*stats)
+
+
+def format_seconds(seconds: Optional[float]) -> str:
+    return 'failed' if seconds is None else '{:.3f}s'.format(seconds)
+
+
+def generate_program(functions: int) -> str:
+    # A program in the style of the samples: each function mixes arithmetic, branches,
+    # loops, a list literal, strings, floats and comments
+    lines = []
+    for k in range(functions):
+        lines += [
+            '# step {}'.format(k),
+            'fun f{}(a: int, b: int) -> int'.format(k),
+            '    total = a * {} + b'.format(k % 97),
+            '    values = [a, b, {}]'.format(k),
+            '    for value in values',
+            '        total += value',
+            '    while total > 1000',
+            '        total = total - 1000',
+            '    scale = 1.5 * {}.25'.format(k % 13),
+            '    if total % 2 == 0 and scale > 2.0',
+            '        label = "even {}"'.format(k),
+            '        print(label)',
+            '    else',
+            '        total -= 1',
+            '    return total',
+            '',
+        ]
+    lines.append('checksum = 0')
+    lines += ['checksum += f{0}({0}, 3)'.format(k) for k in range(functions)]
+    lines.append('print(checksum)')
+    return '\n'.join(lines) + '\n'
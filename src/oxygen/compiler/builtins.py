@@ -2,13 +2,27 @@ from llvmlite import ir
 
 from oxygen.compiler.base import type_map
 from oxygen.grammar import *
+from oxygen.oxyast import OxyNum, OxyType
 
 ARRAY_INITIAL_CAPACITY = ir.Constant(type_map[INT], 16)
+# A full dynamic array grows to capacity * ARRAY_GROWTH_FACTOR elements
+ARRAY_GROWTH_FACTOR = ir.Constant(type_map[INT], 2)
+# Elements compared per step when index scans for a value; the block compiles to vector compares
+INDEX_BLOCK_SIZE = 16
+# Ranges no longer than this are insertion sorted
+INSERTION_SORT_THRESHOLD = 16
+# Integer arrays longer than this are radix sorted instead of introsorted
+RADIX_SORT_THRESHOLD = 64
+STDOUT_BUFFER_SIZE = 1 << 16
+# Room snprintf gets in the stdout buffer when formatting a double
+DOUBLE_FORMAT_SIZE = 32
+# Decimal digits of the largest u128 plus a sign
+INT_TO_STR_SIZE = 40
+DIGIT_PAIRS = ''.join('{:02}'.format(pair) for pair in range(100)).encode('ascii')
 
 zero = ir.Constant(type_map[INT], 0)
 one = ir.Constant(type_map[INT], 1)
 two = ir.Constant(type_map[INT], 2)
-eight = ir.Constant(type_map[INT], 8)
 ten = ir.Constant(type_map[INT], 10)
 zero_32 = ir.Constant(type_map[INT32], 0)
 one_32 = ir.Constant(type_map[INT32], 1)
@@ -16,34 +30,103 @@ two_32 = ir.Constant(type_map[INT32], 2)
 
 array_types = [type_map[INT]]
 
+# Array methods that can never make an existing index go out of range
+NON_SHRINKING_METHODS = ('append', 'get', 'set', 'length', 'reserve', 'shrink_to_fit', 'extend', 'insert',
+                         'index', 'count', 'sort', 'reverse')
+
 
 def define_builtins(self):
-    str_struct = self.module.context.get_identified_type('i64.array')
-    str_struct.name = 'i64.array'
-    str_struct.type = OBJECT
-    str_struct.set_body(type_map[INT], type_map[INT], type_map[INT].as_pointer())
+    define_stdout(self)
+
+    int_array = self.module.context.get_identified_type('i64.array')
+    int_array.name = 'i64.array'
+    int_array.type = OBJECT
+    int_array.set_body(type_map[INT], type_map[INT], type_map[INT].as_pointer())
+    self.define('i64.array', int_array)
+    int_array_ptr = int_array.as_pointer()
+    lint = type_map[INT]
 
+    define_dynamic_array_methods(self, int_array_ptr, lint)
+
+    define_create_range(self, int_array_ptr, lint)
+
+    # Strings are UTF-8 bytes behind a heap allocated header laid out like a dynamic array
+    str_struct = self.module.context.get_identified_type('str')
+    str_struct.name = 'str'
+    str_struct.type = OBJECT
+    str_struct.set_body(type_map[INT], type_map[INT], type_map[INT8].as_pointer())
     self.define('str', str_struct)
-    self.define('i64.array', str_struct)
     str_struct_ptr = str_struct.as_pointer()
     self.define('str_ptr', str_struct_ptr)
-    type_map[STR] = str_struct
-    lint = type_map[INT]
-
-    dynamic_array_init(self, str_struct_ptr, lint)
-    dynamic_array_double_if_full(self, str_struct_ptr, lint)
-    dynamic_array_append(self, str_struct_ptr, lint)
-    dynamic_array_get(self, str_struct_ptr, lint)
-    dynamic_array_set(self, str_struct_ptr, lint)
-    dynamic_array_length(self, str_struct_ptr, lint)
+    type_map[STR] = str_struct_ptr
 
-    define_create_range(self, str_struct_ptr, lint)
+    define_str_new(self, str_struct_ptr)
+    define_str_length(self, str_struct_ptr)
+    define_str_push(self, str_struct_ptr)
+    define_str_append(self, str_struct_ptr)
+    define_str_concat(self, str_struct_ptr)
+    define_str_compare(self, str_struct_ptr)
+    define_str_hash(self, str_struct_ptr)
 
     define_int_to_str(self, str_struct_ptr)
     define_bool_to_str(self, str_struct_ptr)
     define_print(self, str_struct_ptr)
 
 
+def size_of(builder, typ):
+    null = ir.Constant(typ.as_pointer(), None)
+    return builder.ptrtoint(builder.gep(null, [one_32]), type_map[INT])
+
+
+def memcpy(self, builder, dest, src, length):
+    llvm_memcpy = self.module.declare_intrinsic('llvm.memcpy', [dest.type, src.type, type_map[INT]])
+    builder.call(llvm_memcpy, [dest, src, length, ir.Constant(type_map[BOOL], 0)])
+
+
+def memmove(self, builder, dest, src, length):
+    llvm_memmove = self.module.declare_intrinsic('llvm.memmove', [dest.type, src.type, type_map[INT]])
+    builder.call(llvm_memmove, [dest, src, length, ir.Constant(type_map[BOOL], 0)])
+
+
+def comparable(array_type):
+    return isinstance(array_type, (ir.IntType, ir.FloatType, ir.DoubleType)) or array_type == type_map.get(STR)
+
+
+def elements_equal(self, builder, array_type, left, right):
+    if isinstance(array_type, ir.IntType):
+        return builder.icmp_unsigned(EQUALS, left, right)
+    elif isinstance(array_type, (ir.FloatType, ir.DoubleType)):
+        return builder.fcmp_ordered(EQUALS, left, right)
+    compare = builder.call(self.module.get_global('str.compare'), [left, right])
+    return builder.icmp_signed(EQUALS, compare, zero)
+
+
+def elements_less(self, builder, array_type, left, right):
+    if isinstance(array_type, ir.IntType):
+        if array_type.signed and array_type.width > 1:
+            return builder.icmp_signed(LESS_THAN, left, right)
+        return builder.icmp_unsigned(LESS_THAN, left, right)
+    elif isinstance(array_type, (ir.FloatType, ir.DoubleType)):
+        return builder.fcmp_ordered(LESS_THAN, left, right)
+    compare = builder.call(self.module.get_global('str.compare'), [left, right])
+    return builder.icmp_signed(LESS_THAN, compare, zero)
+
+
+def array_field(builder, array, field):
+    return builder.gep(array, [zero_32, ir.Constant(type_map[INT32], field)], inbounds=True)
+
+
+def array_elements(builder, array):
+    # Pointer to element 0, which is stored in slot 1 of data
+    return builder.gep(builder.load(array_field(builder, array, 2)), [one], inbounds=True)
+
+
+def swap_elements(builder, left, right):
+    left_value = builder.load(left)
+    builder.store(builder.load(right), left)
+    builder.store(left_value, right)
+
+
 def create_dynamic_array_methods(self, array_type):
     if array_type in array_types:
         return
@@ -52,18 +135,35 @@ def create_dynamic_array_methods(self, array_type):
 
     current_block = self.builder.block
 
-    dynamic_array_init(self, array_ptr, array_type)
-    dynamic_array_double_if_full(self, array_ptr, array_type)
-    dynamic_array_append(self, array_ptr, array_type)
-    dynamic_array_get(self, array_ptr, array_type)
-    dynamic_array_set(self, array_ptr, array_type)
-    dynamic_array_length(self, array_ptr, array_type)
+    define_dynamic_array_methods(self, array_ptr, array_type)
 
     array_types.append(array_type)
 
     self.position_at_end(current_block)
 
 
+def define_dynamic_array_methods(self, dyn_array_ptr, array_type):
+    dynamic_array_resize(self, dyn_array_ptr, array_type)
+    dynamic_array_init(self, dyn_array_ptr, array_type)
+    dynamic_array_grow_if_full(self, dyn_array_ptr, array_type)
+    dynamic_array_reserve(self, dyn_array_ptr, array_type)
+    dynamic_array_shrink_to_fit(self, dyn_array_ptr, array_type)
+    dynamic_array_append(self, dyn_array_ptr, array_type)
+    dynamic_array_get(self, dyn_array_ptr, array_type)
+    dynamic_array_set(self, dyn_array_ptr, array_type)
+    dynamic_array_length(self, dyn_array_ptr, array_type)
+    dynamic_array_extend(self, dyn_array_ptr, array_type)
+    dynamic_array_insert(self, dyn_array_ptr, array_type)
+    dynamic_array_pop(self, dyn_array_ptr, array_type)
+    dynamic_array_clear(self, dyn_array_ptr, array_type)
+    dynamic_array_reverse(self, dyn_array_ptr, array_type)
+    if comparable(array_type):
+        dynamic_array_index(self, dyn_array_ptr, array_type)
+        dynamic_array_count(self, dyn_array_ptr, array_type)
+        dynamic_array_remove(self, dyn_array_ptr, array_type)
+        dynamic_array_sort(self, dyn_array_ptr, array_type)
+
+
 def define_create_range(self, dyn_array_ptr, array_type):
     create_range_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, type_map[INT], type_map[INT]])
     create_range = ir.Function(self.module, create_range_type, '@create_range')
@@ -84,6 +184,9 @@ def define_create_range(self, dyn_array_ptr, array_type):
 
     num_ptr = builder.alloca(type_map[INT])
     builder.store(builder.load(start_ptr), num_ptr)
+    span = builder.sub(builder.load(stop_ptr), builder.load(start_ptr))
+    span = builder.select(builder.icmp_signed(LESS_THAN, span, zero), zero, span)
+    builder.call(self.module.get_global('{}.array.reserve'.format(str(array_type))), [builder.load(array_ptr), span])
     builder.branch(create_range_test)
 
     builder.position_at_end(create_range_test)
@@ -100,82 +203,130 @@ def define_create_range(self, dyn_array_ptr, array_type):
     builder.ret_void()
 
 
+def dynamic_array_resize(self, dyn_array_ptr, array_type):
+    # Element i lives in slot i + 1 of data, so room for capacity elements takes one extra slot
+    # START
+    dyn_array_resize_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, type_map[INT]])
+    dyn_array_resize = ir.Function(self.module, dyn_array_resize_type, '{}.array.resize'.format(str(array_type)))
+    dyn_array_resize.args[0].name = 'self'
+    dyn_array_resize_entry = dyn_array_resize.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_resize_entry)
+    self.builder = builder
+    array, capacity = dyn_array_resize.args
+
+    # BODY
+    capacity_ptr = builder.gep(array, [zero_32, one_32], inbounds=True)
+    builder.store(capacity, capacity_ptr)
+
+    data_ptr = builder.gep(array, [zero_32, two_32], inbounds=True)
+    data = builder.bitcast(builder.load(data_ptr), type_map[INT8].as_pointer())
+    bytes_needed = builder.mul(builder.add(capacity, one), size_of(builder, array_type))
+    re_alloc = builder.call(self.module.get_global('realloc'), [data, bytes_needed])
+    builder.store(builder.bitcast(re_alloc, array_type.as_pointer()), data_ptr)
+
+    # CLOSE
+    builder.ret_void()
+
+
 def dynamic_array_init(self, dyn_array_ptr, array_type):
     # START
-    dyn_array_init_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr])
+    dyn_array_init_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, type_map[INT]])
     dyn_array_init = ir.Function(self.module, dyn_array_init_type, '{}.array.init'.format(str(array_type)))
     dyn_array_init.args[0].name = 'self'
     dyn_array_init_entry = dyn_array_init.append_basic_block('entry')
     builder = ir.IRBuilder(dyn_array_init_entry)
     self.builder = builder
-    dyn_array_init_exit = dyn_array_init.append_basic_block('exit')
-    builder.position_at_end(dyn_array_init_entry)
-    array_ptr = builder.alloca(dyn_array_ptr)
-    builder.store(dyn_array_init.args[0], array_ptr)
+    array, capacity = dyn_array_init.args
 
     # BODY
-    size_ptr = builder.gep(builder.load(array_ptr), [zero_32, zero_32], inbounds=True)
+    size_ptr = builder.gep(array, [zero_32, zero_32], inbounds=True)
     builder.store(zero, size_ptr)
 
-    capacity_ptr = builder.gep(builder.load(array_ptr), [zero_32, one_32], inbounds=True)
-    builder.store(ARRAY_INITIAL_CAPACITY, capacity_ptr)
-
-    data_ptr = builder.gep(builder.load(array_ptr), [zero_32, two_32], inbounds=True)
-    size_of = builder.mul(builder.load(capacity_ptr), eight)
-    mem_alloc = builder.call(self.module.get_global('malloc'), [size_of])
-    mem_alloc = builder.bitcast(mem_alloc, array_type.as_pointer())
-    builder.store(mem_alloc, data_ptr)
-
-    builder.branch(dyn_array_init_exit)
+    data_ptr = builder.gep(array, [zero_32, two_32], inbounds=True)
+    builder.store(ir.Constant(array_type.as_pointer(), None), data_ptr)
+    builder.call(self.module.get_global('{}.array.resize'.format(str(array_type))), [array, capacity])
 
     # CLOSE
-    builder.position_at_end(dyn_array_init_exit)
     builder.ret_void()
 
 
-def dynamic_array_double_if_full(self, dyn_array_ptr, array_type):
+def dynamic_array_grow_if_full(self, dyn_array_ptr, array_type):
     # START
-    dyn_array_double_capacity_if_full_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr])
-    dyn_array_double_capacity_if_full = ir.Function(self.module, dyn_array_double_capacity_if_full_type, '{}.array.double_capacity_if_full'.format(str(array_type)))
-    dyn_array_double_capacity_if_full.args[0].name = 'self'
-    dyn_array_double_capacity_if_full_entry = dyn_array_double_capacity_if_full.append_basic_block('entry')
-    builder = ir.IRBuilder(dyn_array_double_capacity_if_full_entry)
+    dyn_array_grow_if_full_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr])
+    dyn_array_grow_if_full = ir.Function(self.module, dyn_array_grow_if_full_type, '{}.array.grow_if_full'.format(str(array_type)))
+    dyn_array_grow_if_full.args[0].name = 'self'
+    dyn_array_grow_if_full_entry = dyn_array_grow_if_full.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_grow_if_full_entry)
     self.builder = builder
-    dyn_array_double_capacity_if_full_exit = dyn_array_double_capacity_if_full.append_basic_block('exit')
-    dyn_array_double_capacity_block = dyn_array_double_capacity_if_full.append_basic_block('double_capacity')
-    builder.position_at_end(dyn_array_double_capacity_if_full_entry)
-    array_ptr = builder.alloca(dyn_array_ptr)
-    builder.store(dyn_array_double_capacity_if_full.args[0], array_ptr)
+    dyn_array_grow_if_full_exit = dyn_array_grow_if_full.append_basic_block('exit')
+    dyn_array_grow_block = dyn_array_grow_if_full.append_basic_block('grow')
+    array = dyn_array_grow_if_full.args[0]
 
     # BODY
-    size_ptr = builder.gep(builder.load(array_ptr), [zero_32, zero_32], inbounds=True)
-    size_val = builder.load(size_ptr)
+    size_val = builder.load(builder.gep(array, [zero_32, zero_32], inbounds=True))
+    capacity_val = builder.load(builder.gep(array, [zero_32, one_32], inbounds=True))
+    compare_size_to_capacity = builder.icmp_signed(GREATER_THAN_OR_EQUAL_TO, size_val, capacity_val)
+    builder.cbranch(compare_size_to_capacity, dyn_array_grow_block, dyn_array_grow_if_full_exit)
+
+    builder.position_at_end(dyn_array_grow_block)
+    grown = builder.mul(capacity_val, ARRAY_GROWTH_FACTOR)
+    is_small = builder.icmp_signed(LESS_THAN, grown, ARRAY_INITIAL_CAPACITY)
+    new_capacity = builder.select(is_small, ARRAY_INITIAL_CAPACITY, grown)
+    builder.call(self.module.get_global('{}.array.resize'.format(str(array_type))), [array, new_capacity])
+    builder.branch(dyn_array_grow_if_full_exit)
 
-    capacity_ptr = builder.gep(builder.load(array_ptr), [zero_32, one_32], inbounds=True)
-    capacity_val = builder.load(capacity_ptr)
+    # CLOSE
+    builder.position_at_end(dyn_array_grow_if_full_exit)
+    builder.ret_void()
 
-    data_ptr = builder.gep(builder.load(array_ptr), [zero_32, two_32], inbounds=True)
 
-    compare_size_to_capactiy = builder.icmp_signed(GREATER_THAN_OR_EQUAL_TO, size_val, capacity_val)
+def dynamic_array_reserve(self, dyn_array_ptr, array_type):
+    # Makes room for at least additional more elements, growing geometrically like append
+    # START
+    dyn_array_reserve_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, type_map[INT]])
+    dyn_array_reserve = ir.Function(self.module, dyn_array_reserve_type, '{}.array.reserve'.format(str(array_type)))
+    dyn_array_reserve.args[0].name = 'self'
+    dyn_array_reserve_entry = dyn_array_reserve.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_reserve_entry)
+    self.builder = builder
+    dyn_array_reserve_exit = dyn_array_reserve.append_basic_block('exit')
+    dyn_array_reserve_block = dyn_array_reserve.append_basic_block('reserve')
+    array, additional = dyn_array_reserve.args
+
+    # BODY
+    size_val = builder.load(builder.gep(array, [zero_32, zero_32], inbounds=True))
+    capacity_val = builder.load(builder.gep(array, [zero_32, one_32], inbounds=True))
+    needed = builder.add(size_val, additional)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN, needed, capacity_val), dyn_array_reserve_block, dyn_array_reserve_exit)
 
-    builder.cbranch(compare_size_to_capactiy, dyn_array_double_capacity_block, dyn_array_double_capacity_if_full_exit)
+    builder.position_at_end(dyn_array_reserve_block)
+    grown = builder.mul(capacity_val, ARRAY_GROWTH_FACTOR)
+    new_capacity = builder.select(builder.icmp_signed(LESS_THAN, grown, needed), needed, grown)
+    builder.call(self.module.get_global('{}.array.resize'.format(str(array_type))), [array, new_capacity])
+    builder.branch(dyn_array_reserve_exit)
 
-    builder.position_at_end(dyn_array_double_capacity_block)
+    # CLOSE
+    self.define('{}.array.reserve'.format(str(array_type)), dyn_array_reserve)
+    builder.position_at_end(dyn_array_reserve_exit)
+    builder.ret_void()
 
-    capacity_val = builder.mul(capacity_val, two)
-    builder.store(capacity_val, capacity_ptr)
-    capacity_val = builder.load(capacity_ptr)
-    size_of = builder.mul(capacity_val, eight)
 
-    data_ptr_8 = builder.bitcast(builder.load(data_ptr), type_map[INT8].as_pointer())
-    re_alloc = builder.call(self.module.get_global('realloc'), [data_ptr_8, size_of])
-    re_alloc = builder.bitcast(re_alloc, array_type.as_pointer())
-    builder.store(re_alloc, data_ptr)
+def dynamic_array_shrink_to_fit(self, dyn_array_ptr, array_type):
+    # START
+    dyn_array_shrink_to_fit_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr])
+    dyn_array_shrink_to_fit = ir.Function(self.module, dyn_array_shrink_to_fit_type, '{}.array.shrink_to_fit'.format(str(array_type)))
+    dyn_array_shrink_to_fit.args[0].name = 'self'
+    dyn_array_shrink_to_fit_entry = dyn_array_shrink_to_fit.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_shrink_to_fit_entry)
+    self.builder = builder
+    array = dyn_array_shrink_to_fit.args[0]
 
-    builder.branch(dyn_array_double_capacity_if_full_exit)
+    # BODY
+    size_val = builder.load(builder.gep(array, [zero_32, zero_32], inbounds=True))
+    builder.call(self.module.get_global('{}.array.resize'.format(str(array_type))), [array, size_val])
 
     # CLOSE
-    builder.position_at_end(dyn_array_double_capacity_if_full_exit)
+    self.define('{}.array.shrink_to_fit'.format(str(array_type)), dyn_array_shrink_to_fit)
     builder.ret_void()
 
 
@@ -195,7 +346,7 @@ def dynamic_array_append(self, dyn_array_ptr, array_type):
     builder.store(dyn_array_append.args[1], value_ptr)
 
     # BODY
-    builder.call(self.module.get_global('{}.array.double_capacity_if_full'.format(str(array_type))), [builder.load(array_ptr)])
+    builder.call(self.module.get_global('{}.array.grow_if_full'.format(str(array_type))), [builder.load(array_ptr)])
 
     size_ptr = builder.gep(builder.load(array_ptr), [zero_32, zero_32], inbounds=True)
     size_val = builder.load(size_ptr)
@@ -246,9 +397,7 @@ def dynamic_array_get(self, dyn_array_ptr, array_type):
     builder.cbranch(compare_index_to_size, dyn_array_get_index_out_of_bounds, dyn_array_get_is_index_less_than_zero)
 
     builder.position_at_end(dyn_array_get_index_out_of_bounds)
-    self.print_string('Array index out of bounds')
-    builder.call(self.module.get_global('exit'), [one_32])
-    builder.unreachable()
+    self.runtime_error('Array index out of bounds')
 
     builder.position_at_end(dyn_array_get_is_index_less_than_zero)
 
@@ -311,9 +460,7 @@ def dynamic_array_set(self, dyn_array_ptr, array_type):
     builder.cbranch(compare_index_to_size, dyn_array_set_index_out_of_bounds, dyn_array_set_is_index_less_than_zero)
 
     builder.position_at_end(dyn_array_set_index_out_of_bounds)
-    self.print_string('Array index out of bounds')
-    builder.call(self.module.get_global('exit'), [one_32])
-    builder.unreachable()
+    self.runtime_error('Array index out of bounds')
 
     builder.position_at_end(dyn_array_set_is_index_less_than_zero)
 
@@ -365,129 +512,1275 @@ def dynamic_array_length(self, dyn_array_ptr, array_type):
     self.define('{}.array.length'.format(str(array_type)), dyn_array_length)
     builder.ret(builder.load(size_ptr))
 
-# TODO: add the following functions for dynamic array
-# extend(iterable)
-# insert(item, index)
-# remove(item)
-# pop([index])
-# clear()
-# index(x[, start[, end]])
-# count(item)
-# sort(key=None, reverse=False)
-# reverse()
+def dynamic_array_extend(self, dyn_array_ptr, array_type):
+    # START
+    dyn_array_extend_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, dyn_array_ptr.pointee])
+    dyn_array_extend = ir.Function(self.module, dyn_array_extend_type, '{}.array.extend'.format(str(array_type)))
+    dyn_array_extend.args[0].name = 'self'
+    dyn_array_extend_entry = dyn_array_extend.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_extend_entry)
+    self.builder = builder
+    array, other = dyn_array_extend.args
 
+    # BODY
+    other_size = builder.extract_value(other, 0)
+    other_data = builder.extract_value(other, 2)
+    data_ptr = array_field(builder, array, 2)
+    old_data = builder.load(data_ptr)
+    builder.call(self.module.get_global('{}.array.reserve'.format(str(array_type))), [array, other_size])
+    data = builder.load(data_ptr)
+    # a.extend(a) passes the buffer reserve may just have moved
+    source = builder.select(builder.icmp_unsigned(EQUALS, other_data, old_data), data, other_data)
+
+    size_ptr = array_field(builder, array, 0)
+    size_val = builder.load(size_ptr)
+    element_size = size_of(builder, array_type)
+    memcpy(self, builder,
+           builder.bitcast(builder.gep(data, [builder.add(size_val, one)], inbounds=True), type_map[INT8].as_pointer()),
+           builder.bitcast(builder.gep(source, [one], inbounds=True), type_map[INT8].as_pointer()),
+           builder.mul(other_size, element_size))
+    builder.store(builder.add(size_val, other_size), size_ptr)
 
-def define_print(self, dyn_array_ptr):
+    # CLOSE
+    self.define('{}.array.extend'.format(str(array_type)), dyn_array_extend)
+    builder.ret_void()
+
+
+def dynamic_array_insert(self, dyn_array_ptr, array_type):
+    # Like Python, an index past either end inserts at that end
     # START
-    func_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr])
-    func = ir.Function(self.module, func_type, 'print')
+    dyn_array_insert_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, type_map[INT], array_type])
+    dyn_array_insert = ir.Function(self.module, dyn_array_insert_type, '{}.array.insert'.format(str(array_type)))
+    dyn_array_insert.args[0].name = 'self'
+    dyn_array_insert_entry = dyn_array_insert.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_insert_entry)
+    self.builder = builder
+    array, index, value = dyn_array_insert.args
+
+    # BODY
+    size_ptr = array_field(builder, array, 0)
+    size_val = builder.load(size_ptr)
+    index = builder.select(builder.icmp_signed(LESS_THAN, index, zero), builder.add(index, size_val), index)
+    index = builder.select(builder.icmp_signed(LESS_THAN, index, zero), zero, index)
+    index = builder.select(builder.icmp_signed(GREATER_THAN, index, size_val), size_val, index)
+
+    builder.call(self.module.get_global('{}.array.grow_if_full'.format(str(array_type))), [array])
+    elements = array_elements(builder, array)
+    slot = builder.gep(elements, [index], inbounds=True)
+    memmove(self, builder,
+            builder.bitcast(builder.gep(slot, [one], inbounds=True), type_map[INT8].as_pointer()),
+            builder.bitcast(slot, type_map[INT8].as_pointer()),
+            builder.mul(builder.sub(size_val, index), size_of(builder, array_type)))
+    builder.store(value, slot)
+    builder.store(builder.add(size_val, one), size_ptr)
+
+    # CLOSE
+    self.define('{}.array.insert'.format(str(array_type)), dyn_array_insert)
+    builder.ret_void()
+
+
+def dynamic_array_pop(self, dyn_array_ptr, array_type):
+    # START
+    dyn_array_pop_type = ir.FunctionType(array_type, [dyn_array_ptr, type_map[INT]])
+    dyn_array_pop_type.parameters = {SELF: OxyType(dyn_array_ptr, 0), 'index': OxyType(INT, 0)}
+    dyn_array_pop_type.parameter_defaults = {'index': OxyNum(-1, INT, 0)}
+    dyn_array_pop = ir.Function(self.module, dyn_array_pop_type, '{}.array.pop'.format(str(array_type)))
+    dyn_array_pop.args[0].name = 'self'
+    dyn_array_pop_entry = dyn_array_pop.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_pop_entry)
+    self.builder = builder
+    dyn_array_pop_index_out_of_bounds = dyn_array_pop.append_basic_block('index_out_of_bounds')
+    dyn_array_pop_block = dyn_array_pop.append_basic_block('pop')
+    array, index = dyn_array_pop.args
+
+    # BODY
+    size_ptr = array_field(builder, array, 0)
+    size_val = builder.load(size_ptr)
+    index = builder.select(builder.icmp_signed(LESS_THAN, index, zero), builder.add(index, size_val), index)
+    builder.cbranch(builder.icmp_unsigned(LESS_THAN, index, size_val), dyn_array_pop_block, dyn_array_pop_index_out_of_bounds)
+
+    builder.position_at_end(dyn_array_pop_index_out_of_bounds)
+    self.runtime_error('Array index out of bounds')
+
+    builder.position_at_end(dyn_array_pop_block)
+    slot = builder.gep(array_elements(builder, array), [index], inbounds=True)
+    value = builder.load(slot)
+    memmove(self, builder,
+            builder.bitcast(slot, type_map[INT8].as_pointer()),
+            builder.bitcast(builder.gep(slot, [one], inbounds=True), type_map[INT8].as_pointer()),
+            builder.mul(builder.sub(builder.sub(size_val, index), one), size_of(builder, array_type)))
+    builder.store(builder.sub(size_val, one), size_ptr)
+
+    # CLOSE
+    self.define('{}.array.pop'.format(str(array_type)), dyn_array_pop)
+    builder.ret(value)
+
+
+def dynamic_array_clear(self, dyn_array_ptr, array_type):
+    # START
+    dyn_array_clear_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr])
+    dyn_array_clear = ir.Function(self.module, dyn_array_clear_type, '{}.array.clear'.format(str(array_type)))
+    dyn_array_clear.args[0].name = 'self'
+    dyn_array_clear_entry = dyn_array_clear.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_clear_entry)
+    self.builder = builder
+
+    # BODY
+    builder.store(zero, array_field(builder, dyn_array_clear.args[0], 0))
+
+    # CLOSE
+    self.define('{}.array.clear'.format(str(array_type)), dyn_array_clear)
+    builder.ret_void()
+
+
+def dynamic_array_reverse(self, dyn_array_ptr, array_type):
+    # START
+    dyn_array_reverse_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr])
+    dyn_array_reverse = ir.Function(self.module, dyn_array_reverse_type, '{}.array.reverse'.format(str(array_type)))
+    dyn_array_reverse.args[0].name = 'self'
+    dyn_array_reverse_entry = dyn_array_reverse.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_reverse_entry)
+    self.builder = builder
+    dyn_array_reverse_test = dyn_array_reverse.append_basic_block('test')
+    dyn_array_reverse_body = dyn_array_reverse.append_basic_block('body')
+    dyn_array_reverse_exit = dyn_array_reverse.append_basic_block('exit')
+    array = dyn_array_reverse.args[0]
+    low_ptr = builder.alloca(type_map[INT])
+    high_ptr = builder.alloca(type_map[INT])
+
+    # BODY
+    elements = array_elements(builder, array)
+    builder.store(zero, low_ptr)
+    builder.store(builder.sub(builder.load(array_field(builder, array, 0)), one), high_ptr)
+    builder.branch(dyn_array_reverse_test)
+
+    builder.position_at_end(dyn_array_reverse_test)
+    low = builder.load(low_ptr)
+    high = builder.load(high_ptr)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, low, high), dyn_array_reverse_body, dyn_array_reverse_exit)
+
+    builder.position_at_end(dyn_array_reverse_body)
+    swap_elements(builder, builder.gep(elements, [low], inbounds=True), builder.gep(elements, [high], inbounds=True))
+    builder.store(builder.add(low, one), low_ptr)
+    builder.store(builder.sub(high, one), high_ptr)
+    builder.branch(dyn_array_reverse_test)
+
+    # CLOSE
+    self.define('{}.array.reverse'.format(str(array_type)), dyn_array_reverse)
+    builder.position_at_end(dyn_array_reverse_exit)
+    builder.ret_void()
+
+
+def dynamic_array_index(self, dyn_array_ptr, array_type):
+    # Scalar types are scanned INDEX_BLOCK_SIZE elements at a time without an early exit,
+    # which LLVM turns into vector compares; only the block holding a match is rescanned
+    # START
+    dyn_array_index_type = ir.FunctionType(type_map[INT], [dyn_array_ptr, array_type])
+    dyn_array_index = ir.Function(self.module, dyn_array_index_type, '{}.array.index'.format(str(array_type)))
+    dyn_array_index.args[0].name = 'self'
+    dyn_array_index_entry = dyn_array_index.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_index_entry)
+    self.builder = builder
+    dyn_array_index_block_test = dyn_array_index.append_basic_block('block_test')
+    dyn_array_index_test = dyn_array_index.append_basic_block('test')
+    dyn_array_index_body = dyn_array_index.append_basic_block('body')
+    dyn_array_index_found = dyn_array_index.append_basic_block('found')
+    dyn_array_index_next = dyn_array_index.append_basic_block('next')
+    dyn_array_index_not_found = dyn_array_index.append_basic_block('not_found')
+    array, value = dyn_array_index.args
+    position_ptr = builder.alloca(type_map[INT])
+    block_size = ir.Constant(type_map[INT], INDEX_BLOCK_SIZE)
+
+    # BODY
+    elements = array_elements(builder, array)
+    size_val = builder.load(array_field(builder, array, 0))
+    builder.store(zero, position_ptr)
+    builder.branch(dyn_array_index_block_test)
+
+    builder.position_at_end(dyn_array_index_block_test)
+    if array_type == type_map.get(STR):
+        builder.branch(dyn_array_index_test)
+    else:
+        position = builder.load(position_ptr)
+        full_block = builder.icmp_signed(LESS_THAN_OR_EQUAL_TO, builder.add(position, block_size), size_val)
+        with builder.if_then(full_block):
+            matches = []
+            for offset in range(INDEX_BLOCK_SIZE):
+                element = builder.gep(elements, [builder.add(position, ir.Constant(type_map[INT], offset))], inbounds=True)
+                matches.append(elements_equal(self, builder, array_type, builder.load(element), value))
+            while len(matches) > 1:
+                matches = [builder.or_(matches[x], matches[x + 1]) for x in range(0, len(matches), 2)]
+            with builder.if_then(builder.not_(matches[0])):
+                builder.store(builder.add(position, block_size), position_ptr)
+                builder.branch(dyn_array_index_block_test)
+        builder.branch(dyn_array_index_test)
+
+    builder.position_at_end(dyn_array_index_test)
+    position = builder.load(position_ptr)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, position, size_val), dyn_array_index_body, dyn_array_index_not_found)
+
+    builder.position_at_end(dyn_array_index_body)
+    element = builder.load(builder.gep(elements, [position], inbounds=True))
+    builder.cbranch(elements_equal(self, builder, array_type, element, value), dyn_array_index_found, dyn_array_index_next)
+
+    builder.position_at_end(dyn_array_index_next)
+    builder.store(builder.add(position, one), position_ptr)
+    builder.branch(dyn_array_index_test)
+
+    builder.position_at_end(dyn_array_index_not_found)
+    self.runtime_error('Array value not found')
+
+    # CLOSE
+    self.define('{}.array.index'.format(str(array_type)), dyn_array_index)
+    builder.position_at_end(dyn_array_index_found)
+    builder.ret(builder.load(position_ptr))
+
+
+def dynamic_array_count(self, dyn_array_ptr, array_type):
+    # START
+    dyn_array_count_type = ir.FunctionType(type_map[INT], [dyn_array_ptr, array_type])
+    dyn_array_count = ir.Function(self.module, dyn_array_count_type, '{}.array.count'.format(str(array_type)))
+    dyn_array_count.args[0].name = 'self'
+    dyn_array_count_entry = dyn_array_count.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_count_entry)
+    self.builder = builder
+    dyn_array_count_test = dyn_array_count.append_basic_block('test')
+    dyn_array_count_body = dyn_array_count.append_basic_block('body')
+    dyn_array_count_exit = dyn_array_count.append_basic_block('exit')
+    array, value = dyn_array_count.args
+    position_ptr = builder.alloca(type_map[INT])
+    total_ptr = builder.alloca(type_map[INT])
+
+    # BODY
+    elements = array_elements(builder, array)
+    size_val = builder.load(array_field(builder, array, 0))
+    builder.store(zero, position_ptr)
+    builder.store(zero, total_ptr)
+    builder.branch(dyn_array_count_test)
+
+    builder.position_at_end(dyn_array_count_test)
+    position = builder.load(position_ptr)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, position, size_val), dyn_array_count_body, dyn_array_count_exit)
+
+    # A branch-free reduction the loop vectorizer can widen
+    builder.position_at_end(dyn_array_count_body)
+    element = builder.load(builder.gep(elements, [position], inbounds=True))
+    match = builder.zext(elements_equal(self, builder, array_type, element, value), type_map[INT])
+    builder.store(builder.add(builder.load(total_ptr), match), total_ptr)
+    builder.store(builder.add(position, one), position_ptr)
+    builder.branch(dyn_array_count_test)
+
+    # CLOSE
+    self.define('{}.array.count'.format(str(array_type)), dyn_array_count)
+    builder.position_at_end(dyn_array_count_exit)
+    builder.ret(builder.load(total_ptr))
+
+
+def dynamic_array_remove(self, dyn_array_ptr, array_type):
+    # START
+    dyn_array_remove_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, array_type])
+    dyn_array_remove = ir.Function(self.module, dyn_array_remove_type, '{}.array.remove'.format(str(array_type)))
+    dyn_array_remove.args[0].name = 'self'
+    dyn_array_remove_entry = dyn_array_remove.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_remove_entry)
+    self.builder = builder
+    array, value = dyn_array_remove.args
+
+    # BODY
+    index = builder.call(self.module.get_global('{}.array.index'.format(str(array_type))), [array, value])
+    builder.call(self.module.get_global('{}.array.pop'.format(str(array_type))), [array, index])
+
+    # CLOSE
+    self.define('{}.array.remove'.format(str(array_type)), dyn_array_remove)
+    builder.ret_void()
+
+
+def dynamic_array_sort(self, dyn_array_ptr, array_type):
+    # Ascending, in place. Integers use an LSD radix sort, everything else introsort
+    dynamic_array_insertion_sort(self, array_type)
+    dynamic_array_sift_down(self, array_type)
+    dynamic_array_heap_sort(self, array_type)
+    dynamic_array_introsort(self, array_type)
+    if isinstance(array_type, ir.IntType):
+        dynamic_array_radix_sort(self, array_type)
+
+    # START
+    dyn_array_sort_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr])
+    dyn_array_sort = ir.Function(self.module, dyn_array_sort_type, '{}.array.sort'.format(str(array_type)))
+    dyn_array_sort.args[0].name = 'self'
+    dyn_array_sort_entry = dyn_array_sort.append_basic_block('entry')
+    builder = ir.IRBuilder(dyn_array_sort_entry)
+    self.builder = builder
+    dyn_array_sort_introsort = dyn_array_sort.append_basic_block('introsort')
+    dyn_array_sort_exit = dyn_array_sort.append_basic_block('exit')
+    array = dyn_array_sort.args[0]
+
+    # BODY
+    elements = array_elements(builder, array)
+    size_val = builder.load(array_field(builder, array, 0))
+    if isinstance(array_type, ir.IntType):
+        dyn_array_sort_radix = dyn_array_sort.append_basic_block('radix')
+        is_large = builder.icmp_signed(GREATER_THAN, size_val, ir.Constant(type_map[INT], RADIX_SORT_THRESHOLD))
+        builder.cbranch(is_large, dyn_array_sort_radix, dyn_array_sort_introsort)
+
+        builder.position_at_end(dyn_array_sort_radix)
+        builder.call(self.module.get_global('{}.array.radix_sort'.format(str(array_type))), [elements, size_val])
+        builder.branch(dyn_array_sort_exit)
+    else:
+        builder.branch(dyn_array_sort_introsort)
+
+    # Depth limit of 2 * floor(log2(size)) before falling back to heapsort
+    builder.position_at_end(dyn_array_sort_introsort)
+    with builder.if_then(builder.icmp_signed(GREATER_THAN, size_val, one)):
+        ctlz_type = ir.FunctionType(type_map[INT], [type_map[INT], type_map[BOOL]])
+        ctlz = self.module.declare_intrinsic('llvm.ctlz', [type_map[INT]], ctlz_type)
+        log2 = builder.sub(ir.Constant(type_map[INT], 63), builder.call(ctlz, [size_val, ir.Constant(type_map[BOOL], 0)]))
+        builder.call(self.module.get_global('{}.array.introsort'.format(str(array_type))),
+                     [elements, zero, builder.sub(size_val, one), builder.mul(log2, two)])
+    builder.branch(dyn_array_sort_exit)
+
+    # CLOSE
+    self.define('{}.array.sort'.format(str(array_type)), dyn_array_sort)
+    builder.position_at_end(dyn_array_sort_exit)
+    builder.ret_void()
+
+
+def dynamic_array_insertion_sort(self, array_type):
+    # Sorts elements[low..high], both ends inclusive
+    # START
+    insertion_sort_type = ir.FunctionType(type_map[VOID], [array_type.as_pointer(), type_map[INT], type_map[INT]])
+    insertion_sort = ir.Function(self.module, insertion_sort_type, '{}.array.insertion_sort'.format(str(array_type)))
+    insertion_sort.linkage = 'private'
+    insertion_sort_entry = insertion_sort.append_basic_block('entry')
+    builder = ir.IRBuilder(insertion_sort_entry)
+    self.builder = builder
+    outer_test = insertion_sort.append_basic_block('outer_test')
+    inner_test = insertion_sort.append_basic_block('inner_test')
+    inner_compare = insertion_sort.append_basic_block('inner_compare')
+    inner_body = insertion_sort.append_basic_block('inner_body')
+    place = insertion_sort.append_basic_block('place')
+    exit_block = insertion_sort.append_basic_block('exit')
+    elements, low, high = insertion_sort.args
+    position_ptr = builder.alloca(type_map[INT])
+    hole_ptr = builder.alloca(type_map[INT])
+    value_ptr = builder.alloca(array_type)
+
+    # BODY
+    builder.store(builder.add(low, one), position_ptr)
+    builder.branch(outer_test)
+
+    builder.position_at_end(outer_test)
+    position = builder.load(position_ptr)
+    with builder.if_then(builder.icmp_signed(GREATER_THAN, position, high)):
+        builder.branch(exit_block)
+    builder.store(builder.load(builder.gep(elements, [position], inbounds=True)), value_ptr)
+    builder.store(position, hole_ptr)
+    builder.branch(inner_test)
+
+    builder.position_at_end(inner_test)
+    hole = builder.load(hole_ptr)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN, hole, low), inner_compare, place)
+
+    builder.position_at_end(inner_compare)
+    previous = builder.load(builder.gep(elements, [builder.sub(hole, one)], inbounds=True))
+    builder.cbranch(elements_less(self, builder, array_type, builder.load(value_ptr), previous), inner_body, place)
+
+    builder.position_at_end(inner_body)
+    builder.store(previous, builder.gep(elements, [hole], inbounds=True))
+    builder.store(builder.sub(hole, one), hole_ptr)
+    builder.branch(inner_test)
+
+    builder.position_at_end(place)
+    builder.store(builder.load(value_ptr), builder.gep(elements, [builder.load(hole_ptr)], inbounds=True))
+    builder.store(builder.add(builder.load(position_ptr), one), position_ptr)
+    builder.branch(outer_test)
+
+    # CLOSE
+    builder.position_at_end(exit_block)
+    builder.ret_void()
+
+
+def dynamic_array_sift_down(self, array_type):
+    # Restores the max-heap property of elements[0..size) below root
+    # START
+    sift_down_type = ir.FunctionType(type_map[VOID], [array_type.as_pointer(), type_map[INT], type_map[INT]])
+    sift_down = ir.Function(self.module, sift_down_type, '{}.array.sift_down'.format(str(array_type)))
+    sift_down.linkage = 'private'
+    sift_down_entry = sift_down.append_basic_block('entry')
+    builder = ir.IRBuilder(sift_down_entry)
+    self.builder = builder
+    test = sift_down.append_basic_block('test')
+    body = sift_down.append_basic_block('body')
+    check_sibling = sift_down.append_basic_block('check_sibling')
+    compare_root = sift_down.append_basic_block('compare_root')
+    swap = sift_down.append_basic_block('swap')
+    exit_block = sift_down.append_basic_block('exit')
+    elements, root, size = sift_down.args
+    root_ptr = builder.alloca(type_map[INT])
+    largest_ptr = builder.alloca(type_map[INT])
+
+    # BODY
+    builder.store(root, root_ptr)
+    builder.branch(test)
+
+    builder.position_at_end(test)
+    root = builder.load(root_ptr)
+    child = builder.add(builder.mul(root, two), one)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, child, size), body, exit_block)
+
+    builder.position_at_end(body)
+    builder.store(child, largest_ptr)
+    sibling = builder.add(child, one)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, sibling, size), check_sibling, compare_root)
+
+    builder.position_at_end(check_sibling)
+    child_value = builder.load(builder.gep(elements, [child], inbounds=True))
+    sibling_value = builder.load(builder.gep(elements, [sibling], inbounds=True))
+    with builder.if_then(elements_less(self, builder, array_type, child_value, sibling_value)):
+        builder.store(sibling, largest_ptr)
+    builder.branch(compare_root)
+
+    builder.position_at_end(compare_root)
+    largest = builder.load(largest_ptr)
+    root_element = builder.gep(elements, [builder.load(root_ptr)], inbounds=True)
+    largest_element = builder.gep(elements, [largest], inbounds=True)
+    is_smaller = elements_less(self, builder, array_type, builder.load(root_element), builder.load(largest_element))
+    builder.cbranch(is_smaller, swap, exit_block)
+
+    builder.position_at_end(swap)
+    swap_elements(builder, root_element, largest_element)
+    builder.store(largest, root_ptr)
+    builder.branch(test)
+
+    # CLOSE
+    builder.position_at_end(exit_block)
+    builder.ret_void()
+
+
+def dynamic_array_heap_sort(self, array_type):
+    # START
+    heap_sort_type = ir.FunctionType(type_map[VOID], [array_type.as_pointer(), type_map[INT]])
+    heap_sort = ir.Function(self.module, heap_sort_type, '{}.array.heap_sort'.format(str(array_type)))
+    heap_sort.linkage = 'private'
+    heap_sort_entry = heap_sort.append_basic_block('entry')
+    builder = ir.IRBuilder(heap_sort_entry)
+    self.builder = builder
+    heapify_test = heap_sort.append_basic_block('heapify_test')
+    heapify = heap_sort.append_basic_block('heapify')
+    extract_start = heap_sort.append_basic_block('extract_start')
+    extract_test = heap_sort.append_basic_block('extract_test')
+    extract = heap_sort.append_basic_block('extract')
+    exit_block = heap_sort.append_basic_block('exit')
+    elements, size = heap_sort.args
+    position_ptr = builder.alloca(type_map[INT])
+    sift_down = self.module.get_global('{}.array.sift_down'.format(str(array_type)))
+
+    # BODY
+    builder.store(builder.sdiv(size, two), position_ptr)
+    builder.branch(heapify_test)
+
+    builder.position_at_end(heapify_test)
+    position = builder.load(position_ptr)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN, position, zero), heapify, extract_start)
+
+    builder.position_at_end(heapify)
+    position = builder.sub(position, one)
+    builder.call(sift_down, [elements, position, size])
+    builder.store(position, position_ptr)
+    builder.branch(heapify_test)
+
+    builder.position_at_end(extract_start)
+    builder.store(size, position_ptr)
+    builder.branch(extract_test)
+
+    builder.position_at_end(extract_test)
+    position = builder.sub(builder.load(position_ptr), one)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN, position, zero), extract, exit_block)
+
+    builder.position_at_end(extract)
+    swap_elements(builder, elements, builder.gep(elements, [position], inbounds=True))
+    builder.call(sift_down, [elements, zero, position])
+    builder.store(position, position_ptr)
+    builder.branch(extract_test)
+
+    # CLOSE
+    builder.position_at_end(exit_block)
+    builder.ret_void()
+
+
+def dynamic_array_introsort(self, array_type):
+    # Sorts elements[low..high], both ends inclusive: median of three quicksort with Hoare
+    # partitioning, recursing into the smaller side and heapsorting once depth runs out
+    # START
+    introsort_type = ir.FunctionType(type_map[VOID], [array_type.as_pointer(), type_map[INT], type_map[INT], type_map[INT]])
+    introsort = ir.Function(self.module, introsort_type, '{}.array.introsort'.format(str(array_type)))
+    introsort.linkage = 'private'
+    introsort_entry = introsort.append_basic_block('entry')
+    builder = ir.IRBuilder(introsort_entry)
+    self.builder = builder
+    test = introsort.append_basic_block('test')
+    small = introsort.append_basic_block('small')
+    check_depth = introsort.append_basic_block('check_depth')
+    heap = introsort.append_basic_block('heap')
+    partition = introsort.append_basic_block('partition')
+    scan_low = introsort.append_basic_block('scan_low')
+    scan_high = introsort.append_basic_block('scan_high')
+    check_crossed = introsort.append_basic_block('check_crossed')
+    exchange = introsort.append_basic_block('exchange')
+    recurse = introsort.append_basic_block('recurse')
+    exit_block = introsort.append_basic_block('exit')
+    elements, low, high, depth = introsort.args
+    low_ptr = builder.alloca(type_map[INT])
+    high_ptr = builder.alloca(type_map[INT])
+    depth_ptr = builder.alloca(type_map[INT])
+    left_ptr = builder.alloca(type_map[INT])
+    right_ptr = builder.alloca(type_map[INT])
+    pivot_ptr = builder.alloca(array_type)
+
+    def element(index):
+        return builder.gep(elements, [index], inbounds=True)
+
+    def order(left, right):
+        with builder.if_then(elements_less(self, builder, array_type, builder.load(right), builder.load(left))):
+            swap_elements(builder, left, right)
+
+    # BODY
+    builder.store(low, low_ptr)
+    builder.store(high, high_ptr)
+    builder.store(depth, depth_ptr)
+    builder.branch(test)
+
+    builder.position_at_end(test)
+    low = builder.load(low_ptr)
+    high = builder.load(high_ptr)
+    is_small = builder.icmp_signed(LESS_THAN, builder.sub(high, low), ir.Constant(type_map[INT], INSERTION_SORT_THRESHOLD))
+    builder.cbranch(is_small, small, check_depth)
+
+    builder.position_at_end(small)
+    builder.call(self.module.get_global('{}.array.insertion_sort'.format(str(array_type))), [elements, low, high])
+    builder.branch(exit_block)
+
+    builder.position_at_end(check_depth)
+    depth = builder.load(depth_ptr)
+    builder.cbranch(builder.icmp_signed(EQUALS, depth, zero), heap, partition)
+
+    builder.position_at_end(heap)
+    builder.call(self.module.get_global('{}.array.heap_sort'.format(str(array_type))),
+                 [element(low), builder.add(builder.sub(high, low), one)])
+    builder.branch(exit_block)
+
+    builder.position_at_end(partition)
+    builder.store(builder.sub(depth, one), depth_ptr)
+    middle = builder.add(low, builder.sdiv(builder.sub(high, low), two))
+    order(element(low), element(middle))
+    order(element(low), element(high))
+    order(element(middle), element(high))
+    builder.store(builder.load(element(middle)), pivot_ptr)
+    builder.store(builder.sub(low, one), left_ptr)
+    builder.store(builder.add(high, one), right_ptr)
+    builder.branch(scan_low)
+
+    builder.position_at_end(scan_low)
+    left = builder.add(builder.load(left_ptr), one)
+    builder.store(left, left_ptr)
+    builder.cbranch(elements_less(self, builder, array_type, builder.load(element(left)), builder.load(pivot_ptr)),
+                    scan_low, scan_high)
+
+    builder.position_at_end(scan_high)
+    right = builder.sub(builder.load(right_ptr), one)
+    builder.store(right, right_ptr)
+    builder.cbranch(elements_less(self, builder, array_type, builder.load(pivot_ptr), builder.load(element(right))),
+                    scan_high, check_crossed)
+
+    builder.position_at_end(check_crossed)
+    left = builder.load(left_ptr)
+    right = builder.load(right_ptr)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN_OR_EQUAL_TO, left, right), recurse, exchange)
+
+    builder.position_at_end(exchange)
+    swap_elements(builder, element(left), element(right))
+    builder.branch(scan_low)
+
+    # elements[low..right] and elements[right + 1..high] are now ordered against each other
+    builder.position_at_end(recurse)
+    low = builder.load(low_ptr)
+    high = builder.load(high_ptr)
+    depth = builder.load(depth_ptr)
+    left_smaller = builder.icmp_signed(LESS_THAN, builder.sub(right, low), builder.sub(high, right))
+    with builder.if_else(left_smaller) as (then, otherwise):
+        with then:
+            builder.call(introsort, [elements, low, right, depth])
+            builder.store(builder.add(right, one), low_ptr)
+        with otherwise:
+            builder.call(introsort, [elements, builder.add(right, one), high, depth])
+            builder.store(right, high_ptr)
+    builder.branch(test)
+
+    # CLOSE
+    builder.position_at_end(exit_block)
+    builder.ret_void()
+
+
+def dynamic_array_radix_sort(self, array_type):
+    # LSD radix sort on bytes of the key, ping-ponging between the array and a scratch
+    # buffer. Signed keys get their sign bit flipped so they order as unsigned, and a pass
+    # whose byte is the same in every element is skipped
+    key_width = max(8, (array_type.width + 7) // 8 * 8)
+    key_type = ir.IntType(key_width, signed=False)
+    # START
+    radix_sort_type = ir.FunctionType(type_map[VOID], [array_type.as_pointer(), type_map[INT]])
+    radix_sort = ir.Function(self.module, radix_sort_type, '{}.array.radix_sort'.format(str(array_type)))
+    radix_sort.linkage = 'private'
+    radix_sort_entry = radix_sort.append_basic_block('entry')
+    builder = ir.IRBuilder(radix_sort_entry)
+    self.builder = builder
+    pass_test = radix_sort.append_basic_block('pass_test')
+    count_test = radix_sort.append_basic_block('count_test')
+    count_body = radix_sort.append_basic_block('count_body')
+    check_skip = radix_sort.append_basic_block('check_skip')
+    prefix_test = radix_sort.append_basic_block('prefix_test')
+    prefix_body = radix_sort.append_basic_block('prefix_body')
+    scatter_start = radix_sort.append_basic_block('scatter_start')
+    scatter_test = radix_sort.append_basic_block('scatter_test')
+    scatter_body = radix_sort.append_basic_block('scatter_body')
+    next_pass = radix_sort.append_basic_block('next_pass')
+    copy_back = radix_sort.append_basic_block('copy_back')
+    exit_block = radix_sort.append_basic_block('exit')
+    elements, size = radix_sort.args
+    counts = builder.alloca(ir.ArrayType(type_map[INT], 256))
+    shift_ptr = builder.alloca(key_type)
+    position_ptr = builder.alloca(type_map[INT])
+    total_ptr = builder.alloca(type_map[INT])
+    source_ptr = builder.alloca(array_type.as_pointer())
+    target_ptr = builder.alloca(array_type.as_pointer())
+    element_size = size_of(builder, array_type)
+    bucket_bytes = ir.Constant(type_map[INT], 256 * 8)
+
+    def bucket(value, shift):
+        key = builder.zext(value, key_type) if key_width > array_type.width else value
+        if array_type.signed and array_type.width > 1:
+            key = builder.xor(key, ir.Constant(key_type, 1 << (array_type.width - 1)))
+        digit = builder.zext(builder.trunc(builder.lshr(key, shift), type_map[INT8]), type_map[INT])
+        return builder.gep(counts, [zero_32, digit], inbounds=True)
+
+    # BODY
+    scratch = builder.call(self.module.get_global('malloc'), [builder.mul(size, element_size)])
+    builder.store(elements, source_ptr)
+    builder.store(builder.bitcast(scratch, array_type.as_pointer()), target_ptr)
+    builder.store(ir.Constant(key_type, 0), shift_ptr)
+    builder.branch(pass_test)
+
+    builder.position_at_end(pass_test)
+    more_passes = builder.icmp_unsigned(LESS_THAN, builder.load(shift_ptr), ir.Constant(key_type, key_width))
+    with builder.if_then(more_passes):
+        memset = self.module.declare_intrinsic('llvm.memset', [type_map[INT8].as_pointer(), type_map[INT]])
+        builder.call(memset, [builder.bitcast(counts, type_map[INT8].as_pointer()), ir.Constant(type_map[INT8], 0),
+                              bucket_bytes, ir.Constant(type_map[BOOL], 0)])
+        builder.store(zero, position_ptr)
+        builder.branch(count_test)
+    builder.branch(copy_back)
+
+    builder.position_at_end(count_test)
+    position = builder.load(position_ptr)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, position, size), count_body, check_skip)
+
+    builder.position_at_end(count_body)
+    value = builder.load(builder.gep(builder.load(source_ptr), [position], inbounds=True))
+    count = bucket(value, builder.load(shift_ptr))
+    builder.store(builder.add(builder.load(count), one), count)
+    builder.store(builder.add(position, one), position_ptr)
+    builder.branch(count_test)
+
+    builder.position_at_end(check_skip)
+    first = bucket(builder.load(builder.load(source_ptr)), builder.load(shift_ptr))
+    skipped = builder.icmp_signed(EQUALS, builder.load(first), size)
+    builder.store(zero, position_ptr)
+    builder.store(zero, total_ptr)
+    builder.cbranch(skipped, next_pass, prefix_test)
+
+    builder.position_at_end(prefix_test)
+    position = builder.load(position_ptr)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, position, ir.Constant(type_map[INT], 256)), prefix_body, scatter_start)
+
+    builder.position_at_end(prefix_body)
+    count = builder.gep(counts, [zero_32, position], inbounds=True)
+    total = builder.load(total_ptr)
+    builder.store(builder.add(total, builder.load(count)), total_ptr)
+    builder.store(total, count)
+    builder.store(builder.add(position, one), position_ptr)
+    builder.branch(prefix_test)
+
+    builder.position_at_end(scatter_start)
+    builder.store(zero, position_ptr)
+    builder.branch(scatter_test)
+
+    builder.position_at_end(scatter_test)
+    position = builder.load(position_ptr)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, position, size), scatter_body, next_pass)
+
+    builder.position_at_end(scatter_body)
+    value = builder.load(builder.gep(builder.load(source_ptr), [position], inbounds=True))
+    count = bucket(value, builder.load(shift_ptr))
+    slot = builder.load(count)
+    builder.store(value, builder.gep(builder.load(target_ptr), [slot], inbounds=True))
+    builder.store(builder.add(slot, one), count)
+    builder.store(builder.add(position, one), position_ptr)
+    builder.branch(scatter_test)
+
+    builder.position_at_end(next_pass)
+    with builder.if_then(builder.not_(skipped)):
+        source = builder.load(source_ptr)
+        builder.store(builder.load(target_ptr), source_ptr)
+        builder.store(source, target_ptr)
+    builder.store(builder.add(builder.load(shift_ptr), ir.Constant(key_type, 8)), shift_ptr)
+    builder.branch(pass_test)
+
+    builder.position_at_end(copy_back)
+    source = builder.load(source_ptr)
+    with builder.if_then(builder.icmp_unsigned(NOT_EQUALS, source, elements)):
+        memcpy(self, builder, builder.bitcast(elements, type_map[INT8].as_pointer()),
+               builder.bitcast(source, type_map[INT8].as_pointer()), builder.mul(size, element_size))
+    builder.call(self.module.get_global('free'), [scratch])
+    builder.branch(exit_block)
+
+    # CLOSE
+    builder.position_at_end(exit_block)
+    builder.ret_void()
+
+
+def define_str_new(self, str_ptr):
+    # START
+    func_type = ir.FunctionType(str_ptr, [type_map[INT8].as_pointer(), type_map[INT]])
+    func = ir.Function(self.module, func_type, 'str.new')
     entry_block = func.append_basic_block('entry')
     builder = ir.IRBuilder(entry_block)
     self.builder = builder
-    builder.position_at_end(entry_block)
-    zero_length_check_block = func.append_basic_block('zero_length_check')
-    non_zero_length_block = func.append_basic_block('non_zero_length')
-    cond_block = func.append_basic_block('check_if_done')
-    body_block = func.append_basic_block('print_it')
-    exit_block = func.append_basic_block('exit')
-    array_ptr = builder.alloca(dyn_array_ptr)
-    builder.store(func.args[0], array_ptr)
+    data, length = func.args
 
     # BODY
-    builder.position_at_end(entry_block)
-    length = builder.call(self.module.get_global('i64.array.length'), [builder.load(array_ptr)])
-    builder.branch(zero_length_check_block)
+    string = builder.bitcast(builder.call(self.module.get_global('malloc'), [size_of(builder, str_ptr.pointee)]), str_ptr)
+    buffer = builder.call(self.module.get_global('malloc'), [length])
+    memcpy(self, builder, buffer, data, length)
+    builder.store(length, builder.gep(string, [zero_32, zero_32], inbounds=True))
+    builder.store(length, builder.gep(string, [zero_32, one_32], inbounds=True))
+    builder.store(buffer, builder.gep(string, [zero_32, two_32], inbounds=True))
+
+    # CLOSE
+    builder.ret(string)
 
-    builder.position_at_end(zero_length_check_block)
-    cond = builder.icmp_signed(LESS_THAN_OR_EQUAL_TO, zero, length)
-    builder.cbranch(cond, non_zero_length_block, exit_block)
 
-    builder.position_at_end(non_zero_length_block)
+def define_str_length(self, str_ptr):
+    # START
+    func_type = ir.FunctionType(type_map[INT], [str_ptr])
+    func = ir.Function(self.module, func_type, 'str.length')
+    func.args[0].name = 'self'
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+
+    # CLOSE
+    builder.ret(builder.load(builder.gep(func.args[0], [zero_32, zero_32], inbounds=True)))
+
+
+def define_str_push(self, str_ptr):
+    # START
+    func_type = ir.FunctionType(type_map[VOID], [str_ptr, type_map[INT8]])
+    func = ir.Function(self.module, func_type, 'str.push')
+    func.args[0].name = 'self'
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    grow_block = func.append_basic_block('grow')
+    push_block = func.append_basic_block('push')
+    string, byte = func.args
+
+    # BODY
+    length_ptr = builder.gep(string, [zero_32, zero_32], inbounds=True)
+    capacity_ptr = builder.gep(string, [zero_32, one_32], inbounds=True)
+    data_ptr = builder.gep(string, [zero_32, two_32], inbounds=True)
+    length = builder.load(length_ptr)
+    capacity = builder.load(capacity_ptr)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN_OR_EQUAL_TO, length, capacity), grow_block, push_block)
+
+    builder.position_at_end(grow_block)
+    doubled = builder.mul(capacity, two)
+    is_small = builder.icmp_signed(LESS_THAN, doubled, ARRAY_INITIAL_CAPACITY)
+    new_capacity = builder.select(is_small, ARRAY_INITIAL_CAPACITY, doubled)
+    builder.store(new_capacity, capacity_ptr)
+    builder.store(builder.call(self.module.get_global('realloc'), [builder.load(data_ptr), new_capacity]), data_ptr)
+    builder.branch(push_block)
+
+    builder.position_at_end(push_block)
+    builder.store(byte, builder.gep(builder.load(data_ptr), [length], inbounds=True))
+    builder.store(builder.add(length, one), length_ptr)
+
+    # CLOSE
+    builder.ret_void()
+
+
+def define_str_append(self, str_ptr):
+    # START
+    func_type = ir.FunctionType(type_map[VOID], [str_ptr, type_map[INT8].as_pointer(), type_map[INT]])
+    func = ir.Function(self.module, func_type, 'str.append')
+    func.args[0].name = 'self'
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    grow_block = func.append_basic_block('grow')
+    append_block = func.append_basic_block('append')
+    string, data, size = func.args
+
+    # BODY
+    length_ptr = builder.gep(string, [zero_32, zero_32], inbounds=True)
+    capacity_ptr = builder.gep(string, [zero_32, one_32], inbounds=True)
+    data_ptr = builder.gep(string, [zero_32, two_32], inbounds=True)
+    length = builder.load(length_ptr)
+    capacity = builder.load(capacity_ptr)
+    needed = builder.add(length, size)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN, needed, capacity), grow_block, append_block)
+
+    builder.position_at_end(grow_block)
+    doubled = builder.mul(capacity, two)
+    new_capacity = builder.select(builder.icmp_signed(LESS_THAN, doubled, needed), needed, doubled)
+    new_capacity = builder.select(builder.icmp_signed(LESS_THAN, new_capacity, ARRAY_INITIAL_CAPACITY),
+                                  ARRAY_INITIAL_CAPACITY, new_capacity)
+    builder.store(new_capacity, capacity_ptr)
+    builder.store(builder.call(self.module.get_global('realloc'), [builder.load(data_ptr), new_capacity]), data_ptr)
+    builder.branch(append_block)
+
+    builder.position_at_end(append_block)
+    memcpy(self, builder, builder.gep(builder.load(data_ptr), [length], inbounds=True), data, size)
+    builder.store(needed, length_ptr)
+
+    # CLOSE
+    builder.ret_void()
+
+
+def define_str_concat(self, str_ptr):
+    # START
+    func_type = ir.FunctionType(str_ptr, [str_ptr, str_ptr])
+    func = ir.Function(self.module, func_type, 'str.concat')
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    left, right = func.args
+
+    # BODY
+    left_length = builder.load(builder.gep(left, [zero_32, zero_32], inbounds=True))
+    left_data = builder.load(builder.gep(left, [zero_32, two_32], inbounds=True))
+    right_length = builder.load(builder.gep(right, [zero_32, zero_32], inbounds=True))
+    right_data = builder.load(builder.gep(right, [zero_32, two_32], inbounds=True))
+    length = builder.add(left_length, right_length)
+
+    string = builder.bitcast(builder.call(self.module.get_global('malloc'), [size_of(builder, str_ptr.pointee)]), str_ptr)
+    buffer = builder.call(self.module.get_global('malloc'), [length])
+    memcpy(self, builder, buffer, left_data, left_length)
+    memcpy(self, builder, builder.gep(buffer, [left_length], inbounds=True), right_data, right_length)
+    builder.store(length, builder.gep(string, [zero_32, zero_32], inbounds=True))
+    builder.store(length, builder.gep(string, [zero_32, one_32], inbounds=True))
+    builder.store(buffer, builder.gep(string, [zero_32, two_32], inbounds=True))
+
+    # CLOSE
+    builder.ret(string)
+
+
+def define_str_compare(self, str_ptr):
+    # START
+    func_type = ir.FunctionType(type_map[INT], [str_ptr, str_ptr])
+    func = ir.Function(self.module, func_type, 'str.compare')
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    differ_block = func.append_basic_block('differ')
+    same_prefix_block = func.append_basic_block('same_prefix')
+    left, right = func.args
+
+    # BODY
+    left_length = builder.load(builder.gep(left, [zero_32, zero_32], inbounds=True))
+    right_length = builder.load(builder.gep(right, [zero_32, zero_32], inbounds=True))
+    shorter = builder.select(builder.icmp_signed(LESS_THAN, left_length, right_length), left_length, right_length)
+    prefix = builder.call(self.module.get_global('memcmp'), [
+        builder.load(builder.gep(left, [zero_32, two_32], inbounds=True)),
+        builder.load(builder.gep(right, [zero_32, two_32], inbounds=True)),
+        shorter])
+    builder.cbranch(builder.icmp_signed(NOT_EQUALS, prefix, zero_32), differ_block, same_prefix_block)
+
+    builder.position_at_end(differ_block)
+    builder.ret(builder.sext(prefix, type_map[INT]))
+
+    # CLOSE
+    builder.position_at_end(same_prefix_block)
+    builder.ret(builder.sub(left_length, right_length))
+
+
+def define_str_hash(self, str_ptr):
+    # FNV-1a over the bytes of the string
+    # START
+    func_type = ir.FunctionType(type_map[INT], [str_ptr])
+    func = ir.Function(self.module, func_type, 'str.hash')
+    func.args[0].name = 'self'
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    test_block = func.append_basic_block('test')
+    body_block = func.append_basic_block('body')
+    exit_block = func.append_basic_block('exit')
+    hash_ptr = builder.alloca(type_map[INT])
     position_ptr = builder.alloca(type_map[INT])
+
+    # BODY
+    length = builder.load(builder.gep(func.args[0], [zero_32, zero_32], inbounds=True))
+    data = builder.load(builder.gep(func.args[0], [zero_32, two_32], inbounds=True))
+    builder.store(ir.Constant(type_map[INT], 0xcbf29ce484222325 - (1 << 64)), hash_ptr)
     builder.store(zero, position_ptr)
-    builder.branch(cond_block)
+    builder.branch(test_block)
 
-    builder.position_at_end(cond_block)
-    cond = builder.icmp_signed(LESS_THAN, builder.load(position_ptr), length)
-    builder.cbranch(cond, body_block, exit_block)
+    builder.position_at_end(test_block)
+    position = builder.load(position_ptr)
+    builder.cbranch(builder.icmp_signed(LESS_THAN, position, length), body_block, exit_block)
 
     builder.position_at_end(body_block)
-    char = builder.call(self.module.get_global('i64.array.get'), [builder.load(array_ptr), builder.load(position_ptr)])
-    builder.call(self.module.get_global('putchar'), [char])
-    add_one = builder.add(one, builder.load(position_ptr))
-    builder.store(add_one, position_ptr)
-    builder.branch(cond_block)
+    byte = builder.zext(builder.load(builder.gep(data, [position], inbounds=True)), type_map[INT])
+    mixed = builder.mul(builder.xor(builder.load(hash_ptr), byte), ir.Constant(type_map[INT], 0x100000001b3))
+    builder.store(mixed, hash_ptr)
+    builder.store(builder.add(position, one), position_ptr)
+    builder.branch(test_block)
 
     # CLOSE
     builder.position_at_end(exit_block)
-    builder.call(self.module.get_global('putchar'), [ten])
+    builder.ret(builder.load(hash_ptr))
+
+
+def define_print(self, str_ptr):
+    # START
+    func_type = ir.FunctionType(type_map[VOID], [str_ptr])
+    func = ir.Function(self.module, func_type, 'print')
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+
+    # BODY
+    length = builder.load(builder.gep(func.args[0], [zero_32, zero_32], inbounds=True))
+    data = builder.load(builder.gep(func.args[0], [zero_32, two_32], inbounds=True))
+    builder.call(self.module.get_global('stdout.write'), [data, length])
+    builder.call(self.module.get_global('stdout.write_byte'), [ir.Constant(type_map[INT8], 10)])
+
+    # CLOSE
     builder.ret_void()
 
 
-def define_int_to_str(self, dyn_array_ptr):
+def define_stdout(self):
+    # Program output goes through one buffer that is handed to write(2) whenever it fills,
+    # before reading input, and when the program exits
+    buffer_type = ir.ArrayType(type_map[INT8], STDOUT_BUFFER_SIZE)
+    buffer = ir.GlobalVariable(self.module, buffer_type, 'stdout.buffer')
+    buffer.linkage = 'private'
+    buffer.initializer = ir.Constant(buffer_type, None)
+    length = ir.GlobalVariable(self.module, type_map[INT], 'stdout.length')
+    length.linkage = 'private'
+    length.initializer = zero
+
+    define_stdout_flush(self, buffer, length)
+    define_stdout_write(self, buffer, length)
+    define_stdout_write_byte(self, buffer, length)
+    define_stdout_write_integer(self, 'stdout.write_int', signed=True)
+    define_stdout_write_integer(self, 'stdout.write_uint', signed=False)
+    define_stdout_write_double(self, buffer, length)
+
+
+def define_stdout_flush(self, buffer, length):
     # START
-    func_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, type_map[INT]])
-    func = ir.Function(self.module, func_type, '@int_to_str')
+    func_type = ir.FunctionType(type_map[VOID], [])
+    func = ir.Function(self.module, func_type, 'stdout.flush')
     entry_block = func.append_basic_block('entry')
     builder = ir.IRBuilder(entry_block)
     self.builder = builder
-    builder.position_at_end(entry_block)
+    test_block = func.append_basic_block('test')
+    write_block = func.append_basic_block('write')
     exit_block = func.append_basic_block('exit')
-    array_ptr = builder.alloca(dyn_array_ptr)
-    builder.store(func.args[0], array_ptr)
-    n_addr = builder.alloca(type_map[INT])
-    builder.store(func.args[1], n_addr)
-    x_addr = builder.alloca(type_map[INT])
+    written_ptr = builder.alloca(type_map[INT])
 
     # BODY
-    fourtyeight = ir.Constant(type_map[INT], 48)
+    builder.store(zero, written_ptr)
+    builder.branch(test_block)
 
-    div_ten = builder.sdiv(builder.load(n_addr), ten)
-    greater_than_zero = builder.icmp_signed(GREATER_THAN, div_ten, zero)
-    mod_ten = builder.srem(builder.trunc(builder.load(n_addr), type_map[INT]), ten)
-    builder.store(mod_ten, x_addr)
-    with builder.if_then(greater_than_zero):
-        builder.call(self.module.get_global('@int_to_str'), [builder.load(array_ptr), div_ten])
+    builder.position_at_end(test_block)
+    written = builder.load(written_ptr)
+    remaining = builder.sub(builder.load(length), written)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN, remaining, zero), write_block, exit_block)
 
-    char = builder.add(fourtyeight, builder.load(x_addr))
-    builder.call(self.module.get_global('i64.array.append'), [builder.load(array_ptr), char])
-    builder.branch(exit_block)
+    # write(2) may take fewer bytes than asked for; stop on an error rather than spin
+    builder.position_at_end(write_block)
+    data = builder.gep(buffer, [zero_32, written], inbounds=True)
+    result = builder.call(self.module.get_global('write'), [one_32, data, remaining])
+    builder.store(builder.add(written, result), written_ptr)
+    builder.cbranch(builder.icmp_signed(GREATER_THAN, result, zero), test_block, exit_block)
 
     # CLOSE
     builder.position_at_end(exit_block)
+    builder.store(zero, length)
     builder.ret_void()
 
 
-def define_bool_to_str(self, dyn_array_ptr):
+def define_stdout_write(self, buffer, length):
     # START
-    func_type = ir.FunctionType(type_map[VOID], [dyn_array_ptr, type_map[BOOL]])
-    func = ir.Function(self.module, func_type, '@bool_to_str')
+    func_type = ir.FunctionType(type_map[VOID], [type_map[INT8].as_pointer(), type_map[INT]])
+    func = ir.Function(self.module, func_type, 'stdout.write')
     entry_block = func.append_basic_block('entry')
     builder = ir.IRBuilder(entry_block)
     self.builder = builder
-    exit_block = func.append_basic_block('exit')
-    array_ptr = builder.alloca(dyn_array_ptr)
-    builder.store(func.args[0], array_ptr)
+    flush_block = func.append_basic_block('flush')
+    copy_block = func.append_basic_block('copy')
+    direct_block = func.append_basic_block('direct')
+    data, size = func.args
+    capacity = ir.Constant(type_map[INT], STDOUT_BUFFER_SIZE)
 
     # BODY
-    equalszero = builder.icmp_signed(EQUALS, func.args[1], ir.Constant(type_map[BOOL], 0))
-    dyn_array_append = self.module.get_global('i64.array.append')
+    fits = builder.icmp_signed(LESS_THAN_OR_EQUAL_TO, builder.add(builder.load(length), size), capacity)
+    builder.cbranch(fits, copy_block, flush_block)
+
+    builder.position_at_end(flush_block)
+    builder.call(self.module.get_global('stdout.flush'), [])
+    builder.cbranch(builder.icmp_signed(LESS_THAN_OR_EQUAL_TO, size, capacity), copy_block, direct_block)
+
+    # Anything larger than the whole buffer skips it
+    builder.position_at_end(direct_block)
+    builder.call(self.module.get_global('write'), [one_32, data, size])
+    builder.ret_void()
+
+    # CLOSE
+    builder.position_at_end(copy_block)
+    position = builder.load(length)
+    memcpy(self, builder, builder.gep(buffer, [zero_32, position], inbounds=True), data, size)
+    builder.store(builder.add(position, size), length)
+    builder.ret_void()
+
 
-    with builder.if_else(equalszero) as (then, otherwise):
+def define_stdout_write_byte(self, buffer, length):
+    # START
+    func_type = ir.FunctionType(type_map[VOID], [type_map[INT8]])
+    func = ir.Function(self.module, func_type, 'stdout.write_byte')
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    flush_block = func.append_basic_block('flush')
+    store_block = func.append_basic_block('store')
+
+    # BODY
+    full = builder.icmp_signed(EQUALS, builder.load(length), ir.Constant(type_map[INT], STDOUT_BUFFER_SIZE))
+    builder.cbranch(full, flush_block, store_block)
+
+    builder.position_at_end(flush_block)
+    builder.call(self.module.get_global('stdout.flush'), [])
+    builder.branch(store_block)
+
+    # CLOSE
+    builder.position_at_end(store_block)
+    position = builder.load(length)
+    builder.store(func.args[0], builder.gep(buffer, [zero_32, position], inbounds=True))
+    builder.store(builder.add(position, one), length)
+    builder.ret_void()
+
+
+def define_stdout_write_integer(self, name, signed):
+    # START
+    func_type = ir.FunctionType(type_map[VOID], [type_map[INT]])
+    func = ir.Function(self.module, func_type, name)
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    digit_block = func.append_basic_block('digit')
+    done_block = func.append_basic_block('done')
+    # 20 digits for the largest u64 and one more for a sign
+    digits = builder.alloca(ir.ArrayType(type_map[INT8], 21))
+    position_ptr = builder.alloca(type_map[INT])
+    value_ptr = builder.alloca(type_map[INT])
+
+    # BODY
+    value = func.args[0]
+    if signed:
+        negative = builder.icmp_signed(LESS_THAN, value, zero)
+        value = builder.select(negative, builder.neg(value), value)
+    builder.store(value, value_ptr)
+    builder.store(ir.Constant(type_map[INT], 21), position_ptr)
+    builder.branch(digit_block)
+
+    # Digits are produced last to first, filling the scratch array from its end
+    builder.position_at_end(digit_block)
+    value = builder.load(value_ptr)
+    position = builder.sub(builder.load(position_ptr), one)
+    digit = builder.trunc(builder.add(builder.urem(value, ten), ir.Constant(type_map[INT], 48)), type_map[INT8])
+    builder.store(digit, builder.gep(digits, [zero_32, position], inbounds=True))
+    builder.store(position, position_ptr)
+    value = builder.udiv(value, ten)
+    builder.store(value, value_ptr)
+    builder.cbranch(builder.icmp_unsigned(NOT_EQUALS, value, zero), digit_block, done_block)
+
+    # CLOSE
+    builder.position_at_end(done_block)
+    if signed:
+        with builder.if_then(negative):
+            position = builder.sub(builder.load(position_ptr), one)
+            builder.store(ir.Constant(type_map[INT8], 45), builder.gep(digits, [zero_32, position], inbounds=True))
+            builder.store(position, position_ptr)
+    position = builder.load(position_ptr)
+    builder.call(self.module.get_global('stdout.write'), [
+        builder.gep(digits, [zero_32, position], inbounds=True), builder.sub(ir.Constant(type_map[INT], 21), position)])
+    builder.ret_void()
+
+
+def define_stdout_write_double(self, buffer, length):
+    # START
+    func_type = ir.FunctionType(type_map[VOID], [type_map[DOUBLE]])
+    func = ir.Function(self.module, func_type, 'stdout.write_double')
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    flush_block = func.append_basic_block('flush')
+    format_block = func.append_basic_block('format')
+    room = ir.Constant(type_map[INT], DOUBLE_FORMAT_SIZE)
+
+    # BODY
+    free = builder.sub(ir.Constant(type_map[INT], STDOUT_BUFFER_SIZE), builder.load(length))
+    builder.cbranch(builder.icmp_signed(LESS_THAN, free, room), flush_block, format_block)
+
+    builder.position_at_end(flush_block)
+    builder.call(self.module.get_global('stdout.flush'), [])
+    builder.branch(format_block)
+
+    # CLOSE
+    builder.position_at_end(format_block)
+    position = builder.load(length)
+    written = builder.call(self.module.get_global('snprintf'), [
+        builder.gep(buffer, [zero_32, position], inbounds=True), room, self.cstring('%g'), func.args[0]])
+    builder.store(builder.add(position, builder.sext(written, type_map[INT])), length)
+    builder.ret_void()
+
+
+def define_int_to_str(self, str_ptr):
+    # Appends the decimal digits of a magnitude, after a '-' when negative is set. Callers
+    # widen any integer to i128. Digits are written right to left into a stack buffer, two
+    # per step from DIGIT_PAIRS. Only 64-bit divisions are used: i128 division would
+    # need a compiler-rt helper the JIT does not provide.
+    # START
+    lint128 = type_map[INT128]
+    func_type = ir.FunctionType(type_map[VOID], [str_ptr, lint128, type_map[BOOL]])
+    func = ir.Function(self.module, func_type, '@int_to_str')
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    wide_test_block = func.append_basic_block('wide_test')
+    wide_block = func.append_basic_block('wide')
+    pairs_test_block = func.append_basic_block('pairs_test')
+    pairs_block = func.append_basic_block('pairs')
+    last_pair_block = func.append_basic_block('last_pair')
+    sign_block = func.append_basic_block('sign')
+    exit_block = func.append_basic_block('exit')
+    digits = builder.alloca(ir.ArrayType(type_map[INT8], INT_TO_STR_SIZE))
+    position_ptr = builder.alloca(type_map[INT])
+    value_ptr = builder.alloca(lint128)
+    low_ptr = builder.alloca(type_map[INT])
+    string, magnitude, negative = func.args
+    pairs = self.global_string(DIGIT_PAIRS)
+    billion = ir.Constant(type_map[INT], 10 ** 9)
+    hundred = ir.Constant(type_map[INT], 100)
+    fourtyeight = ir.Constant(type_map[INT], 48)
+
+    def write_pair(pair):
+        position = builder.sub(builder.load(position_ptr), two)
+        memcpy(self, builder, builder.gep(digits, [zero_32, position], inbounds=True),
+               builder.gep(pairs, [builder.mul(pair, two)], inbounds=True), two)
+        builder.store(position, position_ptr)
+
+    def write_digit(digit):
+        position = builder.sub(builder.load(position_ptr), one)
+        builder.store(builder.trunc(builder.add(digit, fourtyeight), type_map[INT8]),
+                      builder.gep(digits, [zero_32, position], inbounds=True))
+        builder.store(position, position_ptr)
+
+    # BODY
+    builder.store(ir.Constant(type_map[INT], INT_TO_STR_SIZE), position_ptr)
+    builder.store(magnitude, value_ptr)
+    builder.branch(wide_test_block)
+
+    builder.position_at_end(wide_test_block)
+    value = builder.load(value_ptr)
+    high = builder.lshr(value, ir.Constant(lint128, 64))
+    builder.cbranch(builder.icmp_unsigned(NOT_EQUALS, high, ir.Constant(lint128, 0)), wide_block, pairs_test_block)
+
+    # Peel nine zero-padded digits off a value wider than 64 bits by long division of its
+    # 32-bit limbs by 10^9, which keeps every partial dividend below 2^62
+    builder.position_at_end(wide_block)
+    remainder = zero
+    quotient = ir.Constant(lint128, 0)
+    for shift in (96, 64, 32, 0):
+        limb = builder.trunc(builder.lshr(value, ir.Constant(lint128, shift)), type_map[INT32])
+        dividend = builder.or_(builder.shl(remainder, ir.Constant(type_map[INT], 32)), builder.zext(limb, type_map[INT]))
+        limb_quotient = builder.udiv(dividend, billion)
+        remainder = builder.urem(dividend, billion)
+        quotient = builder.or_(quotient, builder.shl(builder.zext(limb_quotient, lint128), ir.Constant(lint128, shift)))
+    builder.store(quotient, value_ptr)
+    chunk = remainder
+    for _ in range(4):
+        next_chunk = builder.udiv(chunk, hundred)
+        write_pair(builder.sub(chunk, builder.mul(next_chunk, hundred)))
+        chunk = next_chunk
+    write_digit(chunk)
+    builder.branch(wide_test_block)
+
+    builder.position_at_end(pairs_test_block)
+    builder.store(builder.trunc(value, type_map[INT]), low_ptr)
+    low = builder.load(low_ptr)
+    builder.cbranch(builder.icmp_unsigned(GREATER_THAN_OR_EQUAL_TO, low, hundred), pairs_block, last_pair_block)
+
+    builder.position_at_end(pairs_block)
+    low = builder.load(low_ptr)
+    rest = builder.udiv(low, hundred)
+    write_pair(builder.sub(low, builder.mul(rest, hundred)))
+    builder.store(rest, low_ptr)
+    builder.cbranch(builder.icmp_unsigned(GREATER_THAN_OR_EQUAL_TO, rest, hundred), pairs_block, last_pair_block)
+
+    builder.position_at_end(last_pair_block)
+    low = builder.load(low_ptr)
+    with builder.if_else(builder.icmp_unsigned(GREATER_THAN_OR_EQUAL_TO, low, ten)) as (then, otherwise):
         with then:
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 102)])
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 97)])
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 108)])
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 115)])
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 101)])
+            write_pair(low)
         with otherwise:
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 116)])
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 114)])
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 117)])
-            builder.call(dyn_array_append, [builder.load(array_ptr), ir.Constant(type_map[INT], 101)])
+            write_digit(low)
+    builder.cbranch(negative, sign_block, exit_block)
 
+    builder.position_at_end(sign_block)
+    position = builder.sub(builder.load(position_ptr), one)
+    builder.store(ir.Constant(type_map[INT8], 45), builder.gep(digits, [zero_32, position], inbounds=True))
+    builder.store(position, position_ptr)
     builder.branch(exit_block)
 
     # CLOSE
     builder.position_at_end(exit_block)
+    position = builder.load(position_ptr)
+    builder.call(self.module.get_global('str.append'), [
+        string, builder.gep(digits, [zero_32, position], inbounds=True),
+        builder.sub(ir.Constant(type_map[INT], INT_TO_STR_SIZE), position)])
     builder.ret_void()
+
+
+def define_bool_to_str(self, str_ptr):
+    # START
+    func_type = ir.FunctionType(str_ptr, [type_map[BOOL]])
+    func = ir.Function(self.module, func_type, '@bool_to_str')
+    entry_block = func.append_basic_block('entry')
+    builder = ir.IRBuilder(entry_block)
+    self.builder = builder
+    false_block = func.append_basic_block('false')
+    true_block = func.append_basic_block('true')
+
+    # BODY
+    equalszero = builder.icmp_signed(EQUALS, func.args[0], ir.Constant(type_map[BOOL], 0))
+    builder.cbranch(equalszero, false_block, true_block)
+
+    builder.position_at_end(false_block)
+    builder.ret(builder.call(self.module.get_global('str.new'), [self.global_string(b'false'), ir.Constant(type_map[INT], 5)]))
+
+    # CLOSE
+    builder.position_at_end(true_block)
+    builder.ret(builder.call(self.module.get_global('str.new'), [self.global_string(b'true'), ir.Constant(type_map[INT], 4)]))
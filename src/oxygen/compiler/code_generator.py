@@ -1,5 +1,6 @@
 import os
 import subprocess
+from collections import Counter
 from ctypes import CFUNCTYPE, c_void_p
 from decimal import Decimal
 from math import inf
@@ -9,15 +10,16 @@ from typing import Optional
 import llvmlite.binding as llvm
 from llvmlite import ir
 
-from oxygen.oxyast import OxyCollectionAccess, OxyDotAccess, OxyInputStmt, OxyStr, OxyVarDecl
+from oxygen.oxyast import (OxyAssign, OxyCollection, OxyCollectionAccess, OxyDotAccess, OxyForExpr, OxyIncrementAssign,
+                           OxyInputStmt, OxyMethodCall, OxyNum, OxyOpAssign, OxyStr, OxyVar, OxyVarDecl)
 from oxygen.compiler.base import RET_VAR, type_map
-from oxygen.compiler.builtins import (array_types, create_dynamic_array_methods,
-                                      define_builtins)
-from oxygen.compiler.operations import binary_op, cast_ops, unary_op
+from oxygen.compiler.builtins import (ARRAY_INITIAL_CAPACITY, NON_SHRINKING_METHODS, array_types,
+                                      create_dynamic_array_methods, define_builtins, memcpy, size_of)
+from oxygen.compiler.operations import binary_op, cast_ops, float_power, int_power, int_to_str, unary_op
 from oxygen.grammar import *
 from oxygen.type_checker import types_compatible
 from oxygen.utils import *
-from oxygen.visitor import OxyNodeVisitor
+from oxygen.visitor import OxyCollectionSymbol, OxyNodeVisitor
 
 
 class OxyCodeGenerator(OxyNodeVisitor):
@@ -26,6 +28,8 @@ class OxyCodeGenerator(OxyNodeVisitor):
         self.file_name = file_name
         self.module = ir.Module()
         self.builder = None
+        self.constant_pool = {}
+        self.operators = {}
         self._add_builtins()
         # [type_map[INT32], type_map[INT8].as_pointer().as_pointer()])
         func_ty = ir.FunctionType(ir.IntType(64), [])
@@ -42,6 +46,14 @@ class OxyCodeGenerator(OxyNodeVisitor):
         self.loop_end_blocks = []
         self.is_break = False
         self.anon_counter = 0
+        # Bounds check elision: how often each name is rebound, the minimum
+        # length of arrays bound once to a literal, and the constant
+        # (start, stop) of range loop variables, keyed by their allocas
+        self.write_counts = Counter()
+        self.confined_tuples = set()
+        self.array_lengths = {}
+        self.index_ranges = {}
+        self.bounds_error_blocks = {}
 
         llvm.initialize()
         llvm.initialize_native_target()
@@ -56,10 +68,10 @@ class OxyCodeGenerator(OxyNodeVisitor):
             self.visit(stat)
         self.branch(self.exit_blocks[0])
         self.position_at_end(self.exit_blocks[0])
+        self.call('stdout.flush', [])
         self.builder.ret(self.const(0))
 
-    @staticmethod
-    def visit_num(node):
+    def visit_num(self, node):
         return ir.Constant(type_map[node.val_type], node.value)
 
     def visit_var(self, node):
@@ -72,7 +84,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
         return binary_op(self, node)
 
     def visit_defer(self, node):
-        self.defer_stack[-1].append(node.parse_stmt)
+        self.defer_stack[-1].append(node.statement)
 
     def visit_anonymousfunc(self, node):
         self.anon_counter += 1
@@ -86,10 +98,10 @@ class OxyCodeGenerator(OxyNodeVisitor):
         self.externfuncdecl(node.name, node)
 
     def externfuncdecl(self, name, node):
-        for func in self.module.functions:
-            if func.name == name:
-                self.define(name, func, 1)
-                return
+        func = self.get_function(name)
+        if func is not None:
+            self.define(name, func, 1)
+            return
         return_type = node.return_type
         parameters = node.parameters
         varargs = node.varargs
@@ -110,9 +122,12 @@ class OxyCodeGenerator(OxyNodeVisitor):
         else:
             self.start_function(name, node.return_type, node.parameters,
                                 node.parameter_defaults, node.varargs, linkage)
+        if getattr(node, 'operator', None) is not None:
+            # Registered before the body is built so overloads can recurse like any other function
+            self.operators[(node.operator,) + tuple(arg.type for arg in self.current_function.args)] = self.current_function
 
-        for i, arg in enumerate(self.current_function.args):
-            arg.name = list(node.parameters.keys())[i]
+        for arg, param_name in zip(self.current_function.args, node.parameters):
+            arg.name = param_name
 
             # TODO: a bit hacky, cannot handle pointers atm but we need them for class reference
             if arg.name == SELF and isinstance(arg.type, ir.PointerType):
@@ -166,8 +181,8 @@ class OxyCodeGenerator(OxyNodeVisitor):
             for x, arg in enumerate(func_type.args):
                 if x == 0:
                     continue
-                if x < len(node.arguments):
-                    args.append(self.visit(node.arguments[x]))
+                if x <= len(node.arguments):
+                    args.append(self.visit(node.arguments[x - 1]))
                 else:
                     if node.named_arguments and arg_names[x] in node.named_arguments:
                         args.append(self.comp_cast(
@@ -193,7 +208,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
             args = []
             for i, arg in enumerate(node.arguments):
                 args.append(self.comp_cast(
-                    self.visit(arg), func_type.args[i], node))
+                    self.visit(arg), func_type.args[i + 1], node))
 
         args.insert(0, obj)
         return self.builder.call(func, args)
@@ -261,6 +276,18 @@ class OxyCodeGenerator(OxyNodeVisitor):
             return self.builder.call(name, args)
         return self.call(name, args)
 
+    def resolved_item_type(self, node):
+        # Element type the Preprocessor resolved for a collection access or iterated collection
+        resolved = node.resolved
+        if isinstance(resolved, OxyCollectionSymbol):
+            resolved = resolved.item_types
+        item_type = str(resolved)
+        if item_type in type_map:
+            return type_map[item_type]
+        # Mixed literals such as [a, 3] resolve to any, which has no IR type of its own
+        item_type = self.search_scopes(item_type)
+        return item_type if isinstance(item_type, ir.Type) else None
+
     def comp_cast(self, arg, typ, node):
         if types_compatible(str(arg.type), typ):
             return cast_ops(self, arg, typ, node)
@@ -340,13 +367,10 @@ class OxyCodeGenerator(OxyNodeVisitor):
 
     def visit_incrementassign(self, node):
         collection_access = None
-        key = None
         if isinstance(node.left, OxyCollectionAccess):
             collection_access = True
-            var_name = self.search_scopes(node.left.collection.value)
-            array_type = str(var_name.type.pointee.elements[-1].pointee)
-            key = self.const(node.left.key.value)
-            var = self.call('{}.array.get'.format(array_type), [var_name, key])
+            element = self.collection_element(node.left)
+            var = self.load(element)
             pointee = var.type
         else:
             var_name = node.left.value
@@ -369,7 +393,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
             raise NotImplementedError()
 
         if collection_access:
-            self.call('{}.array.set'.format(array_type), [var_name, key, res])
+            self.builder.store(res, element)
         else:
             self.store(res, var_name)
 
@@ -380,7 +404,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
             self.define(node.name, self.search_scopes(node.collection.value))
         return TYPE
 
-    def visit_Oxyvardecl(self, node):
+    def visit_vardecl(self, node):
         typ = self.get_type(node.type)
         if node.type.value == FUNC:
             func_ret_type = self.get_type(node.type.func_ret_type)
@@ -391,15 +415,18 @@ class OxyCodeGenerator(OxyNodeVisitor):
             self.alloc_and_define(node.value.value, typ)
         elif node.type.value in (LIST, TUPLE):
             array_type = self.get_type(node.type.func_params['0'])
-            self.create_array(array_type)
+            array = self.create_array(array_type)
             typ = self.search_scopes('{}.array'.format(array_type))
-            self.alloc_and_define(node.value.value, typ)
+            self.alloc_define_store(self.load(array), node.value.value, typ)
         else:
             self.alloc_and_define(node.value.value, typ)
 
     def visit_type(self, node):
         return type_map[node.value] if node.value in type_map else self.search_scopes(node.value)
 
+    def visit_void(self, _):
+        return type_map[VOID]
+
     def visit_if(self, node):
         start_block = self.add_block('if.start')
         end_block = self.add_block('if.end')
@@ -425,7 +452,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
             self.is_break = False
 
     def visit_else(self, _):
-        return self.builder.icmp_signed(EQUALS, self.const(1), self.const(1), 'cmptmp')
+        return self.const(1, BOOL)
 
     def visit_while(self, node):
         cond_block = self.add_block('while.cond')
@@ -448,6 +475,8 @@ class OxyCodeGenerator(OxyNodeVisitor):
         self.loop_end_blocks.pop()
 
     def visit_for(self, node):
+        if node.iterator.value == RANGE:
+            return self.range_for(node)
         init_block = self.add_block('for.init')
         zero_length_block = self.add_block('for.zero_length')
         non_zero_length_block = self.add_block('for.non_zero_length')
@@ -461,16 +490,12 @@ class OxyCodeGenerator(OxyNodeVisitor):
         self.position_at_end(init_block)
         zero = self.const(0)
         one = self.const(1)
-        array_type = None
-        if node.iterator.value == RANGE:
-            iterator = self.alloc_and_store(
-                self.visit(node.iterator), type_map[STR])
-            array_type = "i64"
-        else:
-            iterator = self.search_scopes(node.iterator.value)
-            array_type = str(iterator.type.pointee.elements[-1].pointee)
+        iterator = self.search_scopes(node.iterator.value)
+        item_type = self.resolved_item_type(node.iterator)
+        # position stays below the length read here unless the body rebinds or shrinks the array
+        checked = node.iterator.value in set(self.written_names(node.block))
 
-        stop = self.call('{}.array.length'.format(array_type), [iterator])
+        stop = self.array_length(iterator)
         self.branch(zero_length_block)
 
         self.position_at_end(zero_length_block)
@@ -479,9 +504,8 @@ class OxyCodeGenerator(OxyNodeVisitor):
 
         self.position_at_end(non_zero_length_block)
         varname = node.elements[0].value
-        val = self.call('{}.array.get'.format(array_type), [iterator, zero])
-        self.alloc_define_store(
-            val, varname, iterator.type.pointee.elements[2].pointee)
+        val = self.load(self.array_element(iterator, zero, checked=False))
+        self.alloc_define_store(val, varname, item_type or val.type)
         position = self.alloc_define_store(zero, 'position', type_map[INT])
         self.branch(cond_block)
 
@@ -490,8 +514,50 @@ class OxyCodeGenerator(OxyNodeVisitor):
         self.cbranch(cond, body_block, end_block)
 
         self.position_at_end(body_block)
-        self.store(self.call('{}.array.get'.format(array_type),
-                             [iterator, self.load(position)]), varname)
+        self.store(self.load(self.array_element(iterator, self.load(position), checked)), varname)
+        self.store(self.builder.add(one, self.load(position)), position)
+        self.visit(node.block)
+        if not self.is_break:
+            self.branch(cond_block)
+        else:
+            self.is_break = False
+
+        self.position_at_end(end_block)
+        self.loop_test_blocks.pop()
+        self.loop_end_blocks.pop()
+
+    def range_for(self, node):
+        # A range iterated by a for loop is never materialized: the loop
+        # variable is the induction variable itself
+        init_block = self.add_block('for.init')
+        cond_block = self.add_block('for.cond')
+        body_block = self.add_block('for.body')
+        end_block = self.add_block('for.end')
+        self.loop_test_blocks.append(cond_block)
+        self.loop_end_blocks.append(end_block)
+        self.branch(init_block)
+
+        self.position_at_end(init_block)
+        one = self.const(1)
+        start = self.visit(node.iterator.left)
+        stop = self.visit(node.iterator.right)
+        varname = node.elements[0].value
+        var_addr = self.alloc_define_store(start, varname, type_map[INT])
+        left, right = node.iterator.left, node.iterator.right
+        # The range only holds inside the body; afterwards the variable keeps its last (or start) value
+        if isinstance(left, OxyNum) and isinstance(right, OxyNum) and isinstance(left.value, int) and \
+                isinstance(right.value, int) and left.value < right.value and \
+                varname not in set(self.written_names(node.block)):
+            self.index_ranges[var_addr] = (left.value, right.value)
+        position = self.alloc_define_store(start, 'position', type_map[INT])
+        self.branch(cond_block)
+
+        self.position_at_end(cond_block)
+        cond = self.builder.icmp_signed(LESS_THAN, self.load(position), stop)
+        self.cbranch(cond, body_block, end_block)
+
+        self.position_at_end(body_block)
+        self.store(self.load(position), varname)
         self.store(self.builder.add(one, self.load(position)), position)
         self.visit(node.block)
         if not self.is_break:
@@ -500,6 +566,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
             self.is_break = False
 
         self.position_at_end(end_block)
+        self.index_ranges.pop(var_addr, None)
         self.loop_test_blocks.pop()
         self.loop_end_blocks.pop()
 
@@ -538,6 +605,9 @@ class OxyCodeGenerator(OxyNodeVisitor):
                 switch.add_case(self.visit(case.value), cases[x])
         self.position_at_end(switch_end_block)
 
+    def visit_case(self, node):
+        return self.visit(node.block)
+
     def visit_fallthrough(self, node):
         if 'case' in self.builder.block.name:
             return FALLTHROUGH
@@ -556,8 +626,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
         self.is_break = True
         return self.branch(self.loop_test_blocks[-1])
 
-    @staticmethod
-    def visit_pass(_):
+    def visit_pass(self, _):
         return
 
     def visit_unaryop(self, node):
@@ -592,7 +661,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
                 if node.left.type.value in (LIST, TUPLE):
                     var_type = type_map[list(node.left.type.func_params.items())[
                         0][1].value]
-                    self.alloc_define_store(var, var_name, var.type)
+                    self.note_array_length(self.alloc_define_store(var, var_name, var.type), var_name, node.right)
                 else:
                     var_type = type_map[node.left.type.value]
                     if not var.type.is_pointer:
@@ -615,11 +684,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
                     obj, [self.const(0, width=INT32), self.const(idx, width=INT32)], inbounds=True)
                 self.builder.store(self.visit(node.right), elem)
             elif isinstance(node.left, OxyCollectionAccess):
-                right = self.visit(node.right)
-                array_type = str(self.search_scopes(
-                    node.left.collection.value).type.pointee.elements[-1].pointee)
-                self.call('{}.array.set'.format(array_type), [self.search_scopes(
-                    node.left.collection.value), self.const(node.left.key.value), right])
+                self.builder.store(var, self.collection_element(node.left))
             else:
                 var_name = node.left.value
                 var_value = self.top_scope.get(var_name)
@@ -630,7 +695,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
                 elif isinstance(var, ir.Function):
                     self.define(var_name, var)
                 else:
-                    self.alloc_define_store(var, var_name, var.type)
+                    self.note_array_length(self.alloc_define_store(var, var_name, var.type), var_name, node.right)
 
     def visit_fieldassignment(self, node):
         obj = self.search_scopes(node.obj)
@@ -639,7 +704,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
 
     def class_assign(self, node):
         class_type = self.search_scopes(node.name)
-        _class = self.builder.alloca(class_type)
+        _class = self.allocate(class_type)
 
         for func in class_type.methods:
             if func.name.split(".")[-1] == 'new':
@@ -649,7 +714,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
 
     def struct_assign(self, node):
         struct_type = self.search_scopes(node.name)
-        struct = self.builder.alloca(struct_type)
+        struct = self.allocate(struct_type)
 
         fields = set()
         for index, field in struct_type.defaults.items():
@@ -676,10 +741,10 @@ class OxyCodeGenerator(OxyNodeVisitor):
         struct.name = node.name
         return struct
 
-    def visit_Oxydotaccess(self, node):
+    def visit_dotaccess(self, node):
         obj = self.search_scopes(node.obj)
         if obj.type == ENUM:
-            enum = self.builder.alloca(obj)
+            enum = self.allocate(obj)
             idx = obj.fields.index(node.field)
             val = self.builder.gep(
                 enum, [self.const(0, width=INT32), self.const(0, width=INT32)], inbounds=True)
@@ -692,20 +757,17 @@ class OxyCodeGenerator(OxyNodeVisitor):
     def visit_opassign(self, node):
         right = self.visit(node.right)
         collection_access = None
-        key = None
         if isinstance(node.left, OxyCollectionAccess):
             collection_access = True
-            var_name = self.search_scopes(node.left.collection.value)
-            array_type = str(self.search_scopes(
-                node.left.collection.value).type.pointee.elements[-1].pointee)
-            key = self.const(node.left.key.value)
-            var = self.call('{}.array.get'.format(array_type), [var_name, key])
+            element = self.collection_element(node.left)
+            var = self.load(element)
             pointee = var.type
         else:
             var_name = node.left.value
             var = self.load(var_name)
             pointee = self.search_scopes(var_name).type.pointee
         op = node.op
+        exponent = right
         right = cast_ops(self, right, var.type, node)
         if isinstance(pointee, ir.IntType):
             if op == PLUS_ASSIGN:
@@ -729,16 +791,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
                 right = cast_ops(self, right, var.type, node)
                 res = self.builder.srem(var, right)
             elif op == POWER_ASSIGN:
-                if not isinstance(node.right.value, int):
-                    error('Cannot use non-integers for power coeficient')
-                    # TODO: Send me to typechecker and check for binop as well
-
-                right = cast_ops(self, right, var.type, node)
-                temp = self.alloc_and_store(var, type_map[INT])
-                for _ in range(node.right.value - 1):
-                    res = self.builder.mul(self.load(temp), var)
-                    self.store(res, temp)
-                res = self.load(temp)
+                res = int_power(self, var, right, node)
             else:
                 raise NotImplementedError()
         elif isinstance(pointee, ir.DoubleType) or isinstance(pointee, ir.FloatType):
@@ -763,19 +816,14 @@ class OxyCodeGenerator(OxyNodeVisitor):
                 right = cast_ops(self, right, var.type, node)
                 res = self.builder.frem(var, right)
             elif op == POWER_ASSIGN:
-                right = cast_ops(self, right, var.type, node)
-                temp = self.alloc_and_store(var, type_map[DOUBLE])
-                for _ in range(node.right.value - 1):
-                    res = self.builder.fmul(self.load(temp), var)
-                    self.store(res, temp)
-                res = self.load(temp)
+                res = float_power(self, var, exponent, node)
             else:
                 raise NotImplementedError()
         else:
             raise NotImplementedError()
 
         if collection_access:
-            self.call('{}.array.set'.format(array_type), [var_name, key, res])
+            self.builder.store(res, element)
         else:
             self.store(res, var_name)
 
@@ -806,13 +854,28 @@ class OxyCodeGenerator(OxyNodeVisitor):
             array_type = type_map[node.items[0].val_type]
         else:
             array_type = self.visit(node.items[0]).type
-        array_ptr = self.create_array(array_type)
+        array_ptr = self.create_array(array_type, len(elements))
+        if all(isinstance(element, ir.Constant) and element.type == array_type for element in elements):
+            # One copy of the whole table, leading unused slot included, instead of an append per element
+            table = self.constant_table(array_type, elements)
+            data = self.load(self.gep(array_ptr, [self.const(0, width=INT32), self.const(2, width=INT32)], inbounds=True))
+            memcpy(self, self.builder, self.builder.bitcast(data, type_map[INT8].as_pointer()),
+                   table.bitcast(type_map[INT8].as_pointer()), size_of(self.builder, table.type.pointee))
+            self.builder.store(self.const(len(elements)),
+                               self.gep(array_ptr, [self.const(0, width=INT32), self.const(0, width=INT32)], inbounds=True))
+            return self.load(array_ptr)
+
         for element in elements:
             self.call('{}.array.append'.format(
                 str(array_type)), [array_ptr, element])
         return self.load(array_ptr)
 
-    def create_array(self, array_type):
+    def constant_table(self, array_type, elements):
+        # Private constant global laid out like the data of a dynamic array holding elements
+        table = ir.Constant(ir.ArrayType(array_type, len(elements) + 1), [ir.Constant(array_type, None)] + elements)
+        return self.global_constant(table, 'table')
+
+    def array_struct(self, array_type):
         dyn_array_type = self.module.context.get_identified_type(
             '{}.array'.format(str(array_type)))
         if self.search_scopes('{}.array'.format(str(array_type))) is None:
@@ -821,12 +884,19 @@ class OxyCodeGenerator(OxyNodeVisitor):
             dyn_array_type.set_body(
                 type_map[INT], type_map[INT], array_type.as_pointer())
             self.define('{}.array'.format(str(array_type)), dyn_array_type)
+        create_dynamic_array_methods(self, array_type)
+        return dyn_array_type
 
+    def create_array(self, array_type, capacity=None):
+        dyn_array_type = self.array_struct(array_type)
         array = dyn_array_type([self.const(0), self.const(
             0), self.const(0).inttoptr(array_type.as_pointer())])
         array = self.alloc_and_store(array, dyn_array_type)
-        create_dynamic_array_methods(self, array_type)
-        self.call('{}.array.init'.format(str(array_type)), [array])
+        if capacity is None:
+            capacity = ARRAY_INITIAL_CAPACITY
+        else:
+            capacity = self.const(capacity)
+        self.call('{}.array.init'.format(str(array_type)), [array, capacity])
         return array
 
     def define_tuple(self, node, elements):
@@ -834,7 +904,14 @@ class OxyCodeGenerator(OxyNodeVisitor):
             array_type = type_map[node.items[0].val_type]
         else:
             array_type = self.visit(node.items[0]).type
-        array_ptr = self.create_array(array_type)
+        if node in self.confined_tuples and \
+                all(isinstance(element, ir.Constant) and element.type == array_type for element in elements):
+            # Nothing can write to or resize a confined tuple, so it can point straight at the constant table
+            table = self.constant_table(array_type, elements)
+            data = table.gep([self.const(0, width=INT32), self.const(0, width=INT32)])
+            return self.array_struct(array_type)([self.const(len(elements)), self.const(len(elements)), data])
+
+        array_ptr = self.create_array(array_type, len(elements))
         for element in elements:
             self.call('{}.array.append'.format(
                 str(array_type)), [array_ptr, element])
@@ -843,74 +920,166 @@ class OxyCodeGenerator(OxyNodeVisitor):
     def visit_hashmap(self, node):
         raise NotImplementedError
 
-    def visit_Oxycollectionaccess(self, node):
-        key = self.visit(node.key)
+    def visit_collectionaccess(self, node):
         collection = self.search_scopes(node.collection.value)
         for typ in array_types:
             if collection.type.pointee == self.search_scopes('{}.array'.format(typ)):
-                return self.call('{}.array.get'.format(typ), [collection, key])
+                return self.load(self.collection_element(node))
 
-        return self.builder.extract_value(self.load(collection.name), [key])
+        return self.builder.extract_value(self.load(collection.name), [self.visit(node.key)])
+
+    def collection_element(self, node):
+        collection = self.search_scopes(node.collection.value)
+        key = self.visit(node.key)
+        return self.array_element(collection, key, checked=not self.index_in_bounds(collection, node.key))
+
+    def array_element(self, array, index, checked=True):
+        # Elements are stored one past their index, see <T>.array.append
+        if checked:
+            size = self.array_length(array)
+            negative = self.builder.icmp_signed(LESS_THAN, index, self.const(0))
+            index = self.builder.select(negative, self.builder.add(size, index), index)
+            in_bounds = self.builder.icmp_unsigned(LESS_THAN, index, size)
+            element_block = self.add_block('array.element')
+            self.cbranch(in_bounds, element_block, self.bounds_error_block())
+            self.position_at_end(element_block)
+        data = self.load(self.gep(array, [self.const(0, width=INT32), self.const(2, width=INT32)], inbounds=True))
+        return self.gep(data, [self.builder.add(index, self.const(1))], inbounds=True)
+
+    def array_length(self, array):
+        return self.load(self.gep(array, [self.const(0, width=INT32), self.const(0, width=INT32)], inbounds=True))
+
+    def bounds_error_block(self):
+        block = self.bounds_error_blocks.get(self.current_function)
+        if block is None:
+            current_block = self.builder.block
+            block = self.add_block('index_out_of_bounds')
+            self.position_at_end(block)
+            self.runtime_error('Array index out of bounds')
+            self.position_at_end(current_block)
+            self.bounds_error_blocks[self.current_function] = block
+        return block
+
+    def index_in_bounds(self, array, key):
+        length = self.array_lengths.get(array)
+        if length is None:
+            return False
+        if isinstance(key, OxyNum):
+            return isinstance(key.value, int) and 0 <= key.value < length
+        if isinstance(key, OxyVar):
+            bounds = self.index_ranges.get(self.search_scopes(key.value))
+            return bounds is not None and 0 <= bounds[0] and bounds[1] <= length
+        return False
+
+    def note_array_length(self, array, name, value):
+        if isinstance(value, OxyCollection) and self.write_counts[name] == 1:
+            self.array_lengths[array] = len(value.items)
+
+    @staticmethod
+    def written_names(node):
+        # Names that may be rebound or shrunk anywhere under node
+        for child in node.walk():
+            if isinstance(child, (OxyAssign, OxyOpAssign, OxyIncrementAssign)):
+                target = child.left.value if isinstance(child.left, OxyVarDecl) else child.left
+                if isinstance(target, OxyVar):
+                    yield target.value
+            elif isinstance(child, OxyForExpr):
+                for element in child.elements:
+                    yield element.value
+            elif isinstance(child, OxyMethodCall) and child.name not in NON_SHRINKING_METHODS:
+                yield child.obj
+
+    def find_confined_tuples(self, node):
+        # Tuple literals bound once to a name that is only ever indexed, iterated or sent tuple
+        # methods; any other use of the name could hand the buffer to code that resizes it
+        bound = {}
+        uses = Counter()
+        confined_uses = Counter()
+        for child in node.walk():
+            if isinstance(child, OxyVar):
+                uses[child.value] += 1
+            elif isinstance(child, OxyAssign):
+                target = child.left.value if isinstance(child.left, OxyVarDecl) else child.left
+                if isinstance(target, OxyVar):
+                    confined_uses[target.value] += 1
+                    if isinstance(child.right, OxyCollection) and child.right.type == TUPLE:
+                        bound[target.value] = child.right
+            elif isinstance(child, OxyCollectionAccess) and isinstance(child.collection, OxyVar):
+                confined_uses[child.collection.value] += 1
+            elif isinstance(child, OxyForExpr) and isinstance(child.iterator, OxyVar):
+                confined_uses[child.iterator.value] += 1
+        return {literal for name, literal in bound.items()
+                if self.write_counts[name] == 1 and uses[name] == confined_uses[name]}
 
     def visit_str(self, node):
-        array = self.create_array(type_map[INT])
         string = node.value.encode('utf-8')
-        for char in string:
-            self.call('i64.array.append', [array, self.const(char)])
-        return array
+        return self.call('str.new', [self.global_string(string), self.const(len(string))])
+
+    def global_string(self, data):
+        # Pointer to the bytes of data in the module's pooled constants
+        array = ir.Constant(ir.ArrayType(type_map[INT8], len(data)), bytearray(data))
+        return self.global_constant(array, 'str').gep([self.const(0, width=INT32), self.const(0, width=INT32)])
+
+    def global_constant(self, value, name):
+        # The module's one private constant global initialized to value
+        key = str(value)
+        constant = self.constant_pool.get(key)
+        if constant is None:
+            constant = ir.GlobalVariable(self.module, value.type, self.module.get_unique_name(name))
+            constant.global_constant = True
+            constant.unnamed_addr = True
+            constant.linkage = 'private'
+            constant.initializer = value
+            self.constant_pool[key] = constant
+        return constant
+
+    def cstring(self, string):
+        return self.global_string(string.encode('utf-8') + b'\0')
 
     def visit_print(self, node):
         if node.value:
             val = self.visit(node.value)
         else:
-            self.call('putchar', [ir.Constant(type_map[INT32], 10)])
+            self.call('stdout.write_byte', [self.const(10, width=INT8)])
             return
         if isinstance(val.type, ir.IntType):
             if val.type.width == 1:
-                array = self.create_array(type_map[INT])
-                self.call('@bool_to_str', [array, val])
-                val = array
-            else:
-                if int(str(val.type).split("i")[1]) == 8:
-                    self.print_num("%c", val)
-                elif val.type.signed:
-                    if int(str(val.type).split("i")[1]) < 32:
-                        val = self.builder.sext(val, type_map[INT32])
-                        self.print_num("%d", val)
-                    elif int(str(val.type).split("i")[1]) == 32:
-                        self.print_num("%d", val)
-                    else:
-                        self.print_num("%lld", val)
-                else:
-                    if int(str(val.type).split("i")[1]) <= 32:
-                        self.print_num("%u", val)
-                    else:
-                        self.print_num("%llu", val)
+                text = self.builder.select(val, self.global_string(b'true\n'), self.global_string(b'false\n'))
+                self.call('stdout.write', [text, self.builder.select(val, self.const(5), self.const(6))])
+                return
+            elif val.type.width == 8:
+                self.call('stdout.write_byte', [val])
+            elif val.type.width > 64:
+                # Too wide for the buffered integer writers, so format it and free the temporary string
+                string = int_to_str(self, val)
+                self.call('print', [string])
+                data = self.builder.gep(string, [self.const(0, width=INT32), self.const(2, width=INT32)], inbounds=True)
+                self.call('free', [self.builder.load(data)])
+                self.call('free', [self.builder.bitcast(string, type_map[INT8].as_pointer())])
                 return
+            else:
+                signed = val.type.signed
+                if val.type.width < 64:
+                    val = self.builder.sext(val, type_map[INT]) if signed else self.builder.zext(val, type_map[INT])
+                self.call('stdout.write_int' if signed else 'stdout.write_uint', [val])
         elif isinstance(val.type, (ir.FloatType, ir.DoubleType)):
             if isinstance(val.type, ir.FloatType):
                 val = cast_ops(self, val, ir.DoubleType(), node)
-            self.print_num("%g", val)
+            self.call('stdout.write_double', [val])
+        else:
+            self.call('print', [val])
             return
-        self.call('print', [val])
+        self.call('stdout.write_byte', [self.const(10, width=INT8)])
 
     def print_string(self, string):
-        stringz = self.stringz(string)
-        str_ptr = self.alloc_and_store(stringz, ir.ArrayType(
-            stringz.type.element, stringz.type.count))
-        str_ptr = self.gep(str_ptr, [self.const(0), self.const(0)])
-        str_ptr = self.builder.bitcast(str_ptr, type_map[INT].as_pointer())
-        self.call('puts', [str_ptr])
-
-    def print_num(self, num_format, num):
-        percent_d = self.stringz(num_format)
-        percent_d = self.alloc_and_store(percent_d, ir.ArrayType(
-            percent_d.type.element, percent_d.type.count))
-        percent_d = self.gep(percent_d, [self.const(0), self.const(0)])
-        percent_d = self.builder.bitcast(
-            percent_d, type_map[INT8].as_pointer())
-        self.call('printf', [percent_d, num])
-        self.call('putchar', [ir.Constant(type_map[INT], 10)])
+        line = (string + '\n').encode('utf-8')
+        self.call('stdout.write', [self.global_string(line), self.const(len(line))])
+
+    def runtime_error(self, message):
+        self.print_string(message)
+        self.call('stdout.flush', [])
+        self.call('exit', [self.const(1, width=INT32)])
+        self.builder.unreachable()
 
     @staticmethod
     def typeToFormat(typ):
@@ -938,23 +1107,18 @@ class OxyCodeGenerator(OxyNodeVisitor):
 
         return fmt
 
-    def visit_Oxyinput(self, node):
+    def visit_input(self, node):
         if isinstance(node.value, OxyStr):  # Print text if it exists
             self.print_string(node.value.value)
 
-        percent_d = self.stringz(self.typeToFormat(type_map[node.type.value]))
-        percent_ptr = self.alloc_and_store(percent_d, ir.ArrayType(
-            percent_d.type.element, percent_d.type.count))
-        percent_ptr_gep = self.gep(percent_ptr, [self.const(0), self.const(0)])
-        percent_ptr_gep = self.builder.bitcast(
-            percent_ptr_gep, type_map[INT8].as_pointer())
         var = self.allocate(type_map[node.type.value])
-        self.call('scanf', [percent_ptr_gep, var])
+        self.call('stdout.flush', [])
+        self.call('scanf', [self.cstring(self.typeToFormat(type_map[node.type.value])), var])
         return self.builder.load(var)
 
     def get_args(self, parameters):
         args = []
-        for param in parameters.values():
+        for param_name, param in parameters.items():
             if param.value == FUNC:
                 if param.func_ret_type.value in type_map:
                     func_ret_type = type_map[param.func_ret_type.value]
@@ -966,14 +1130,11 @@ class OxyCodeGenerator(OxyNodeVisitor):
                     func_ret_type, func_parameters, None).as_pointer()
                 args.append(func_ty)
             elif param.value == LIST:
-                array_type = self.get_type(param.func_params['0'])
-                self.create_array(array_type)
-                typ = self.search_scopes('{}.array'.format(array_type))
-                args.append(typ)
+                args.append(self.array_struct(self.get_type(param.func_params['0'])))
             else:
                 if param.value in type_map:
                     args.append(type_map[param.value])
-                elif list(parameters.keys())[list(parameters.values()).index(param)] == SELF:
+                elif param_name == SELF:
                     args.append(self.search_scopes(param.value).as_pointer())
                 elif self.search_scopes(param.value) is not None:
                     args.append(self.search_scopes(param.value))
@@ -995,9 +1156,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
                 func_ret_type, func_parameters, None).as_pointer()
             typ = func_ty
         elif param.value == LIST:
-            array_type = self.get_type(param.func_params['0'])
-            self.create_array(array_type)
-            typ = self.search_scopes('{}.array'.format(array_type))
+            typ = self.array_struct(self.get_type(param.func_params['0']))
         else:
             if param.value in type_map:
                 typ = type_map[param.value]
@@ -1024,11 +1183,7 @@ class OxyCodeGenerator(OxyNodeVisitor):
         self.block_stack.append(self.builder.block)
         self.new_scope()
         self.defer_stack.append([])
-        for f in self.module.functions:
-            if f.name == name:
-                func = f
-                break
-        self.current_function = func
+        self.current_function = self.get_function(name)
         entry = self.add_block('entry')
         self.exit_blocks.append(self.add_block('exit'))
         self.position_at_end(entry)
@@ -1106,24 +1261,25 @@ class OxyCodeGenerator(OxyNodeVisitor):
             raise NotImplementedError
 
     def allocate(self, typ, name=''):
-        var_addr = self.builder.alloca(typ, name=name)
+        # Every stack slot goes in the entry block of the function being built, so a
+        # slot inside a loop is allocated once per call and mem2reg can promote it
+        with self.builder.goto_entry_block():
+            var_addr = self.builder.alloca(typ, name=name)
         return var_addr
 
     def alloc_and_store(self, val, typ, name=''):
-        var_addr = self.builder.alloca(typ, name=name)
+        var_addr = self.allocate(typ, name=name)
         self.builder.store(val, var_addr)
         return var_addr
 
     def alloc_and_define(self, name, typ):
-        var_addr = self.builder.alloca(typ, name=name)
+        var_addr = self.allocate(typ, name=name)
         self.define(name, var_addr)
         return var_addr
 
     def alloc_define_store(self, val, name, typ):
-        saved_block = self.builder.block
-        var_addr = self.builder.alloca(typ, name=name)
+        var_addr = self.allocate(typ, name=name)
         self.define(name, var_addr)
-        self.builder.position_at_end(saved_block)
         self.builder.store(val, var_addr)
         return var_addr
 
@@ -1138,11 +1294,16 @@ class OxyCodeGenerator(OxyNodeVisitor):
             return self.builder.load(self.search_scopes(name))
         return self.builder.load(name)
 
+    def get_function(self, name):
+        # The module keeps its globals in a dict keyed by name, so this is one lookup rather than a scan
+        func = self.module.globals.get(name)
+        return func if isinstance(func, ir.Function) else None
+
     def call(self, name, args):
         if isinstance(name, str):
-            func = self.module.get_global(name)
+            func = self.get_function(name)
         else:
-            func = self.module.get_global(name.name)
+            func = self.get_function(name.name)
         if func is None:
             raise TypeError('Calling non existant function')
         return self.builder.call(func, args)
@@ -1183,6 +1344,16 @@ class OxyCodeGenerator(OxyNodeVisitor):
         puts_ty = ir.FunctionType(type_map[INT], [type_map[INT].as_pointer()])
         ir.Function(self.module, puts_ty, 'puts')
 
+        write_ty = ir.FunctionType(type_map[INT], [type_map[INT32], type_map[INT8].as_pointer(), type_map[INT]])
+        ir.Function(self.module, write_ty, 'write')
+
+        snprintf_ty = ir.FunctionType(
+            type_map[INT32], [type_map[INT8].as_pointer(), type_map[INT], type_map[INT8].as_pointer()], var_arg=True)
+        ir.Function(self.module, snprintf_ty, 'snprintf')
+
+        memcmp_ty = ir.FunctionType(type_map[INT32], [type_map[INT8].as_pointer(), type_map[INT8].as_pointer(), type_map[INT]])
+        ir.Function(self.module, memcmp_ty, 'memcmp')
+
         define_builtins(self)
 
     @staticmethod
@@ -1194,6 +1365,8 @@ class OxyCodeGenerator(OxyNodeVisitor):
         return ir.Constant(ir.ArrayType(type_map[INT8], n), buf)
 
     def generate_code(self, node):
+        self.write_counts = Counter(self.written_names(node))
+        self.confined_tuples = self.find_confined_tuples(node)
         return self.visit(node)
 
     def add_debug_info(self, optimize: bool, filename: str):
@@ -1214,20 +1387,25 @@ class OxyCodeGenerator(OxyNodeVisitor):
 
     def evaluate(self, optimize: bool, ir_dump: bool, timer: bool) -> None:
         if ir_dump and not optimize:
-            for func in self.module.functions:
-                if func.name == "main":
-                    print(func)
+            main = self.get_function("main")
+            if main is not None:
+                print(main)
 
         llvmmod = llvm.parse_assembly(str(self.module))
+        target_machine = llvm.Target.from_default_triple().create_target_machine()
         if optimize:
+            llvmmod.triple = target_machine.triple
+            llvmmod.data_layout = str(target_machine.target_data)
             pmb = llvm.create_pass_manager_builder()
             pmb.opt_level = 3
+            pmb.loop_vectorize = True
+            pmb.slp_vectorize = True
             pm = llvm.create_module_pass_manager()
+            target_machine.add_analysis_passes(pm)
             pmb.populate(pm)
             pm.run(llvmmod)
             if ir_dump:
                 print(str(llvmmod))
-        target_machine = llvm.Target.from_default_triple().create_target_machine()
         with llvm.create_mcjit_compiler(llvmmod, target_machine) as ee:
             ee.finalize_object()
             fptr = CFUNCTYPE(c_void_p)(ee.get_function_address('main'))
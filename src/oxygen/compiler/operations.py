@@ -1,50 +1,36 @@
+from decimal import Decimal
+
 from llvmlite import ir
+from llvmlite.ir import instructions
 
 import oxygen.compiler.custom_int_type
-from oxygen.compiler.base import NUM_TYPES, llvm_type_map, type_map
+from oxygen.compiler.base import NUM_TYPES, type_map
+from oxygen.compiler.types import llvm_canonical_type
 from oxygen.grammar import *
 from oxygen.utils import error
 
-# TODO: Determine size using a comparison function
-int_types = ('i1', 'i8', 'i16', 'i32', 'i64', 'i128')
-float_types = ('float', 'double')
-
-
-def hasFunction(self, func_name):
-    for func in self.module.functions:
-        if func.name == func_name:
-            return True
-
-    return False
-
-
-def userdef_unary_str(op, expr):
-    # Check first if it's an built in type, then user defined type
-    type_name = expr.type.name if hasattr(expr.type, 'name') else str(expr.type)
-    return OPERATOR + '.' + op + '.' + type_name
 
-
-def userdef_binary_str(op, left, right):
-    # Check first if it's a type, then if it's an built in type, then user defined type
-    ltype_name = str(left) if not hasattr(left, 'type') else (str(left.type) if not hasattr(left.type, 'name') else left.type.name)
-    rtype_name = str(right) if not hasattr(right, 'type') else (str(right.type) if not hasattr(right.type, 'name') else right.type.name)
-    return OPERATOR + '.' + op + '.' + ltype_name + '.' + rtype_name
+def userdef_operator(self, op, *operands):
+    # Overloads are keyed by the operand types; the right side of `as`/`is` is a type rather than a value
+    return self.operators.get((op,) + tuple(operand.type if isinstance(operand, ir.Value) else operand
+                                            for operand in operands))
 
 
 def unary_op(self, node):
     op = node.op
-    expr = self.visit(node.parse_any_expr)
-    if hasFunction(self, userdef_unary_str(op, expr)) and \
-       self.current_function.name != userdef_unary_str(op, expr):
-        return self.builder.call(self.module.get_global(userdef_unary_str(op, expr)),
-                                 [expr], "unop")
+    expr = self.visit(node.expr)
+    func = userdef_operator(self, op, expr)
+    if func is not None and func is not self.current_function:
+        return self.builder.call(func, [expr], "unop")
     elif op == MINUS:
+        if isinstance(expr, ir.Constant) and isinstance(expr.constant, (int, float, Decimal)):
+            return ir.Constant(expr.type, -expr.constant)
         if isinstance(expr.type, ir.IntType):
             return self.builder.neg(expr)
         elif isinstance(expr.type, (ir.FloatType, ir.DoubleType)):
             return self.builder.fsub(ir.Constant(ir.DoubleType(), 0), expr)
     elif op == NOT:
-        if isinstance(expr.type, ir.IntType) and str(expr.type).split("i")[1] == '1':
+        if isinstance(expr.type, ir.IntType) and expr.type.width == 1:
             return self.builder.not_(expr)
     elif op == BINARY_ONES_COMPLIMENT:
         if isinstance(expr.type, ir.IntType):
@@ -61,11 +47,13 @@ def unary_op(self, node):
 def binary_op(self, node):
     op = node.op
     left = self.visit(node.left)
+    if op in (AND, OR) and left.type == type_map[BOOL]:
+        return logical_op(self, op, left, node)
     right = self.visit(node.right)
 
-    if hasFunction(self, userdef_binary_str(op, left, right)):
-        return self.builder.call(self.module.get_global(userdef_binary_str(op, left, right)),
-                                 (left, right), "binop")
+    func = userdef_operator(self, op, left, right)
+    if func is not None:
+        return self.builder.call(func, (left, right), "binop")
     elif op == CAST:
         return cast_ops(self, left, right, node)
     elif op in (IS, IS_NOT):
@@ -73,6 +61,8 @@ def binary_op(self, node):
     elif isinstance(left.type, ir.IntType) and isinstance(right.type, ir.IntType):
         return int_ops(self, op, left, right, node)
     elif type(left.type) in NUM_TYPES and type(right.type) in NUM_TYPES:
+        if op == POWER:
+            return float_power(self, left, right, node)
         if isinstance(left.type, ir.IntType):
             left = cast_ops(self, left, right.type, node)
         elif isinstance(right.type, ir.IntType):
@@ -80,6 +70,8 @@ def binary_op(self, node):
         return float_ops(self, op, left, right, node)
     elif is_enum(left.type) and is_enum(right.type):
         return enum_ops(self, op, left, right, node)
+    elif left.type == type_map[STR] and right.type == type_map[STR]:
+        return str_ops(self, op, left, right, node)
     else:
         error('file={} line={}: Unknown operator {} for {} and {}'.format(
             self.file_name,
@@ -88,6 +80,38 @@ def binary_op(self, node):
         ))
 
 
+def logical_op(self, op, left, node):
+    # Only evaluate the right operand when the left one does not already decide the result
+    decided_block = self.builder.block
+    right_block = self.add_block(op + '.rhs')
+    end_block = self.add_block(op + '.end')
+    if op == AND:
+        self.cbranch(left, right_block, end_block)
+    else:
+        self.cbranch(left, end_block, right_block)
+
+    self.position_at_end(right_block)
+    right = truth_value(self, self.visit(node.right))
+    right_block = self.builder.block
+    self.branch(end_block)
+
+    self.position_at_end(end_block)
+    result = self.builder.phi(type_map[BOOL], op + 'tmp')
+    result.add_incoming(ir.Constant(type_map[BOOL], op == OR), decided_block)
+    result.add_incoming(right, right_block)
+    return result
+
+
+def truth_value(self, value):
+    if isinstance(value.type, ir.IntType):
+        if value.type.width == 1:
+            return value
+        return self.builder.icmp_unsigned(NOT_EQUALS, value, ir.Constant(value.type, 0))
+    elif isinstance(value.type, (ir.FloatType, ir.DoubleType)):
+        return self.builder.fcmp_unordered(NOT_EQUALS, value, ir.Constant(value.type, 0))
+    raise TypeError('Cannot use {} as a condition'.format(value.type))
+
+
 def is_enum(typ):
     if typ.is_pointer:
         typ = typ.pointee
@@ -119,14 +143,26 @@ def enum_ops(self, op, left, right, node):
         raise SyntaxError('Unknown binary operator', node.op)
 
 
+def str_ops(self, op, left, right, node):
+    if op == PLUS:
+        return self.call('str.concat', [left, right])
+    elif op in (EQUALS, NOT_EQUALS, LESS_THAN, LESS_THAN_OR_EQUAL_TO, GREATER_THAN, GREATER_THAN_OR_EQUAL_TO):
+        compare = self.call('str.compare', [left, right])
+        return self.builder.icmp_signed(op, compare, ir.Constant(type_map[INT], 0), 'cmptmp')
+    else:
+        error('file={} line={}: Unknown operator {} for {} and {}'.format(
+            self.file_name,
+            node.line_num,
+            op, node.left, node.right
+        ))
+
+
 def int_ops(self, op, left, right, node):
     # Cast values if they're different but compatible
-    if str(left.type) in int_types and \
-       str(right.type) in int_types and \
-       str(left.type) != str(right.type):
-        width_left = int(str(left.type).split("i")[1])
-        width_right = int(str(right.type).split("i")[1])
-        if width_left > width_right:
+    left_type = llvm_canonical_type(left.type)
+    right_type = llvm_canonical_type(right.type)
+    if left_type is not None and right_type is not None and left_type.width != right_type.width:
+        if left_type.width > right_type.width:
             right = cast_ops(self, right, left.type, node)
         else:
             left = cast_ops(self, left, right.type, node)
@@ -151,12 +187,7 @@ def int_ops(self, op, left, right, node):
         else:
             return self.builder.urem(left, right, 'modtmp')
     elif op == POWER:
-        temp = self.builder.alloca(type_map[INT])
-        self.builder.store(left, temp)
-        for _ in range(node.right.value - 1):
-            res = self.builder.mul(self.builder.load(temp), left)
-            self.builder.store(res, temp)
-        return self.builder.load(temp)
+        return int_power(self, left, right, node)
     elif op == AND:
         return self.builder.and_(left, right)
     elif op == OR:
@@ -171,22 +202,19 @@ def int_ops(self, op, left, right, node):
         return self.builder.lshr(left, right)
     elif op in (EQUALS, NOT_EQUALS, LESS_THAN, LESS_THAN_OR_EQUAL_TO, GREATER_THAN, GREATER_THAN_OR_EQUAL_TO):
         if left.type.signed:
-            cmp_res = self.builder.icmp_signed(op, left, right, 'cmptmp')
+            return self.builder.icmp_signed(op, left, right, 'cmptmp')
         else:
-            cmp_res = self.builder.icmp_unsigned(op, left, right, 'cmptmp')
-        return self.builder.uitofp(cmp_res, type_map[BOOL], 'booltmp')
+            return self.builder.icmp_unsigned(op, left, right, 'cmptmp')
     else:
         raise SyntaxError('Unknown binary operator', node.op)
 
 
 def float_ops(self, op, left, right, node):
     # Cast values if they're different but compatible
-    if str(left.type) in float_types and \
-       str(right.type) in float_types and \
-       str(left.type) != str(right.type):  # Do a more general approach for size comparisons
-        width_left = 0 if str(left.type) == 'float' else 1
-        width_right = 0 if str(right.type) == 'float' else 1
-        if width_left > width_right:
+    left_type = llvm_canonical_type(left.type)
+    right_type = llvm_canonical_type(right.type)
+    if left_type is not None and right_type is not None and left_type is not right_type:
+        if left_type.width > right_type.width:
             right = cast_ops(self, right, left.type, node)
         else:
             left = cast_ops(self, left, right.type, node)
@@ -205,66 +233,151 @@ def float_ops(self, op, left, right, node):
     elif op == MOD:
         return self.builder.frem(left, right, 'fmodtmp')
     elif op == POWER:
-        temp = self.builder.alloca(type_map[DOUBLE])
-        self.builder.store(left, temp)
-        for _ in range(node.right.value - 1):
-            res = self.builder.fmul(self.builder.load(temp), left)
-            self.builder.store(res, temp)
-        return self.builder.load(temp)
-    elif op in (NOT_EQUALS):
-        cmp_res = self.builder.fcmp_unordered(op, left, right, 'cmptmp')
-        return self.builder.uitofp(cmp_res, type_map[BOOL], 'booltmp')
+        return float_power(self, left, right, node)
+    elif op == NOT_EQUALS:
+        return self.builder.fcmp_unordered(op, left, right, 'cmptmp')
     elif op in (EQUALS, LESS_THAN, LESS_THAN_OR_EQUAL_TO, GREATER_THAN, GREATER_THAN_OR_EQUAL_TO):
-        cmp_res = self.builder.fcmp_ordered(op, left, right, 'cmptmp')
-        return self.builder.uitofp(cmp_res, type_map[BOOL], 'booltmp')
+        return self.builder.fcmp_ordered(op, left, right, 'cmptmp')
     else:
         raise SyntaxError('Unknown binary operator', node.op)
 
 
-def cast_ops(self, left, right, node):
-    orig_type = str(left.type)
-    cast_type = str(right)
+def int_power(self, base, exponent, node):
+    # Exponentiation by squaring as a runtime loop, so the emitted code does not grow with the exponent.
+    # A negative exponent gives 1 / base ^ -exponent truncated toward zero: +-1 for a base of +-1, else 0
+    negative = None
+    if exponent.type.signed:
+        negative = self.builder.icmp_signed(LESS_THAN, exponent, ir.Constant(exponent.type, 0))
+        exponent = self.builder.select(negative, self.builder.neg(exponent), exponent)
+    if exponent.type.width != base.type.width:
+        exponent = cast_ops(self, exponent, base.type, node)
+    entry = self.builder.block
+    loop = self.add_block('pow.loop')
+    body = self.add_block('pow.body')
+    end = self.add_block('pow.end')
+    zero = ir.Constant(base.type, 0)
+    one = ir.Constant(base.type, 1)
+    self.branch(loop)
+
+    self.position_at_end(loop)
+    result = self.builder.phi(base.type, 'pow.result')
+    factor = self.builder.phi(base.type, 'pow.factor')
+    remaining = self.builder.phi(base.type, 'pow.exponent')
+    result.add_incoming(one, entry)
+    factor.add_incoming(base, entry)
+    remaining.add_incoming(exponent, entry)
+    self.cbranch(self.builder.icmp_unsigned(NOT_EQUALS, remaining, zero), body, end)
+
+    self.position_at_end(body)
+    odd = self.builder.trunc(remaining, type_map[BOOL])
+    next_result = self.builder.select(odd, self.builder.mul(result, factor), result)
+    result.add_incoming(next_result, body)
+    factor.add_incoming(self.builder.mul(factor, factor), body)
+    remaining.add_incoming(self.builder.lshr(remaining, one), body)
+    self.branch(loop)
+
+    self.position_at_end(end)
+    if negative is None:
+        return result
+    unit = self.builder.icmp_unsigned(EQUALS, base, one)
+    if base.type.signed:
+        unit = self.builder.or_(unit, self.builder.icmp_unsigned(EQUALS, base, ir.Constant(base.type, -1)))
+    return self.builder.select(self.builder.and_(negative, self.builder.not_(unit)), zero, result)
+
+
+def float_power(self, base, exponent, node):
+    if isinstance(base.type, ir.IntType):
+        base = cast_ops(self, base, type_map[DOUBLE], node)
+    if fits_i32(exponent):
+        if exponent.type.width < 32:
+            exponent = cast_ops(self, exponent, type_map[INT32], node)
+        elif exponent.type.width > 32:
+            exponent = self.builder.trunc(exponent, type_map[INT32])
+        llvm_powi = self.module.declare_intrinsic('llvm.powi', [base.type])
+        return self.builder.call(llvm_powi, [base, exponent], 'powtmp')
+    exponent = cast_ops(self, exponent, base.type, node)
+    llvm_pow = self.module.declare_intrinsic('llvm.pow', [base.type])
+    return self.builder.call(llvm_pow, [base, exponent], 'powtmp')
+
+
+def fits_i32(value):
+    # llvm.powi takes an i32 exponent; wider runtime exponents go through llvm.pow instead
+    if not isinstance(value.type, ir.IntType):
+        return False
+    if isinstance(value, ir.Constant):
+        return -2 ** 31 <= value.constant < 2 ** 31
+    return value.type.width < 32 or (value.type.width == 32 and value.type.signed)
+
+
+def int_to_str(self, value):
+    string = self.call('str.new', [ir.Constant(type_map[INT8].as_pointer(), None), ir.Constant(type_map[INT], 0)])
+    wide = value
+    if value.type.width < 128:
+        wide = self.builder.sext(value, type_map[INT128]) if value.type.signed else self.builder.zext(value, type_map[INT128])
+    if value.type.signed:
+        negative = self.builder.icmp_signed(LESS_THAN, wide, ir.Constant(type_map[INT128], 0))
+        wide = self.builder.select(negative, self.builder.neg(wide), wide)
+    else:
+        negative = ir.Constant(type_map[BOOL], 0)
+    self.call('@int_to_str', [string, wide, negative])
+    return string
 
-    if cast_type in int_types and \
-       orig_type in int_types and \
-       cast_type == orig_type:
-        left.type.signed = right.signed
-        return left
 
-    elif orig_type == cast_type:  # cast to the same type
-        return left
+def reinterpret_int(self, value, int_type):
+    # Gives an integer the signedness of int_type without touching the interned type objects.
+    # The builder drops casts between equal-width integers, so the no-op bitcast is inserted directly.
+    if isinstance(value, ir.Constant):
+        return ir.Constant(int_type, value.constant)
+    bitcast = instructions.CastInstr(self.builder.block, 'bitcast', value, int_type)
+    self.builder._insert(bitcast)
+    return bitcast
+
+
+def cast_ops(self, left, right, node):
+    orig = llvm_canonical_type(left.type)
+    cast = llvm_canonical_type(right)
+
+    if orig is not None and cast is not None:
+        if orig.integer and cast.integer:
+            if orig.width == cast.width:
+                return reinterpret_int(self, left, right)
+            elif cast.width > orig.width:
+                # Comparisons yield a signed i1, but a bool always widens to 0 or 1
+                if left.type.signed and orig.width > 1:
+                    return self.builder.sext(left, right)
+                else:
+                    return self.builder.zext(left, right)
+            else:
+                return self.builder.trunc(left, right)
 
-    elif cast_type in int_types:  # int
-        if orig_type in float_types:  # from float
+        elif cast.integer:  # from float
             if right.signed:
-                return self.builder.fptosi(left, llvm_type_map[cast_type])
+                return self.builder.fptosi(left, right)
             else:
-                return self.builder.fptoui(left, llvm_type_map[cast_type])
-        elif orig_type in int_types:  # from signed int
-            width_cast = int(cast_type.split("i")[1])
-            width_orig = int(orig_type.split("i")[1])
-            if width_cast > width_orig:
-                if left.type.signed:
-                    return self.builder.sext(left, llvm_type_map[cast_type])
-                else:
-                    return self.builder.zext(left, llvm_type_map[cast_type])
-            elif width_orig > width_cast:
-                return self.builder.trunc(left, llvm_type_map[cast_type])
-
-    elif cast_type in float_types:  # float
-        if orig_type in int_types:  # from signed int
-            if left.type.signed:
-                return self.builder.sitofp(left, type_map[cast_type])
+                return self.builder.fptoui(left, right)
+
+        elif orig.integer:  # to float
+            if left.type.signed and orig.width > 1:
+                return self.builder.sitofp(left, cast.type())
             else:
-                return self.builder.uitofp(left, type_map[cast_type])
-        elif orig_type in float_types:  # from float
-            if cast_type == 'double' and orig_type == 'float':
-                return self.builder.fpext(left, llvm_type_map[cast_type])
-            elif cast_type == 'float' and orig_type == 'double':
-                return self.builder.fptrunc(left, llvm_type_map[cast_type])
-
-    elif cast_type == str(type_map[STR]):
-        raise NotImplementedError
+                return self.builder.uitofp(left, cast.type())
+
+        elif cast.width > orig.width:
+            return self.builder.fpext(left, cast.type())
+        elif orig.width > cast.width:
+            return self.builder.fptrunc(left, cast.type())
+        return left
+
+    if right == type_map[STR] and isinstance(left.type, ir.IntType):
+        if left.type.width == 1:
+            return self.call('@bool_to_str', [left])
+        return int_to_str(self, left)
+
+    orig_type = str(left.type)
+    cast_type = str(right)
+
+    if orig_type == cast_type:  # cast to the same type
+        return left
 
     elif cast_type in (ANY, FUNC, STRUCT, OBJECT, ENUM, DICT, LIST, TUPLE):
         raise TypeError('file={} line={}: Cannot cast from {} to type {}'.format(
@@ -15,12 +15,21 @@ class Any:
 
 
 class Number(Any):
+    width = 0
+    signed = True
+    integer = False
+    interchangeable = False
+
     def __init__(self) -> None:
         super().__init__()
         self.name = NUMBER
 
 
 class Bool(Number):
+    width = 1
+    signed = False
+    integer = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = BOOL
@@ -31,6 +40,10 @@ class Bool(Number):
 
 
 class Int(Number):
+    width = 64
+    integer = True
+    interchangeable = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = INT
@@ -41,6 +54,10 @@ class Int(Number):
 
 
 class Int8(Number):
+    width = 8
+    integer = True
+    interchangeable = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = INT8
@@ -51,6 +68,10 @@ class Int8(Number):
 
 
 class Int16(Number):
+    width = 16
+    integer = True
+    interchangeable = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = INT16
@@ -61,6 +82,10 @@ class Int16(Number):
 
 
 class Int32(Number):
+    width = 32
+    integer = True
+    interchangeable = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = INT32
@@ -71,6 +96,10 @@ class Int32(Number):
 
 
 class Int64(Number):
+    width = 64
+    integer = True
+    interchangeable = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = INT64
@@ -81,6 +110,9 @@ class Int64(Number):
 
 
 class Int128(Number):
+    width = 128
+    integer = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = INT128
@@ -91,6 +123,10 @@ class Int128(Number):
 
 
 class UInt(Number):
+    width = 64
+    signed = False
+    integer = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = UINT
@@ -101,6 +137,10 @@ class UInt(Number):
 
 
 class UInt8(Number):
+    width = 8
+    signed = False
+    integer = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = UINT8
@@ -111,6 +151,10 @@ class UInt8(Number):
 
 
 class UInt16(Number):
+    width = 16
+    signed = False
+    integer = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = UINT16
@@ -121,6 +165,10 @@ class UInt16(Number):
 
 
 class UInt32(Number):
+    width = 32
+    signed = False
+    integer = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = UINT32
@@ -131,6 +179,10 @@ class UInt32(Number):
 
 
 class UInt64(Number):
+    width = 64
+    signed = False
+    integer = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = UINT64
@@ -141,6 +193,10 @@ class UInt64(Number):
 
 
 class UInt128(Number):
+    width = 128
+    signed = False
+    integer = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = UINT128
@@ -151,6 +207,9 @@ class UInt128(Number):
 
 
 class Double(Number):
+    width = 64
+    interchangeable = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = DOUBLE
@@ -161,6 +220,9 @@ class Double(Number):
 
 
 class Float(Number):
+    width = 32
+    interchangeable = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = FLOAT
@@ -269,3 +331,50 @@ class Class(Struct):
     @staticmethod
     def type() -> ir.Type:
         raise NotImplementedError
+
+
+# Canonical type lattice: every spelling of a builtin type maps to a single class, and
+# llvm types map back to it by (width, signedness) or float kind, so compatibility and
+# promotion never need to stringify or parse type names.
+CANONICAL_TYPES = {
+    BOOL: Bool,
+    INT: Int,
+    INT8: Int8,
+    INT16: Int16,
+    INT32: Int32,
+    INT64: Int64,
+    INT128: Int128,
+    UINT: UInt,
+    UINT8: UInt8,
+    UINT16: UInt16,
+    UINT32: UInt32,
+    UINT64: UInt64,
+    UINT128: UInt128,
+    DOUBLE: Double,
+    FLOAT: Float,
+    'i1': Bool,
+    'u1': Bool,
+}
+
+LLVM_INT_TYPES = {(canonical.width, canonical.signed): canonical for canonical in (
+    Int128, Int64, Int32, Int16, Int8, UInt128, UInt64, UInt32, UInt16, UInt8, Bool)}
+LLVM_INT_TYPES[(1, True)] = Bool
+
+LLVM_FLOAT_TYPES = {
+    ir.DoubleType: Double,
+    ir.FloatType: Float,
+}
+
+
+def canonical_type(name):
+    return CANONICAL_TYPES.get(name)
+
+
+def llvm_canonical_type(llvm_type):
+    if isinstance(llvm_type, ir.IntType):
+        return LLVM_INT_TYPES.get((llvm_type.width, llvm_type.signed))
+    return LLVM_FLOAT_TYPES.get(type(llvm_type))
+
+
+def canonical_compatible(left, right):
+    return left is right or left.interchangeable and right.interchangeable
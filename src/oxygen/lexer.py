@@ -1,11 +1,16 @@
+import re
+from array import array
+from collections import deque
 from decimal import Decimal
-from typing import Optional, Any, Iterator
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from oxygen.grammar import *
 from oxygen.utils import *
 
 
 class Token(object):
+    __slots__ = ('type', 'value', 'value_type', 'line_num', 'indent_level')
+
     def __init__(self, token_type: str, value: str, line_num: int, indent_level: int, value_type: str = None):
         self.type = token_type
         self.value = value
@@ -24,27 +29,112 @@ class Token(object):
     __repr__ = __str__
 
 
+TOKEN_TYPES = (LTYPE, NUMBER, STRING, OP, CONSTANT, NEWLINE, KEYWORD, NAME, EOF, ESCAPE)
+TOKEN_TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+NUMBER_VALUE_TYPES = {int: INT, Decimal: DOUBLE}
+
+OPENING_BRACKETS = (LPAREN, LBRACK, LBRACE)
+CLOSING_BRACKETS = (RPAREN, RBRACK, RBRACE)
+OPERATOR_CHARS = ''.join(op for op in OPERATORS if len(op) == 1)
+NUMBER_LETTERS = ('a', 'b', 'c', 'd', 'e', 'f', 'x', 'o')
+HEX_LETTERS = ('a', 'b', 'c', 'd', 'e', 'f')
+BASE_PREFIXES = {'b': 2, 'x': 16, 'o': 8}
+
+WORD_TYPES: Dict[str, str] = {}
+for words, word_type in ((CONSTANTS, CONSTANT), (TYPES, LTYPE), (KEYWORDS, KEYWORD), (OPERATORS, OP)):
+    WORD_TYPES.update(dict.fromkeys(words, word_type))
+
+WHITESPACE_RUN = re.compile(r'\s*')
+WORD_RUN = re.compile(r'[^\s#\\{}]*'.format(re.escape(OPERATOR_CHARS)))
+OPERATOR_RUN = re.compile(r'[{}]*'.format(re.escape(''.join(
+    char for char in OPERATOR_CHARS if char not in SINGLE_OPERATORS))))
+
+
+# Tokens are stored column-wise, one compact array per field, with values interned in value_table
+class TokenStream(object):
+    def __init__(self, tokens: Iterable[Token]):
+        self.types = array('B')
+        self.values = array('i')
+        self.lines = array('i')
+        self.indents = array('i')
+        self.value_table: List[Any] = []
+        self.value_ids: Dict[Tuple[type, Any], int] = {}
+        for token in tokens:
+            self.append(token)
+        self.last = len(self.types) - 1
+        self.closing_brackets: Dict[int, int] = {}
+        self.top_level_commas: Set[int] = set()
+        self.match_brackets()
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        if index > self.last:
+            index = self.last
+        return Token(self.type(index), self.value(index), self.lines[index], self.indents[index],
+                     self.value_type(index))
+
+    def append(self, token: Token) -> None:
+        # Decimal('1.0') == Decimal('1.00'), so decimals are keyed by their text
+        value = token.value
+        key = (value.__class__, str(value) if value.__class__ is Decimal else value)
+        value_id = self.value_ids.get(key)
+        if value_id is None:
+            value_id = self.value_ids[key] = len(self.value_table)
+            self.value_table.append(value)
+        self.types.append(TOKEN_TYPE_CODES[token.type])
+        self.values.append(value_id)
+        self.lines.append(token.line_num)
+        self.indents.append(token.indent_level)
+
+    def type(self, index: int) -> str:
+        return TOKEN_TYPES[self.types[index if index < self.last else self.last]]
+
+    def value(self, index: int) -> Any:
+        return self.value_table[self.values[index if index < self.last else self.last]]
+
+    def value_type(self, index: int) -> Optional[str]:
+        if self.type(index) != NUMBER:
+            return None
+        return NUMBER_VALUE_TYPES[self.value(index).__class__]
+
+    def line_num(self, index: int) -> int:
+        return self.lines[index if index < self.last else self.last]
+
+    def indent_level(self, index: int) -> int:
+        return self.indents[index if index < self.last else self.last]
+
+    def match_brackets(self) -> None:
+        op = TOKEN_TYPE_CODES[OP]
+        open_brackets = []
+        for index, type_code in enumerate(self.types):
+            if type_code != op:
+                continue
+            value = self.value_table[self.values[index]]
+            if value in OPENING_BRACKETS:
+                open_brackets.append(index)
+            elif value in CLOSING_BRACKETS:
+                if open_brackets:
+                    self.closing_brackets[open_brackets.pop()] = index
+            elif value == COMMA and open_brackets:
+                self.top_level_commas.add(open_brackets[-1])
+
+    def closing_bracket(self, index: int) -> Optional[int]:
+        return self.closing_brackets.get(index)
+
+    def has_top_level_comma(self, index: int) -> bool:
+        return index in self.top_level_commas
+
+
 class Lexer(object):
     def __init__(self, text: str, file_name: str):
         self.text = self.clean_text(text)
         self.file_name = file_name
         self.pos = 0
-        self.current_char: Optional[str] = self.text[self.pos]
-        self.char_type: Optional[str] = None
-        self.word = ''
-        self.word_type: Optional[str] = None
         self._line_num = 1
         self._indent_level = 0
-        self.current_token: Token
-
-    def get_next_char(self) -> None:
-        self.pos += 1
-        if self.pos > len(self.text) - 1:
-            self.current_char = None
-            self.char_type = None
-        else:
-            self.current_char = self.text[self.pos]
-            self.char_type = self.get_typeof(self.current_char)
+        self.pending: Deque[Tuple[Token, Tuple[int, int, int]]] = deque()
 
     @staticmethod
     def clean_text(text: str) -> str:
@@ -55,73 +145,6 @@ class Lexer(object):
 
         return text
 
-    def empty_word(self) -> str:
-        old_word = self.word
-        self.word = ''
-        self.word_type = None
-        return old_word
-
-    def peek_next(self, num: int) -> Optional[str]:
-        peek_pos = self.pos + num
-        if peek_pos > len(self.text) - 1:
-            return None
-
-        return self.text[peek_pos]
-
-    def view_next_token(self, num: int = 1) -> Token:
-        if num < 1:
-            raise ValueError('Preview argument must be 1 or greater')
-        current_char_type = self.char_type
-        current_word = self.word
-        current_line_num = self.line_num
-        current_pos = self.pos
-        current_char = self.current_char
-        current_word_type = self.word_type
-        current_indent_level = self.indent_level
-        next_token: Token
-        for _ in range(num):
-            next_token = self.get_next_token()
-        self.char_type = current_char_type
-        self.word = current_word
-        self.word_type = current_word_type
-        self.pos = current_pos
-        self.current_char = current_char
-        self._line_num = current_line_num
-        self._indent_level = current_indent_level
-        return next_token
-
-    def handle_whitespace(self) -> None:
-        should_indent = False
-        if self.peek_next(-1) == '\n':
-            should_indent = True
-
-        spaces = 0
-        while self.current_char is not None and self.current_char.isspace():
-            self.get_next_char()
-            self.empty_word()
-            spaces += 1
-            if spaces == 4 and should_indent:
-                spaces = 0
-                self.increment_indent_level()
-
-        if spaces != 0 and should_indent:
-            error('file={} line={}: Indentation is locked to 4 spaces, found {} instead'.format(
-                self.file_name, self.line_num, spaces))
-
-    def handle_comment(self) -> Optional[Token]:
-        while self.current_char != '\n':
-            self.get_next_char()
-            if self.current_char is None:
-                return self.eof()
-        self.eat_newline()
-        if self.current_char == '#':
-            self.handle_comment()
-
-        return None
-
-    def incr_line_num(self) -> None:
-        self._line_num += 1
-
     @property
     def line_num(self) -> int:
         return self._line_num
@@ -130,32 +153,6 @@ class Lexer(object):
     def indent_level(self) -> int:
         return self._indent_level
 
-    def reset_indent_level(self) -> int:
-        self._indent_level = 0
-        return self._indent_level
-
-    def decriment_indent_level(self) -> int:
-        self._indent_level -= 1
-        return self._indent_level
-
-    def increment_indent_level(self) -> int:
-        self._indent_level += 1
-        return self._indent_level
-
-    def eat_newline(self) -> Token:
-        self.empty_word()
-        token = Token(NEWLINE, '\n', self.line_num, self.indent_level)
-        self.reset_indent_level()
-        self.incr_line_num()
-        self.get_next_char()
-        return token
-
-    def skip_indent(self) -> None:
-        while self.current_char is not None and self.current_char == '\t':
-            self.empty_word()
-            self.increment_indent_level()
-            self.get_next_char()
-
     def eof(self) -> Token:
         return Token(EOF, EOF, self.line_num, self.indent_level)
 
@@ -175,127 +172,183 @@ class Lexer(object):
         return ALPHANUMERIC
 
     def get_next_token(self) -> Token:
-        if self.current_char is None:
-            return self.eof()
-
-        if self.current_char == '\n':
-            return self.eat_newline()
-
-        elif self.current_char == '\t':
-            self.skip_indent()
-
-        if self.current_char.isspace():
-            self.handle_whitespace()
-
-        if self.current_char == '#':
-            self.handle_comment()
-            return self.get_next_token()
-
-        if self.current_char == '"':
-            self.get_next_char()
-            while self.current_char != '"':
-                if self.current_char == '\\' and self.peek_next(1) == '"':
-                    self.get_next_char()
-                self.word += self.current_char
-                self.get_next_char()
-            self.get_next_char()
-            return Token(STRING, self.empty_word(), self.line_num, self.indent_level)
-
-        if self.current_char == "'":
-            self.get_next_char()
-            while self.current_char != "'":
-                if self.current_char == '\\' and self.peek_next(1) == "'":
-                    self.get_next_char()
-                self.word += self.current_char
-                self.get_next_char()
-            self.get_next_char()
-            return Token(STRING, self.empty_word(), self.line_num, self.indent_level)
-
-        if not self.char_type:
-            self.char_type = self.get_typeof(self.current_char)
-        if not self.word_type:
-            self.word_type = self.char_type
-
-        if self.word_type == OPERATIC:
-            while self.char_type == OPERATIC:
-                self.word += self.current_char
-                self.get_next_char()
-                if self.current_char in SINGLE_OPERATORS or self.word in SINGLE_OPERATORS:
-                    break
-            return Token(OP, self.empty_word(), self.line_num, self.indent_level)
-
-        if self.word_type == ALPHANUMERIC:
-            while self.char_type == ALPHANUMERIC or self.char_type == NUMERIC:
-                self.word += self.current_char
-                self.get_next_char()
-
-            if self.word in OPERATORS:
-                if self.word in MULTI_WORD_OPERATORS and self.view_next_token(1).value in MULTI_WORD_OPERATORS:
-                    self.get_next_char()
-                    self.word += ' '
-                    while self.char_type == ALPHANUMERIC or self.char_type == NUMERIC:
-                        self.word += self.current_char
-                        self.get_next_char()
-                    return Token(OP, self.empty_word(), self.line_num, self.indent_level)
-
-                return Token(OP, self.empty_word(), self.line_num, self.indent_level)
-
-            if self.word in KEYWORDS:
-                if self.word in MULTI_WORD_KEYWORDS and self.view_next_token(1).value in MULTI_WORD_KEYWORDS:
-                    self.get_next_char()
-                    self.word += ' '
-                    while self.char_type == ALPHANUMERIC or self.char_type == NUMERIC:
-                        self.word += self.current_char
-                        self.get_next_char()
-                    return Token(KEYWORD, self.empty_word(), self.line_num, self.indent_level)
-
-                return Token(KEYWORD, self.empty_word(), self.line_num, self.indent_level)
-
-            elif self.word in TYPES:
-                return Token(LTYPE, self.empty_word(), self.line_num, self.indent_level)
-            elif self.word in CONSTANTS:
-                return Token(CONSTANT, self.empty_word(), self.line_num, self.indent_level)
-
-            return Token(NAME, self.utf8_to_ascii(self.empty_word()), self.line_num, self.indent_level)
-
-        if self.word_type == NUMERIC:
-            base = 10
-            while self.char_type == NUMERIC or (self.current_char == DOT and self.peek_next(1) != DOT) or \
-                    self.current_char in ('a', 'b', 'c', 'd', 'e', 'f', 'x', 'o'):
-                self.word += self.current_char
-                if self.char_type == ALPHANUMERIC:
-                    if self.current_char in ('b', 'x', 'o') and self.word.startswith('0') and len(self.word) == 2:
-                        if self.current_char == 'b':
-                            base = 2
-                        elif self.current_char == 'x':
-                            base = 16
-                        elif self.current_char == 'o':
-                            base = 8
-
-                        self.word = ""
-                    elif not (base == 16 and self.current_char in ('a', 'b', 'c', 'd', 'e', 'f')):
-                        error("Unexpected number parsing")
-
-                self.get_next_char()
-            value: Any = self.empty_word()
-            if '.' in value:
-                value = Decimal(value)
-                value_type = DOUBLE
-            else:
-                value = int(value, base)
-                value_type = INT
-            return Token(NUMBER, value, self.line_num, self.indent_level, value_type=value_type)
-
-        if self.char_type == ESCAPE:
-            self.empty_word()
-            self.get_next_char()
-            line_num = self.line_num
-            if self.current_char == '\n':
-                self.incr_line_num()
-            self.get_next_char()
-            return Token(ESCAPE, '\\', line_num, self.indent_level)
-
-        raise SyntaxError('Unknown character')
+        if self.pending:
+            token, (self.pos, self._line_num, self._indent_level) = self.pending.popleft()
+            return token
+
+        text = self.text
+        end = len(text)
+        while True:
+            if self.pos >= end:
+                return self.eof()
+
+            char = text[self.pos]
+            if char == '\n':
+                return self.lex_newline()
+            elif char == '\t':
+                self.skip_indent()
+                char = text[self.pos]
+
+            if char.isspace():
+                self.skip_whitespace()
+                if self.pos >= end:
+                    return self.eof()
+                char = text[self.pos]
+
+            if char == '#':
+                self.skip_comment()
+                continue
+
+            if char == '"' or char == "'":
+                return self.lex_string(char)
+
+            char_type = CHAR_TYPES.get(char) or self.get_typeof(char)
+            if char_type == OPERATIC:
+                return self.lex_operator()
+            elif char_type == ALPHANUMERIC:
+                return self.lex_word()
+            elif char_type == NUMERIC:
+                return self.lex_number()
+            elif char_type == ESCAPE:
+                return self.lex_escape()
+
+            raise SyntaxError('Unknown character')
+
+    def lex_newline(self) -> Token:
+        token = Token(NEWLINE, '\n', self._line_num, self._indent_level)
+        self._indent_level = 0
+        self._line_num += 1
+        self.pos += 1
+        return token
+
+    def skip_indent(self) -> None:
+        text = self.text
+        pos = self.pos
+        while text[pos] == '\t':
+            pos += 1
+        self._indent_level += pos - self.pos
+        self.pos = pos
+
+    def skip_whitespace(self) -> None:
+        should_indent = self.text[self.pos - 1] == '\n'
+        end = WHITESPACE_RUN.match(self.text, self.pos).end()
+        spaces = end - self.pos
+        self.pos = end
+        if should_indent:
+            self._indent_level += spaces // 4
+            if spaces % 4:
+                error('file={} line={}: Indentation is locked to 4 spaces, found {} instead'.format(
+                    self.file_name, self.line_num, spaces % 4))
+
+    def skip_comment(self) -> None:
+        newline = self.text.find('\n', self.pos)
+        if newline == -1:
+            self.pos = len(self.text)
+            return
+        self._indent_level = 0
+        self._line_num += 1
+        self.pos = newline + 1
+
+    def lex_string(self, quote: str) -> Token:
+        text = self.text
+        start = self.pos + 1
+        parts = []
+        while True:
+            close = text.find(quote, start)
+            if close == -1:
+                error('file={} line={}: Unterminated string literal'.format(self.file_name, self.line_num))
+            if close > start and text[close - 1] == '\\':
+                parts.append(text[start:close - 1])
+                parts.append(quote)
+                start = close + 1
+                continue
+            parts.append(text[start:close])
+            break
+        self.pos = close + 1
+        return Token(STRING, ''.join(parts), self.line_num, self.indent_level)
+
+    def lex_operator(self) -> Token:
+        start = self.pos
+        if self.text[start] in SINGLE_OPERATORS:
+            self.pos += 1
+        else:
+            self.pos = OPERATOR_RUN.match(self.text, start + 1).end()
+        return Token(OP, self.text[start:self.pos], self.line_num, self.indent_level)
+
+    def lex_word(self) -> Token:
+        start = self.pos
+        self.pos = WORD_RUN.match(self.text, start).end()
+        word = self.text[start:self.pos]
+        word_type = WORD_TYPES.get(word)
+
+        if word_type is None:
+            if not (word.isascii() and word.isidentifier()):
+                word = self.utf8_to_ascii(word)
+            return Token(NAME, word, self.line_num, self.indent_level)
+        elif word_type == OP and word in MULTI_WORD_OPERATORS:
+            word = self.join_multi_word(start, MULTI_WORD_OPERATORS)
+        elif word_type == KEYWORD and word in MULTI_WORD_KEYWORDS:
+            word = self.join_multi_word(start, MULTI_WORD_KEYWORDS)
+
+        return Token(word_type, word, self.line_num, self.indent_level)
+
+    def join_multi_word(self, start: int, multi_words: Tuple[str, ...]) -> str:
+        # The following token is lexed once and queued, so deciding whether to
+        # join never re-lexes anything.
+        word_state = self.pos, self._line_num, self._indent_level
+        next_token = self.get_next_token()
+        next_state = self.pos, self._line_num, self._indent_level
+        self.pos, self._line_num, self._indent_level = word_state
+        if next_token.value not in multi_words:
+            self.pending.appendleft((next_token, next_state))
+            return self.text[start:self.pos]
+
+        word = self.text[start:self.pos]
+        next_start = self.pos + 1
+        self.pos = WORD_RUN.match(self.text, next_start).end()
+        if (self.pos, self._line_num, self._indent_level) != next_state:
+            self.pending.clear()
+        return word + ' ' + self.text[next_start:self.pos]
+
+    def lex_number(self) -> Token:
+        text = self.text
+        end = len(text)
+        pos = start = self.pos
+        base = 10
+        while pos < end:
+            char = text[pos]
+            char_type = CHAR_TYPES.get(char) or self.get_typeof(char)
+            if char_type != NUMERIC and not (char == DOT and text[pos + 1:pos + 2] != DOT) \
+                    and char not in NUMBER_LETTERS:
+                break
+            if char_type == ALPHANUMERIC:
+                if char in BASE_PREFIXES and text[start] == '0' and pos - start == 1:
+                    base = BASE_PREFIXES[char]
+                    start = pos + 1
+                elif not (base == 16 and char in HEX_LETTERS):
+                    error("Unexpected number parsing")
+            pos += 1
+        self.pos = pos
+
+        value: Any = text[start:pos]
+        if '.' in value:
+            value = Decimal(value)
+            value_type = DOUBLE
+        else:
+            value = int(value, base)
+            value_type = INT
+        return Token(NUMBER, value, self.line_num, self.indent_level, value_type=value_type)
+
+    def lex_escape(self) -> Token:
+        line_num = self.line_num
+        self.pos += 1
+        if self.text[self.pos:self.pos + 1] == '\n':
+            self._line_num += 1
+        self.pos += 1
+        return Token(ESCAPE, '\\', line_num, self.indent_level)
+
+    def tokenize(self) -> TokenStream:
+        return TokenStream(self.analyse_tokens())
 
     def analyse_tokens(self) -> Iterator[Token]:
         token = self.get_next_token()
@@ -310,3 +363,6 @@ class Lexer(object):
         unicode = unicode[2:len(unicode) - 1]
 
         return unicode
+
+
+CHAR_TYPES: Dict[str, str] = {chr(code): Lexer.get_typeof(chr(code)) for code in range(128)}
@@ -1,14 +1,46 @@
 from .grammar import *
 
 
+MISSING = object()
+
+
 class OxyAST(object):
+    # resolved holds the type or symbol the Preprocessor resolved the node to
+    __slots__ = ('resolved',)
+    slot_names = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.slot_names = tuple(sorted({name for klass in cls.__mro__ for name in klass.__dict__.get('__slots__', ())}))
+
+    def attributes(self):
+        for key in self.slot_names:
+            value = getattr(self, key, MISSING)
+            if value is not MISSING:
+                yield key, value
+
+    def walk(self):
+        yield self
+        for key, value in self.attributes():
+            if key == 'resolved':
+                continue
+            if isinstance(value, dict):
+                value = value.values()
+            elif not isinstance(value, (list, tuple)):
+                value = (value,)
+            for child in value:
+                if isinstance(child, OxyAST):
+                    yield from child.walk()
+
     def __str__(self) -> str:
-        return '(' + ' '.join(str(value) for key, value in sorted(self.__dict__.items()) if not key.startswith("__") and key != 'read_only' and key != 'line_num' and value is not None) + ')'
+        return '(' + ' '.join(str(value) for key, value in self.attributes() if key not in ('read_only', 'line_num', 'resolved') and value is not None) + ')'
 
     __repr__ = __str__
 
 
 class OxyCompound(OxyAST):
+    __slots__ = ('children',)
+
     def __init__(self):
         self.children = []
 
@@ -19,6 +51,8 @@ class OxyCompound(OxyAST):
 
 
 class OxyProgram(OxyAST):
+    __slots__ = ('block',)
+
     def __init__(self, block: OxyCompound):
         self.block = block
 
@@ -29,6 +63,8 @@ class OxyProgram(OxyAST):
 
 
 class OxyVarDecl(OxyAST):
+    __slots__ = ('value', 'type', 'read_only', 'line_num')
+
     def __init__(self, value, type_node, line_num, read_only=False):
         self.value = value
         self.type = type_node
@@ -37,19 +73,23 @@ class OxyVarDecl(OxyAST):
 
 
 class OxyVar(OxyAST):
+    __slots__ = ('value', 'read_only', 'line_num')
+
     def __init__(self, value, line_num, read_only=False):
         self.value = value
         self.read_only = read_only
         self.line_num = line_num
 
     def __str__(self) -> str:
-        return ' '.join(str(value) for key, value in sorted(self.__dict__.items()) if not key.startswith("__") and key != 'read_only' and key != 'line_num')
+        return ' '.join(str(value) for key, value in self.attributes() if key not in ('read_only', 'line_num', 'resolved'))
 
     __repr__ = __str__
 
 
 class OxyFuncDecl(OxyAST):
-    def __init__(self, name, return_type, parameters, body, line_num, parameter_defaults=None, varargs=None):
+    __slots__ = ('name', 'return_type', 'parameters', 'parameter_defaults', 'body', 'line_num', 'varargs', 'operator')
+
+    def __init__(self, name, return_type, parameters, body, line_num, parameter_defaults=None, varargs=None, operator=None):
         self.name = name
         self.return_type = return_type
         self.parameters = parameters
@@ -57,9 +97,12 @@ class OxyFuncDecl(OxyAST):
         self.body = body
         self.line_num = line_num
         self.varargs = varargs
+        self.operator = operator
 
 
 class OxyExternFuncDecl(OxyAST):
+    __slots__ = ('name', 'return_type', 'parameters', 'varargs', 'line_num')
+
     def __init__(self, name, return_type, parameters, line_num, varargs=None):
         self.name = name
         self.return_type = return_type
@@ -69,6 +112,8 @@ class OxyExternFuncDecl(OxyAST):
 
 
 class OxyAnonymousFunc(OxyAST):
+    __slots__ = ('return_type', 'parameters', 'parameter_defaults', 'varargs', 'body', 'line_num')
+
     def __init__(self, return_type, parameters, body, line_num, parameter_defaults=None, varargs=None):
         self.return_type = return_type
         self.parameters = parameters
@@ -79,6 +124,8 @@ class OxyAnonymousFunc(OxyAST):
 
 
 class OxyFuncCall(OxyAST):
+    __slots__ = ('name', 'arguments', 'named_arguments', 'line_num')
+
     def __init__(self, name, arguments, line_num, named_arguments=None):
         self.name = name
         self.arguments = arguments
@@ -87,6 +134,8 @@ class OxyFuncCall(OxyAST):
 
 
 class OxyMethodCall(OxyAST):
+    __slots__ = ('obj', 'arguments', 'line_num', 'named_arguments', 'name')
+
     def __init__(self, obj, name, arguments, line_num, named_arguments=None):
         self.obj = obj
         self.arguments = arguments
@@ -96,12 +145,16 @@ class OxyMethodCall(OxyAST):
 
 
 class OxyReturn(OxyAST):
+    __slots__ = ('line_num', 'value')
+
     def __init__(self, value, line_num):
         self.line_num = line_num
         self.value = value
 
 
 class OxyEnumDecl(OxyAST):
+    __slots__ = ('line_num', 'name', 'fields')
+
     def __init__(self, name, fields, line_num):
         self.line_num = line_num
         self.name = name
@@ -109,6 +162,8 @@ class OxyEnumDecl(OxyAST):
 
 
 class OxyStructDecl(OxyAST):
+    __slots__ = ('name', 'fields', 'line_num', 'defaults')
+
     def __init__(self, name, fields, defaults, line_num):
         self.name = name
         self.fields = fields
@@ -117,6 +172,8 @@ class OxyStructDecl(OxyAST):
 
 
 class OxyClassDecl(OxyAST):
+    __slots__ = ('name', 'fields', 'instance_fields', 'base', 'methods')
+
     def __init__(self, name, base=None, methods=None, fields=None, instance_fields=None):
         self.name = name
         self.fields = fields
@@ -126,6 +183,8 @@ class OxyClassDecl(OxyAST):
 
 
 class OxyAssign(OxyAST):
+    __slots__ = ('op', 'line_num', 'left', 'right')
+
     def __init__(self, left, op, right, line_num):
         self.op = op
         self.line_num = line_num
@@ -134,6 +193,8 @@ class OxyAssign(OxyAST):
 
 
 class OxyOpAssign(OxyAST):
+    __slots__ = ('left', 'op', 'right', 'line_num')
+
     def __init__(self, left, op, right, line_num):
         self.left = left
         self.op = op
@@ -142,6 +203,8 @@ class OxyOpAssign(OxyAST):
 
 
 class OxyIncrementAssign(OxyAST):
+    __slots__ = ('left', 'op', 'line_num')
+
     def __init__(self, left, op, line_num):
         self.left = left
         self.op = op
@@ -149,6 +212,8 @@ class OxyIncrementAssign(OxyAST):
 
 
 class OxyIfExpr(OxyAST):
+    __slots__ = ('op', 'comps', 'blocks', 'indent_level', 'line_num')
+
     def __init__(self, op, comps, blocks, indent_level, line_num):
         self.op = op
         self.comps = comps
@@ -158,10 +223,12 @@ class OxyIfExpr(OxyAST):
 
 
 class OxyElseExpr(OxyAST):
-    pass
+    __slots__ = ()
 
 
 class OxyWhileExpr(OxyAST):
+    __slots__ = ('op', 'comp', 'block', 'line_num')
+
     def __init__(self, op, comp, block, line_num):
         self.op = op
         self.comp = comp
@@ -170,6 +237,8 @@ class OxyWhileExpr(OxyAST):
 
 
 class OxyForExpr(OxyAST):
+    __slots__ = ('iterator', 'block', 'elements', 'line_num')
+
     def __init__(self, iterator, block, elements, line_num):
         self.iterator = iterator
         self.block = block
@@ -178,11 +247,15 @@ class OxyForExpr(OxyAST):
 
 
 class OxyLoopBlock(OxyAST):
+    __slots__ = ('children',)
+
     def __init__(self):
         self.children = []
 
 
 class OxySwitchStmt(OxyAST):
+    __slots__ = ('value', 'cases', 'line_num')
+
     def __init__(self, value, cases, line_num):
         self.value = value
         self.cases = cases
@@ -190,6 +263,8 @@ class OxySwitchStmt(OxyAST):
 
 
 class OxyCaseStmt(OxyAST):
+    __slots__ = ('value', 'block', 'line_num')
+
     def __init__(self, value, block, line_num):
         self.value = value
         self.block = block
@@ -197,34 +272,46 @@ class OxyCaseStmt(OxyAST):
 
 
 class OxyBreakStmt(OxyAST):
+    __slots__ = ('line_num',)
+
     def __init__(self, line_num):
         self.line_num = line_num
 
 # TODO
 class OxyFTStmt(OxyAST):
+    __slots__ = ('line_num',)
+
     def __init__(self, line_num):
         self.line_num = line_num
 
 
 class OxyContinueStmt(OxyAST):
+    __slots__ = ('line_num',)
+
     def __init__(self, line_num):
         self.line_num = line_num
 
 
 # TODO
 class OxyPass(OxyAST):
+    __slots__ = ('line_num',)
+
     def __init__(self, line_num):
         self.line_num = line_num
 
 
 # Kinda works
 class OxyDeferStmt(OxyAST):
+    __slots__ = ('line_num', 'statement')
+
     def __init__(self, line_num, statement):
         self.line_num = line_num
         self.statement = statement
 
 
 class OxyBinOp(OxyAST):
+    __slots__ = ('left', 'op', 'right', 'line_num')
+
     def __init__(self, left, op, right, line_num):
         self.left = left
         self.op = op
@@ -233,6 +320,8 @@ class OxyBinOp(OxyAST):
 
 
 class OxyUnaryOp(OxyAST):
+    __slots__ = ('op', 'expr', 'line_num')
+
     def __init__(self, op, expr, line_num):
         self.op = op
         self.expr = expr
@@ -240,6 +329,8 @@ class OxyUnaryOp(OxyAST):
 
 
 class OxyRange(OxyAST):
+    __slots__ = ('left', 'right', 'value', 'line_num')
+
     def __init__(self, left, right, line_num):
         self.left = left
         self.right = right
@@ -248,6 +339,8 @@ class OxyRange(OxyAST):
 
 
 class OxyCollectionAccess(OxyAST):
+    __slots__ = ('collection', 'key', 'line_num')
+
     def __init__(self, collection, key, line_num):
         self.collection = collection
         self.key = key
@@ -255,6 +348,8 @@ class OxyCollectionAccess(OxyAST):
 
 
 class OxyDotAccess(OxyAST):
+    __slots__ = ('obj', 'field', 'line_num')
+
     def __init__(self, obj, field, line_num):
         self.obj = obj
         self.field = field
@@ -262,6 +357,8 @@ class OxyDotAccess(OxyAST):
 
 
 class OxyType(OxyAST):
+    __slots__ = ('value', 'func_params', 'func_ret_type', 'line_num')
+
     def __init__(self, value, line_num, func_params=None, func_ret_type=None):
         self.value = value
         self.func_params = func_params
@@ -270,6 +367,8 @@ class OxyType(OxyAST):
 
 
 class OxyTypeDecl(OxyAST):
+    __slots__ = ('name', 'collection', 'line_num')
+
     def __init__(self, name, collection, line_num):
         self.name = name
         self.collection = collection
@@ -278,16 +377,21 @@ class OxyTypeDecl(OxyAST):
 
 # TODO
 class OxyVoid(OxyAST):
+    __slots__ = ()
     value = VOID
 
 
 class OxyConstant(OxyAST):
+    __slots__ = ('value', 'line_num')
+
     def __init__(self, value, line_num):
         self.value = value
         self.line_num = line_num
 
 
 class OxyNum(OxyAST):
+    __slots__ = ('value', 'line_num', 'val_type')
+
     def __init__(self, value, val_type, line_num):
         self.value = value
         self.line_num = line_num
@@ -295,12 +399,16 @@ class OxyNum(OxyAST):
 
 
 class OxyStr(OxyAST):
+    __slots__ = ('line_num', 'value')
+
     def __init__(self, value, line_num):
         self.line_num = line_num
         self.value = value
 
 
 class OxyCollection(OxyAST):
+    __slots__ = ('type', 'read_only', 'line_num', 'items')
+
     def __init__(self, collection_type, line_num, read_only, *items):
         self.type = collection_type
         self.read_only = read_only
@@ -309,18 +417,24 @@ class OxyCollection(OxyAST):
 
 
 class OxyHashMap(OxyAST):
+    __slots__ = ('line_num', 'items')
+
     def __init__(self, items, line_num):
         self.line_num = line_num
         self.items = items
 
 
 class OxyPrintStmt(OxyAST):
+    __slots__ = ('line_num', 'value')
+
     def __init__(self, value, line_num):
         self.line_num = line_num
         self.value = value
 
 
 class OxyInputStmt(OxyAST):
+    __slots__ = ('line_num', 'value', 'type')
+
     def __init__(self, value, line_num):
         self.line_num = line_num
         self.value = value
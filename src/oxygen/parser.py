@@ -12,60 +12,75 @@ class Parser(object):
     def __init__(self, lexer):
         self.lexer = lexer
         self.file_name = lexer.file_name
-        self.current_token: Optional[Token] = None
+        self.tokens = lexer.tokenize()
+        self.token_index = -1
+        self.current_type: Optional[str] = None
+        self.current_value = None
         self.indent_level = 0
-        self.next_token()
+        self.advance()
         self.user_types = []
         self.func_args = False
 
     @property
     def line_num(self) -> int:
-        return self.current_token.line_num
+        return self.tokens.line_num(self.token_index)
 
-    def next_token(self):
+    @property
+    def current_indent_level(self) -> int:
+        return self.tokens.indent_level(self.token_index)
+
+    @property
+    def current_token(self) -> Token:
+        return self.tokens[self.token_index]
+
+    def advance(self):
+        self.token_index += 1
+        self.current_type = self.tokens.type(self.token_index)
+        self.current_value = self.tokens.value(self.token_index)
+
+    def next_token(self) -> Token:
         token = self.current_token
-        self.current_token = self.lexer.get_next_token()
+        self.advance()
         return token
 
     def consume_type(self, *token_type):
-        if self.current_token.type in token_type:
-            self.next_token()
+        if self.current_type in token_type:
+            self.advance()
         else:
             error('file={} line={} OxygenC Error: expected {}'.format(
                 self.file_name, self.line_num, ", ".join(token_type)))
 
     def consume_value(self, *token_value):
-        if self.current_token.value in token_value:
-            self.next_token()
+        if self.current_value in token_value:
+            self.advance()
         else:
             error('file={} line={} OxygenC Error: expected {}'.format(
                 self.file_name, self.line_num, ", ".join(token_value)))
 
     def preview(self, num=1):
-        return self.lexer.view_next_token(num)
-
-    def parse_find_until(self, to_find, until):
-        num = 0
-        x = None
-        while x != until:
-            num += 1
-            x = self.lexer.view_next_token(num).value
-            if x == to_find:
-                return True
-            elif x == EOF:
-                error('file={} line={} OxygenC Error: expected {}'.format(
-                    self.file_name, self.line_num, to_find))
-
-        return False
+        return self.tokens[self.token_index + num]
+
+    def preview_type(self, num=1):
+        return self.tokens.type(self.token_index + num)
+
+    def preview_value(self, num=1):
+        return self.tokens.value(self.token_index + num)
+
+    def parse_is_tuple(self):
+        if self.tokens.closing_bracket(self.token_index) is None:
+            error('file={} line={} OxygenC Error: expected {}'.format(
+                self.file_name, self.line_num, RPAREN))
+
+        return self.tokens.has_top_level_comma(self.token_index)
 
     def parse_handle_indents(self):
-        while self.current_token.type == NEWLINE:
+        while self.current_type == NEWLINE:
             self.consume_type(NEWLINE)
-        return self.current_token.indent_level == self.indent_level
+        return self.current_indent_level == self.indent_level
 
     def parse_program_text(self):
         root = OxyCompound()
-        while self.current_token.type != EOF:
+        while self.current_type != EOF:
             comp = self.parse_compound_stmt()
             root.children.extend(comp.children)
         return OxyProgram(root)
@@ -77,7 +92,7 @@ class Parser(object):
         self.consume_type(NEWLINE)
         self.indent_level += 1
         fields = []
-        while self.current_token.indent_level > name.indent_level:
+        while self.current_indent_level > name.indent_level:
             field = self.next_token().value
             fields.append(field)
 
@@ -94,12 +109,12 @@ class Parser(object):
         self.indent_level += 1
         fields = OrderedDict()
         defaults = {}
-        while self.current_token.indent_level > name.indent_level:
+        while self.current_indent_level > name.indent_level:
             field = self.next_token().value
             self.consume_value(COLON)
             field_type = self.type_spec()
             fields[field] = field_type
-            if self.current_token.value == ASSIGN:
+            if self.current_value == ASSIGN:
                 self.consume_value(ASSIGN)
                 defaults[field] = self.parse_any_expr()
 
@@ -112,38 +127,38 @@ class Parser(object):
         methods = []
         fields = OrderedDict()
         instance_fields = None
-        self.next_token()
+        self.advance()
         class_name = self.current_token
         self.user_types.append(class_name.value)
         self.consume_type(NAME)
-        if self.current_token.value == COLON:
+        if self.current_value == COLON:
             self.consume_value(COLON)
             base = self.type_spec()
         self.consume_type(NEWLINE)
         self.indent_level += 1
         while self.parse_handle_indents():
-            if self.current_token.type == NEWLINE:
+            if self.current_type == NEWLINE:
                 self.consume_type(NEWLINE)
                 continue
-            if self.current_token.type == NAME and self.preview().value == COLON:
-                field = self.current_token.value
+            if self.current_type == NAME and self.preview_value() == COLON:
+                field = self.current_value
                 self.consume_type(NAME)
                 self.consume_value(COLON)
                 field_type = self.type_spec()
                 fields[field] = field_type
                 self.consume_type(NEWLINE)
-            if self.current_token.value == FUN:
+            if self.current_value == FUN:
                 methods.append(self.method_declaration(class_name))
         self.indent_level -= 1
         return OxyClassDecl(class_name.value, base, methods, fields, instance_fields)
 
     def parse_var_decl(self):
-        var_node = OxyVar(self.current_token.value, self.line_num)
+        var_node = OxyVar(self.current_value, self.line_num)
         self.consume_type(NAME)
         self.consume_value(COLON)
         type_node = self.type_spec()
         var = OxyVarDecl(var_node, type_node, self.line_num)
-        if self.current_token.value == ASSIGN:
+        if self.current_value == ASSIGN:
             var = self.parse_var_assingment(var)
         return var
 
@@ -161,13 +176,13 @@ class Parser(object):
         op_func = False
         extern_func = False
         self.consume_value(FUN)
-        if self.current_token.value == LPAREN:
+        if self.current_value == LPAREN:
             name = ANON
-        elif self.current_token.value == OPERATOR:
+        elif self.current_value == OPERATOR:
             self.consume_value(OPERATOR)
             op_func = True
             name = self.next_token()
-        elif self.current_token.value == EXTERN:
+        elif self.current_value == EXTERN:
             self.consume_value(EXTERN)
             extern_func = True
             name = self.next_token()
@@ -177,23 +192,23 @@ class Parser(object):
         params = OrderedDict()
         param_defaults = {}
         vararg = None
-        while self.current_token.value != RPAREN:
-            param_name = self.current_token.value
+        while self.current_value != RPAREN:
+            param_name = self.current_value
             self.consume_type(NAME)
-            if self.current_token.value == COLON:
+            if self.current_value == COLON:
                 self.consume_value(COLON)
                 param_type = self.type_spec()
             else:
-                param_type = self.variable(self.current_token)
+                param_type = self.variable(self.current_value)
 
             params[param_name] = param_type
-            if self.current_token.value != RPAREN:
-                if self.current_token.value == ASSIGN:
+            if self.current_value != RPAREN:
+                if self.current_value == ASSIGN:
                     if extern_func:
                         error("Extern functions cannot have defaults")
                     self.consume_value(ASSIGN)
                     param_defaults[param_name] = self.parse_any_expr()
-                if self.current_token.value == ELLIPSIS:
+                if self.current_value == ELLIPSIS:
                     key, value = params.popitem()
                     if not vararg:
                         vararg = []
@@ -201,17 +216,17 @@ class Parser(object):
                     vararg.append(value)
                     self.consume_value(ELLIPSIS)
                     break
-                if self.current_token.value != RPAREN:
+                if self.current_value != RPAREN:
                     self.consume_value(COMMA)
         self.consume_value(RPAREN)
 
-        if self.current_token.value != ARROW:
+        if self.current_value != ARROW:
             return_type = OxyVoid()
         else:
             self.consume_value(ARROW)
-            if self.current_token.value == VOID:
+            if self.current_value == VOID:
                 return_type = OxyVoid()
-                self.next_token()
+                self.advance()
             else:
                 return_type = self.type_spec()
 
@@ -224,18 +239,20 @@ class Parser(object):
         self.indent_level -= 1
         if name == ANON:
             return OxyAnonymousFunc(return_type, params, stmts, self.line_num, param_defaults, vararg)
+        operator = None
         if op_func:
             if len(params) not in (1, 2):  # TODO: move this to type checker
                 error(
                     "Operators can either be unary or binary, and the number of parameters do not match")
 
+            operator = name.value
             name.value = OPERATOR + '.' + name.value
             for param in params:
                 type_name = str(type_map[str(params[param].value)]) if str(
                     params[param].value) in type_map else str(params[param].value)
                 name.value += '.' + type_name
 
-        return OxyFuncDecl(name.value, return_type, params, stmts, self.line_num, param_defaults, vararg)
+        return OxyFuncDecl(name.value, return_type, params, stmts, self.line_num, param_defaults, vararg, operator)
 
     def method_declaration(self, class_name):
         self.consume_value(FUN)
@@ -245,21 +262,21 @@ class Parser(object):
         param_defaults = {}
         vararg = None
         params[SELF] = class_name
-        while self.current_token.value != RPAREN:
-            param_name = self.current_token.value
+        while self.current_value != RPAREN:
+            param_name = self.current_value
             self.consume_type(NAME)
-            if self.current_token.value == COLON:
+            if self.current_value == COLON:
                 self.consume_value(COLON)
                 param_type = self.type_spec()
             else:
-                param_type = self.variable(self.current_token)
+                param_type = self.variable(self.current_value)
 
             params[param_name] = param_type
-            if self.current_token.value != RPAREN:
-                if self.current_token.value == ASSIGN:
+            if self.current_value != RPAREN:
+                if self.current_value == ASSIGN:
                     self.consume_value(ASSIGN)
                     param_defaults[param_name] = self.parse_any_expr()
-                if self.current_token.value == ELLIPSIS:
+                if self.current_value == ELLIPSIS:
                     key, value = params.popitem()
                     if not vararg:
                         vararg = []
@@ -267,17 +284,17 @@ class Parser(object):
                     vararg.append(value)
                     self.consume_value(ELLIPSIS)
                     break
-                if self.current_token.value != RPAREN:
+                if self.current_value != RPAREN:
                     self.consume_value(COMMA)
         self.consume_value(RPAREN)
 
-        if self.current_token.value != ARROW:
+        if self.current_value != ARROW:
             return_type = OxyVoid()
         else:
             self.consume_value(ARROW)
-            if self.current_token.value == VOID:
+            if self.current_value == VOID:
                 return_type = OxyVoid()
-                self.next_token()
+                self.advance()
             else:
                 return_type = self.type_spec()
 
@@ -308,23 +325,23 @@ class Parser(object):
         self.consume_value(LPAREN)
         args = []
         named_args = {}
-        while self.current_token.value != RPAREN:
-            while self.current_token.type == NEWLINE:
+        while self.current_value != RPAREN:
+            while self.current_type == NEWLINE:
                 self.consume_type(NEWLINE)
-            if self.current_token.value in (LPAREN, LBRACK, LBRACE):
+            if self.current_value in (LPAREN, LBRACK, LBRACE):
                 args.append(self.bracket_literal())
-            elif self.preview().value == ASSIGN:
+            elif self.preview_value() == ASSIGN:
                 name = self.parse_any_expr().value
                 self.consume_value(ASSIGN)
                 named_args[name] = self.parse_any_expr()
             else:
                 args.append(self.parse_any_expr())
-            while self.current_token.type == NEWLINE:
+            while self.current_type == NEWLINE:
                 self.consume_type(NEWLINE)
-            if self.current_token.value != RPAREN:
+            if self.current_value != RPAREN:
                 self.consume_value(COMMA)
         func = OxyFuncCall(token.value, args, self.line_num, named_args)
-        self.next_token()
+        self.advance()
         return func
 
     def type_spec(self):
@@ -337,30 +354,30 @@ class Parser(object):
         func_ret_type = None
         func_params = OrderedDict()
         param_num = 0
-        if self.current_token.value == LESS_THAN and token.value in (LIST, TUPLE):
-            self.next_token()
-            while self.current_token.value != GREATER_THAN:
+        if self.current_value == LESS_THAN and token.value in (LIST, TUPLE):
+            self.advance()
+            while self.current_value != GREATER_THAN:
                 param_type = self.type_spec()
                 func_params[str(param_num)] = param_type
                 param_num += 1
-                if self.current_token.value != GREATER_THAN:
+                if self.current_value != GREATER_THAN:
                     self.consume_value(COMMA)
 
             self.consume_value(GREATER_THAN)
             type_spec.func_params = func_params
 
-        elif self.current_token.value == LESS_THAN and token.value == FUNC:
-            self.next_token()
-            while self.current_token.value != GREATER_THAN:
+        elif self.current_value == LESS_THAN and token.value == FUNC:
+            self.advance()
+            while self.current_value != GREATER_THAN:
                 param_type = self.type_spec()
                 func_params[str(param_num)] = param_type
                 param_num += 1
-                if self.current_token.value != GREATER_THAN:
+                if self.current_value != GREATER_THAN:
                     self.consume_value(COMMA)
 
             self.consume_value(GREATER_THAN)
-            if self.current_token.value == ARROW:
-                self.next_token()
+            if self.current_value == ARROW:
+                self.advance()
                 func_ret_type = self.type_spec()
             else:
                 func_ret_type = OxyType(VOID, self.line_num)
@@ -379,105 +396,105 @@ class Parser(object):
 
     def parse_stmt_list(self):
         node = self.parse_stmt()
-        if self.current_token.type == NEWLINE:
-            self.next_token()
+        if self.current_type == NEWLINE:
+            self.advance()
         if isinstance(node, OxyReturn):
             return [node]
         results = [node]
         while self.parse_handle_indents():
             results.append(self.parse_stmt())
-            if self.current_token.type == NEWLINE:
-                self.next_token()
-            elif self.current_token.type == EOF:
+            if self.current_type == NEWLINE:
+                self.advance()
+            elif self.current_type == EOF:
                 results = [x for x in results if x is not None]
                 break
         return results
 
     def parse_stmt(self):
-        if self.current_token.value == IF:
+        if self.current_value == IF:
             node = self.parse_if_expr()
-        elif self.current_token.value == WHILE:
+        elif self.current_value == WHILE:
             node = self.parse_while_expr()
-        elif self.current_token.value == FOR:
+        elif self.current_value == FOR:
             node = self.parse_for_stmt()
-        elif self.current_token.value == FALLTHROUGH:
-            self.next_token()
+        elif self.current_value == FALLTHROUGH:
+            self.advance()
             node = OxyFTStmt(self.line_num)
-        elif self.current_token.value == BREAK:
-            self.next_token()
+        elif self.current_value == BREAK:
+            self.advance()
             node = OxyBreakStmt(self.line_num)
-        elif self.current_token.value == CONTINUE:
-            self.next_token()
+        elif self.current_value == CONTINUE:
+            self.advance()
             node = OxyContinueStmt(self.line_num)
-        elif self.current_token.value == PASS:
-            self.next_token()
+        elif self.current_value == PASS:
+            self.advance()
             node = OxyPass(self.line_num)
-        elif self.current_token.value == CONST:
+        elif self.current_value == CONST:
             node = self.parse_assign_stmt(self.current_token)
-        elif self.current_token.value == DEFER:
-            self.next_token()
+        elif self.current_value == DEFER:
+            self.advance()
             node = OxyDeferStmt(self.line_num, self.parse_stmt())
-        elif self.current_token.value == SWITCH:
-            self.next_token()
+        elif self.current_value == SWITCH:
+            self.advance()
             node = self.parse_switch_stmt()
-        elif self.current_token.value == RETURN:
+        elif self.current_value == RETURN:
             node = self.parse_return_statement()
-        elif self.current_token.type == NAME:
-            if self.preview().value == DOT:
+        elif self.current_type == NAME:
+            if self.preview_value() == DOT:
                 node = self.parse_prop_method(self.next_token())
-            elif self.preview().value == COLON:
+            elif self.preview_value() == COLON:
                 node = self.parse_var_decl()
             else:
                 node = self.parse_name_stmt()
-        elif self.current_token.value == FUN:
+        elif self.current_value == FUN:
             node = self.function_declaration()
-        elif self.current_token.value == TYPE:
+        elif self.current_value == TYPE:
             node = self.parse_type_decl()
-        elif self.current_token.type == LTYPE:
-            if self.current_token.value == STRUCT:
+        elif self.current_type == LTYPE:
+            if self.current_value == STRUCT:
                 node = self.parse_struct_decl()
-            elif self.current_token.value == OBJECT:
+            elif self.current_value == OBJECT:
                 node = self.parse_class_decl()
-            elif self.current_token.value == ENUM:
+            elif self.current_value == ENUM:
                 node = self.parse_enum_decl()
-        elif self.current_token.value == EOF:
+        elif self.current_value == EOF:
             return
         else:
-            self.next_token()
+            self.advance()
             node = self.parse_stmt()
         return node
 
     def parse_square_bracket_expr(self, token):
         if token.value == LBRACK:
             items = []
-            while self.current_token.value != RBRACK:
+            while self.current_value != RBRACK:
                 items.append(self.parse_any_expr())
-                if self.current_token.value == COMMA:
-                    self.next_token()
+                if self.current_value == COMMA:
+                    self.advance()
                 else:
                     break
             self.consume_value(RBRACK)
             return OxyCollection(LIST, self.line_num, False, *items)
-        elif self.current_token.type == LTYPE:
+        elif self.current_type == LTYPE:
             type_token = self.next_token()
-            if self.current_token.value == COMMA:
+            if self.current_value == COMMA:
                 return self.parse_dict_literal(token)
-            elif self.current_token.value == RBRACK:
-                self.next_token()
+            elif self.current_value == RBRACK:
+                self.advance()
                 return self.parse_collection_literal(token, type_token)
-        elif self.current_token.type == NUMBER:
+        elif self.current_type == NUMBER:
             tok = self.parse_any_expr()
-            if self.current_token.value == COMMA:
+            if self.current_value == COMMA:
                 return self.parse_slice_expr(tok)
             else:
                 self.consume_value(RBRACK)
                 access = self.parse_acc_coll(token, tok)
-                if self.current_token.value in ASSIGNMENT_OP:
+                if self.current_value in ASSIGNMENT_OP:
                     op = self.current_token
                     if op.value in INCREMENTAL_ASSIGNMENT_OP:
                         return OxyIncrementAssign(access, op.value, self.line_num)
                     else:
-                        self.next_token()
+                        self.advance()
                         right = self.parse_any_expr()
                         if op.value == ASSIGN:
                             return OxyAssign(access, op.value, right, self.line_num)
@@ -487,7 +504,7 @@ class Parser(object):
         elif token.type == NAME:
             self.consume_value(LBRACK)
             tok = self.parse_any_expr()
-            if self.current_token.value == COMMA:
+            if self.current_value == COMMA:
                 return self.parse_slice_expr(tok)
 
             self.consume_value(RBRACK)
@@ -501,12 +518,12 @@ class Parser(object):
     def parse_cbrace_expr(self, token):
         if token.value == LBRACE:
             pairs = OrderedDict()
-            while self.current_token.value != RBRACE:
+            while self.current_value != RBRACE:
                 key = self.parse_any_expr()
                 self.consume_value(ASSIGN)
                 pairs[key.value] = self.parse_any_expr()
-                if self.current_token.value == COMMA:
-                    self.next_token()
+                if self.current_value == COMMA:
+                    self.advance()
                 else:
                     break
             self.consume_value(RBRACE)
@@ -517,17 +534,17 @@ class Parser(object):
     def parse_tuple_literal(self, token):
         if token.value == LPAREN:
             items = []
-            while self.current_token.value != RPAREN:
+            while self.current_value != RPAREN:
                 items.append(self.parse_any_expr())
-                if self.current_token.value == COMMA:
-                    self.next_token()
+                if self.current_value == COMMA:
+                    self.advance()
                 else:
                     break
             self.consume_value(RPAREN)
             return OxyCollection(TUPLE, self.line_num, False, *items)
 
     def parse_collection_literal(self, token, type_token):
-        if self.current_token.value == ASSIGN:
+        if self.current_value == ASSIGN:
             return self.parse_aot_assign(token, type_token)
         else:
             raise NotImplementedError
@@ -540,18 +557,18 @@ class Parser(object):
 
     def parse_dot_operator(self, token):
         self.consume_value(DOT)
-        field = self.current_token.value
-        self.next_token()
+        field = self.current_value
+        self.advance()
         return OxyDotAccess(token.value, field, self.line_num)
 
     def parse_name_stmt(self):
         token = self.next_token()
-        if self.current_token.value == LPAREN:
+        if self.current_value == LPAREN:
             node = self.function_call(token)
-        elif self.current_token.value == LBRACK:
-            self.next_token()
+        elif self.current_value == LBRACK:
+            self.advance()
             node = self.parse_square_bracket_expr(token)
-        elif self.current_token.value in ASSIGNMENT_OP:
+        elif self.current_value in ASSIGNMENT_OP:
             node = self.parse_assign_stmt(token)
         else:
             raise SyntaxError('Line {}'.format(self.line_num))
@@ -559,8 +576,8 @@ class Parser(object):
 
     def parse_prop_method(self, token):
         self.consume_value(DOT)
-        field = self.current_token.value
-        self.next_token()
+        field = self.current_value
+        self.advance()
         left = OxyDotAccess(token.value, field, self.line_num)
         token = self.next_token()
         if token.value in ASSIGNMENT_OP:
@@ -571,24 +588,24 @@ class Parser(object):
     def parse_method_call(self, _, left):
         args = []
         named_args = {}
-        while self.current_token.value != RPAREN:
-            while self.current_token.type == NEWLINE:
+        while self.current_value != RPAREN:
+            while self.current_type == NEWLINE:
                 self.consume_type(NEWLINE)
-            if self.current_token.value in (LPAREN, LBRACK, LBRACE):
+            if self.current_value in (LPAREN, LBRACK, LBRACE):
                 args.append(self.bracket_literal())
-            elif self.preview().value == ASSIGN:
+            elif self.preview_value() == ASSIGN:
                 name = self.parse_any_expr().value
                 self.consume_value(ASSIGN)
                 named_args[name] = self.parse_any_expr()
             else:
                 args.append(self.parse_any_expr())
-            while self.current_token.type == NEWLINE:
+            while self.current_type == NEWLINE:
                 self.consume_type(NEWLINE)
-            if self.current_token.value != RPAREN:
+            if self.current_value != RPAREN:
                 self.consume_value(COMMA)
         method = OxyMethodCall(left.obj, left.field, args,
                                self.line_num, named_args)
-        self.next_token()
+        self.advance()
         return method
 
     def parse_field_assign(self, token, left):
@@ -609,7 +626,7 @@ class Parser(object):
         raise NotImplementedError
 
     def parse_return_statement(self):
-        self.next_token()
+        self.advance()
         return OxyReturn(self.parse_any_expr(), self.line_num)
 
     def parse_if_expr(self):
@@ -617,15 +634,15 @@ class Parser(object):
         token = self.next_token()
         comp = OxyIfExpr(token.value, [self.parse_any_expr()], [
                          self.parse_compound_stmt()], token.indent_level, self.line_num)
-        if self.current_token.indent_level < comp.indent_level:
+        if self.current_indent_level < comp.indent_level:
             self.indent_level -= 1
             return comp
-        while self.current_token.value == ELSE_IF:
-            self.next_token()
+        while self.current_value == ELSE_IF:
+            self.advance()
             comp.comps.append(self.parse_any_expr())
             comp.blocks.append(self.parse_compound_stmt())
-        if self.current_token.value == ELSE:
-            self.next_token()
+        if self.current_value == ELSE:
+            self.advance()
             comp.comps.append(OxyElseExpr())
             comp.blocks.append(self.parse_compound_stmt())
         self.indent_level -= 1
@@ -641,15 +658,15 @@ class Parser(object):
 
     def parse_for_stmt(self):
         self.indent_level += 1
-        self.next_token()
+        self.advance()
         elements = []
-        while self.current_token.value != IN:
+        while self.current_value != IN:
             elements.append(self.parse_any_expr())
-            if self.current_token.value == COMMA:
+            if self.current_value == COMMA:
                 self.consume_value(COMMA)
         self.consume_value(IN)
         iterator = self.parse_any_expr()
-        if self.current_token.value == NEWLINE:
+        if self.current_value == NEWLINE:
             self.consume_type(NEWLINE)
         block = self.parse_loop_block()
         loop = OxyForExpr(iterator, block, elements, self.line_num)
@@ -660,24 +677,24 @@ class Parser(object):
         self.indent_level += 1
         value = self.parse_any_expr()
         switch = OxySwitchStmt(value, [], self.line_num)
-        if self.current_token.type == NEWLINE:
-            self.next_token()
+        if self.current_type == NEWLINE:
+            self.advance()
         while self.parse_handle_indents():
             switch.cases.append(self.case_statement())
-            if self.current_token.type == NEWLINE:
-                self.next_token()
-            elif self.current_token.type == EOF:
+            if self.current_type == NEWLINE:
+                self.advance()
+            elif self.current_type == EOF:
                 return switch
         self.indent_level -= 1
         return switch
 
     def case_statement(self):
         self.indent_level += 1
-        if self.current_token.value == CASE:
-            self.next_token()
+        if self.current_value == CASE:
+            self.advance()
             value = self.parse_any_expr()
-        elif self.current_token.value == DEFAULT:
-            self.next_token()
+        elif self.current_value == DEFAULT:
+            self.advance()
             value = DEFAULT
         else:
             raise SyntaxError
@@ -695,12 +712,12 @@ class Parser(object):
     def parse_assign_stmt(self, token):
         if token.value == CONST:
             read_only = True
-            self.next_token()
+            self.advance()
             token = self.current_token
-            self.next_token()
+            self.advance()
         else:
             read_only = False
-        left = self.variable(token, read_only)
+        left = self.variable(token.value, read_only)
         token = self.next_token()
         if token.value == ASSIGN:
             right = self.parse_any_expr()
@@ -719,101 +736,119 @@ class Parser(object):
                 'Unknown assignment operator: {}'.format(token.value))
         return node
 
-    def typ(self, token):
-        return OxyType(token.value, self.line_num)
+    def typ(self, value):
+        return OxyType(value, self.line_num)
 
-    def variable(self, token, read_only=False):
-        return OxyVar(token.value, self.line_num, read_only)
+    def variable(self, value, read_only=False):
+        return OxyVar(value, self.line_num, read_only)
 
-    def parse_const_expr(self, token):
-        return OxyConstant(token.value, self.line_num)
+    def parse_const_expr(self, value):
+        return OxyConstant(value, self.line_num)
 
     def parse_factoring(self):
-        token = self.current_token
-        preview = self.preview()
-        if preview.value == DOT:
-            if self.preview(2).type == NAME and self.preview(3).value == LPAREN:
+        token_type = self.current_type
+        value = self.current_value
+        preview = self.preview_value()
+        if preview == DOT:
+            if self.preview_type(2) == NAME and self.preview_value(3) == LPAREN:
                 return self.parse_prop_method(self.next_token())
 
-            self.next_token()
-            return self.parse_dot_operator(token)
-        elif token.value in (PLUS, MINUS, BINARY_ONES_COMPLIMENT):
-            self.next_token()
-            return OxyUnaryOp(token.value, self.parse_factoring(), self.line_num)
-        elif token.value == NOT:
-            self.next_token()
-            return OxyUnaryOp(token.value, self.parse_any_expr(), self.line_num)
-        elif token.type == NUMBER:
-            self.next_token()
-            return OxyNum(token.value, token.value_type, self.line_num)
-        elif token.type == STRING:
-            self.next_token()
-            return OxyStr(token.value, self.line_num)
-        elif token.value == FUN:
+            return self.parse_dot_operator(self.next_token())
+        elif value in (PLUS, MINUS, BINARY_ONES_COMPLIMENT):
+            self.advance()
+            return OxyUnaryOp(value, self.parse_factoring(), self.line_num)
+        elif value == NOT:
+            self.advance()
+            return OxyUnaryOp(value, self.parse_comparison_expr(), self.line_num)
+        elif token_type == NUMBER:
+            value_type = self.tokens.value_type(self.token_index)
+            self.advance()
+            return OxyNum(value, value_type, self.line_num)
+        elif token_type == STRING:
+            self.advance()
+            return OxyStr(value, self.line_num)
+        elif value == FUN:
             return self.function_declaration()
-        elif token.type == LTYPE:
+        elif token_type == LTYPE:
             return self.type_spec()
-        elif token.value == LPAREN:
-            if self.func_args or not self.parse_find_until(COMMA, RPAREN):
+        elif value == LPAREN:
+            if self.func_args or not self.parse_is_tuple():
                 self.func_args = False
-                if preview.value == RPAREN:
+                if preview == RPAREN:
                     return []
 
-                self.next_token()
+                self.advance()
                 node = self.parse_any_expr()
                 self.consume_value(RPAREN)
             else:
-                token = self.next_token()
-                node = self.parse_tuple_literal(token)
+                node = self.parse_tuple_literal(self.next_token())
 
             return node
-        elif preview.value == LPAREN:
-            self.next_token()
-            return self.function_call(token)
-        elif preview.value == LBRACK:
-            self.next_token()
-            return self.parse_square_bracket_expr(token)
-        elif token.value == LBRACK:
-            self.next_token()
-            return self.parse_square_bracket_expr(token)
-        elif token.value == LBRACE:
-            self.next_token()
-            return self.parse_cbrace_expr(token)
-        elif token.type == NAME:
-            self.next_token()
-            if token.value in self.user_types:
-                return self.typ(token)
-            return self.variable(token)
-        elif token.type == CONSTANT:
-            self.next_token()
-            return self.parse_const_expr(token)
+        elif preview == LPAREN:
+            return self.function_call(self.next_token())
+        elif preview == LBRACK or value == LBRACK:
+            return self.parse_square_bracket_expr(self.next_token())
+        elif value == LBRACE:
+            return self.parse_cbrace_expr(self.next_token())
+        elif token_type == NAME:
+            self.advance()
+            if value in self.user_types:
+                return self.typ(value)
+            return self.variable(value)
+        elif token_type == CONSTANT:
+            self.advance()
+            return self.parse_const_expr(value)
         else:
             raise SyntaxError
 
     def parse_any_term(self):
         node = self.parse_factoring()
-        ops = (MUL, DIV, FLOORDIV, MOD, POWER, CAST, RANGE) + \
-            COMPARISON_OP + LOGICAL_OP + BINARY_OP
-        while self.current_token.value in ops:
-            token = self.next_token()
-            if token.value in COMPARISON_OP or token.value in LOGICAL_OP or token.value in BINARY_OP:
-                node = OxyBinOp(node, token.value, self.parse_any_expr(), self.line_num)
-            elif token.value == RANGE:
+        ops = (MUL, DIV, FLOORDIV, MOD, POWER, CAST, RANGE) + BINARY_OP
+        while self.current_value in ops:
+            op = self.current_value
+            self.advance()
+            if op in BINARY_OP:
+                node = OxyBinOp(node, op, self.parse_arith_expr(), self.line_num)
+            elif op == RANGE:
                 node = OxyRange(node, self.parse_any_expr(), self.line_num)
             else:
-                node = OxyBinOp(node, token.value,
+                node = OxyBinOp(node, op,
                                 self.parse_factoring(), self.line_num)
         return node
 
     def parse_any_expr(self):
+        # Precedence from loosest to tightest: or, and, comparisons, + and -, then the term operators
+        node = self.parse_and_expr()
+        while self.current_value == OR:
+            self.advance()
+            node = OxyBinOp(node, OR, self.parse_and_expr(), self.line_num)
+        return node
+
+    def parse_and_expr(self):
+        node = self.parse_comparison_expr()
+        while self.current_value == AND:
+            self.advance()
+            node = OxyBinOp(node, AND, self.parse_comparison_expr(), self.line_num)
+        return node
+
+    def parse_comparison_expr(self):
+        node = self.parse_arith_expr()
+        while self.current_value in COMPARISON_OP:
+            op = self.current_value
+            self.advance()
+            node = OxyBinOp(node, op, self.parse_arith_expr(), self.line_num)
+        return node
+
+    def parse_arith_expr(self):
         node = self.parse_any_term()
-        while self.current_token.value in (PLUS, MINUS):
-            token = self.next_token()
-            node = OxyBinOp(node, token.value, self.parse_any_term(), self.line_num)
+        while self.current_value in (PLUS, MINUS):
+            op = self.current_value
+            self.advance()
+            node = OxyBinOp(node, op, self.parse_any_term(), self.line_num)
         return node
 
     def parse(self) -> OxyProgram:
         node = self.parse_program_text()
-        if self.current_token.type != EOF:
+        if self.current_type != EOF:
             raise SyntaxError('Unexpected end of program')
         return node
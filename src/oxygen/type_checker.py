@@ -1,12 +1,16 @@
 from typing import Iterator, Union, List, Tuple, Any
 
 from oxygen.oxyast import OxyCollection, OxyCollectionAccess, OxyDotAccess, OxyRange, OxyVar, OxyVarDecl, OxyAST
+from oxygen.compiler.types import canonical_compatible, canonical_type
 from oxygen.grammar import *
 from oxygen.utils import error, warning
-from oxygen.visitor import (LLVMTypeSymbol, OxyClassSymbol, OxyCollectionSymbol,
+from oxygen.visitor import (LLVMTypeSymbol, OxyBuiltinFuncSymbol, OxyClassSymbol, OxyCollectionSymbol,
                             OxyEnumSymbol, OxyFuncSymbol, OxyNodeVisitor, OxyStructSymbol,
                             OxyTypeSymbol, OxyVarSymbol)
 
+# Tuple literals may share constant storage, so only methods that read it are allowed
+TUPLE_METHODS = ('get', 'length', 'index', 'count')
+
 
 def flatten(container: Union[List[Any], Tuple[Any, ...]]) -> Iterator[list]:
     for i in container:
@@ -21,15 +25,12 @@ def flatten(container: Union[List[Any], Tuple[Any, ...]]) -> Iterator[list]:
 def types_compatible(left_type: OxyAST, right_type: OxyAST) -> bool:
     l_type = str(left_type)
     r_type = str(right_type)
-    int_type = ('i8', 'i16', 'i32', 'i64', 'int8',
-                'int16', 'int32', 'int64', 'int')
-    float_type = ('float', 'double')
-    num_type = int_type + float_type
-    if (l_type == r_type) or \
-       (l_type in num_type and r_type in num_type):
+    if l_type == r_type:
         return True
 
-    return False
+    left = canonical_type(l_type)
+    right = canonical_type(r_type)
+    return left is not None and right is not None and canonical_compatible(left, right)
 
 
 class Preprocessor(OxyNodeVisitor):
@@ -40,17 +41,26 @@ class Preprocessor(OxyNodeVisitor):
 
     def check(self, node) -> LLVMTypeSymbol:
         res = self.visit(node)
-        if self.unvisited_symbols:
-            sym_list = []
-            for sym_name in self.unvisited_symbols:
-                if "." in sym_name:
-                    continue
-                sym_list.append(sym_name)
-            if len(sym_list):
-                warning('Unused variables ({})'.format(
-                    ','.join(sym_name for sym_name in sym_list)))
+        self.warn_unused(self.top_scope)
         return res
 
+    def visit(self, node):
+        resolved = super().visit(node)
+        node.resolved = resolved
+        return resolved
+
+    def drop_top_scope(self):
+        self.warn_unused(self.top_scope)
+        super().drop_top_scope()
+
+    @staticmethod
+    def warn_unused(scope):
+        sym_list = [sym_name for sym_name, sym_val in scope.items() if
+                    not isinstance(sym_val, (LLVMTypeSymbol, OxyBuiltinFuncSymbol)) and not
+                    sym_val.accessed and sym_name != '_' and "." not in sym_name]
+        if sym_list:
+            warning('Unused variables ({})'.format(','.join(sym_list)))
+
     def visit_program(self, node):
         return self.visit(node.block)
 
@@ -133,6 +143,9 @@ class Preprocessor(OxyNodeVisitor):
             typ.return_type = self.visit(node.func_ret_type)
         return typ
 
+    def visit_void(self, node):
+        return self.search_scopes(node.value)
+
     def visit_assign(self, node):  # TODO clean up this mess of a function
         collection_type = None
         field_assignment = None
@@ -224,6 +237,8 @@ class Preprocessor(OxyNodeVisitor):
             value = self.visit(node.right)
             if isinstance(value, OxyVarSymbol):
                 value = value.type
+        if isinstance(var_name, OxyVar):  # declarations wrap the variable in an OxyVarDecl
+            var_name = var_name.value
         lookup_var = self.search_scopes(var_name)
         if not lookup_var:
             if collection_type:
@@ -261,6 +276,7 @@ class Preprocessor(OxyNodeVisitor):
 
             if collection_assignment:
                 col = self.search_scopes(node.left.collection.value)
+                node.left.resolved = col.item_types
                 if col.type.name == TUPLE:
                     error('file={} line={}: Cannot change the elements of a tuple: {}'.format(
                         self.file_name, node.line_num, var_name))
@@ -349,7 +365,7 @@ class Preprocessor(OxyNodeVisitor):
                     self.file_name, node.line_num, node.op, left, right))
 
     def visit_unaryop(self, node):
-        return self.visit(node.parse_any_expr)
+        return self.visit(node.expr)
 
     def visit_range(self, node):
         left = self.visit(node.left)
@@ -417,7 +433,7 @@ class Preprocessor(OxyNodeVisitor):
 
         func_symbol = OxyFuncSymbol(func_name, func_type, node.parameters, None)
         self.define(func_name, func_symbol, 1)
-        self.drop_top_scope()
+        super().drop_top_scope()  # extern parameters have no body to be used in
 
     def visit_funcdecl(self, node):
         func_name = node.name
@@ -532,7 +548,7 @@ class Preprocessor(OxyNodeVisitor):
     def visit_methodcall(self, node):
         # TODO: hardcoded error for tuple methods, thing of a better way to do it
         if isinstance(self.search_scopes(node.obj), OxyCollectionSymbol) and self.search_scopes(node.obj).type.name == TUPLE:
-            if node.name in ('set', 'append'):
+            if node.name not in TUPLE_METHODS:
                 error('file={} line={}: Immutable Error: cannot use `{}` method'.format(
                     self.file_name, node.line_num, node.name))
 
@@ -540,7 +556,7 @@ class Preprocessor(OxyNodeVisitor):
         sym = OxyStructSymbol(node.name, node.fields)
         self.define(sym.name, sym)
 
-    def visit_enumdecl(self, node):
+    def visit_enumdeclaration(self, node):
         sym = OxyEnumSymbol(node.name, node.fields)
         self.define(sym.name, sym)
 
@@ -624,7 +640,7 @@ class Preprocessor(OxyNodeVisitor):
         collection = self.search_scopes(node.collection.value)
         collection.accessed = True
         if isinstance(node.key, OxyVar):
-            key = self.infer_type(node.key.value)
+            key = self.infer_type(self.visit(node.key))
         else:
             key = self.visit(node.key)
         if collection.type is self.search_scopes(LIST) or collection.type is self.search_scopes(TUPLE) or collection.type is self.search_scopes(SET):
@@ -1,7 +1,7 @@
 from decimal import Decimal
 from enum import Enum
 
-from oxygen.oxyast import OxyType
+from oxygen.oxyast import *
 from oxygen.compiler.base import *
 
 
@@ -146,9 +146,105 @@ class OxyBuiltinFuncSymbol(Symbol):
     __repr__ = __str__
 
 
+# Every name maps to a shadow stack of (depth, value) pairs, innermost last. Each
+# scope dict doubles as the undo log for its depth, so a lookup is one dict access
+# and dropping a scope only touches the names it defined.
+class SymbolTable(object):
+    def __init__(self):
+        self.scopes = [{}]
+        self.shadows = {}
+
+    def __len__(self):
+        return len(self.scopes)
+
+    def lookup(self, name):
+        stack = self.shadows.get(name)
+        return stack[-1][1] if stack else None
+
+    def lookup_at(self, name, depth):
+        return self.scopes[depth].get(name)
+
+    def define(self, name, value, level=0):
+        depth = len(self.scopes) - level - 1
+        self.scopes[depth][name] = value
+        stack = self.shadows.setdefault(name, [])
+        index = len(stack)
+        while index and stack[index - 1][0] > depth:
+            index -= 1
+        if index and stack[index - 1][0] == depth:
+            stack[index - 1] = (depth, value)
+        else:
+            stack.insert(index, (depth, value))
+
+    def push(self):
+        self.scopes.append({})
+
+    def pop(self):
+        shadows = self.shadows
+        for name in self.scopes.pop():
+            stack = shadows[name]
+            stack.pop()
+            if not stack:
+                del shadows[name]
+
+
+NODE_VISITORS = {
+    OxyProgram: 'visit_program',
+    OxyCompound: 'visit_compound',
+    OxyVarDecl: 'visit_vardecl',
+    OxyVar: 'visit_var',
+    OxyFuncDecl: 'visit_funcdecl',
+    OxyExternFuncDecl: 'visit_externfuncdecl',
+    OxyAnonymousFunc: 'visit_anonymousfunc',
+    OxyFuncCall: 'visit_funccall',
+    OxyMethodCall: 'visit_methodcall',
+    OxyReturn: 'visit_return',
+    OxyEnumDecl: 'visit_enumdeclaration',
+    OxyStructDecl: 'visit_structdeclaration',
+    OxyClassDecl: 'visit_classdeclaration',
+    OxyAssign: 'visit_assign',
+    OxyOpAssign: 'visit_opassign',
+    OxyIncrementAssign: 'visit_incrementassign',
+    OxyIfExpr: 'visit_if',
+    OxyElseExpr: 'visit_else',
+    OxyWhileExpr: 'visit_while',
+    OxyForExpr: 'visit_for',
+    OxyLoopBlock: 'visit_loopblock',
+    OxySwitchStmt: 'visit_switch',
+    OxyCaseStmt: 'visit_case',
+    OxyBreakStmt: 'visit_break',
+    OxyFTStmt: 'visit_fallthrough',
+    OxyContinueStmt: 'visit_continue',
+    OxyPass: 'visit_pass',
+    OxyDeferStmt: 'visit_defer',
+    OxyBinOp: 'visit_binop',
+    OxyUnaryOp: 'visit_unaryop',
+    OxyRange: 'visit_range',
+    OxyCollectionAccess: 'visit_collectionaccess',
+    OxyDotAccess: 'visit_dotaccess',
+    OxyType: 'visit_type',
+    OxyTypeDecl: 'visit_typedeclaration',
+    OxyVoid: 'visit_void',
+    OxyConstant: 'visit_constant',
+    OxyNum: 'visit_num',
+    OxyStr: 'visit_str',
+    OxyCollection: 'visit_collection',
+    OxyHashMap: 'visit_hashmap',
+    OxyPrintStmt: 'visit_print',
+    OxyInputStmt: 'visit_input',
+}
+
+
 class OxyNodeVisitor(object):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        missing = [method_name for method_name in NODE_VISITORS.values() if not hasattr(cls, method_name)]
+        if missing:
+            raise Exception('{} is missing {}'.format(cls.__name__, ', '.join(missing)))
+        cls._visitors = {node_type: getattr(cls, method_name) for node_type, method_name in NODE_VISITORS.items()}
+
     def __init__(self):
-        self._scope = [{}]
+        self.symbol_table = SymbolTable()
         self._init_builtins()
 
     def _init_builtins(self):
@@ -179,60 +275,40 @@ class OxyNodeVisitor(object):
         self.define(OBJECT, CLASS_BUILTIN)
 
     def visit(self, node):
-        method_name = 'visit_' + type(node).__name__.lower()
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        visitor = self._visitors.get(type(node))
+        if visitor is None:
+            return self.generic_visit(node)
+        return visitor(self, node)
 
     @staticmethod
     def generic_visit(node):
-        raise Exception('No visit_{} method'.format(type(node).__name__.lower()))
+        raise Exception('No visit method for {}'.format(type(node).__name__))
 
     @property
     def top_scope(self):
-        return self._scope[-1] if len(self._scope) >= 1 else None
+        scopes = self.symbol_table.scopes
+        return scopes[-1] if len(scopes) >= 1 else None
 
     @property
     def second_scope(self):
-        return self._scope[-2] if len(self._scope) >= 2 else None
+        scopes = self.symbol_table.scopes
+        return scopes[-2] if len(scopes) >= 2 else None
 
     def search_scopes(self, name, level=None):
         if name in (None, []):
             return None
         if level:
-            if name in self._scope[level]:
-                return self._scope[level][name]
-        else:
-            for scope in reversed(self._scope):
-                if name in scope:
-                    return scope[name]
+            return self.symbol_table.lookup_at(name, level)
+        return self.symbol_table.lookup(name)
 
     def define(self, key, value, level=0):
-        level = (len(self._scope) - level) - 1
-        self._scope[level][key] = value
+        self.symbol_table.define(key, value, level)
 
     def new_scope(self):
-        self._scope.append({})
+        self.symbol_table.push()
 
     def drop_top_scope(self):
-        self._scope.pop()
-
-    @property
-    def symbols(self):
-        return [value for scope in self._scope for value in scope.values()]
-
-    @property
-    def keys(self):
-        return [key for scope in self._scope for key in scope.keys()]
-
-    @property
-    def items(self):
-        return [(key, value) for scope in self._scope for key, value in scope.items()]
-
-    @property
-    def unvisited_symbols(self):
-        return [sym_name for sym_name, sym_val in self.items if
-                not isinstance(sym_val, (LLVMTypeSymbol, OxyBuiltinFuncSymbol)) and not
-                sym_val.accessed and sym_name != '_']
+        self.symbol_table.pop()
 
     def infer_type(self, value):
         if isinstance(value, LLVMTypeSymbol):
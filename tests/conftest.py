@@ -0,0 +1,92 @@
+import os
+import re
+import subprocess
+import sys
+from collections import OrderedDict
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+LABEL = re.compile(r'^"?([\w.]+)"?:$')
+
+# The lexer and parser keep no global state, so their tests import them directly
+sys.path.insert(0, SRC)
+
+# Runs a program with realloc swapped for a wrapper that reports each requested size on stderr
+COUNT_REALLOCS = '''
+import ctypes, sys
+import llvmlite.binding as llvm
+import oxygenc
+
+libc = ctypes.CDLL(None)
+libc.realloc.restype = ctypes.c_void_p
+libc.realloc.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+
+@ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t)
+def realloc(pointer, size):
+    sys.stderr.write('realloc {}\\n'.format(size))
+    return libc.realloc(pointer, size)
+
+llvm.add_symbol('realloc', ctypes.cast(realloc, ctypes.c_void_p).value)
+oxygenc.process_file(sys.argv[1]).evaluate(True, False, False)
+'''
+
+
+def oxygen_process(args, source, tmp_path, **kwargs):
+    # Every program is compiled in a fresh interpreter since the compiler keeps module-level state
+    oxy_file = tmp_path / 'program.oxy'
+    oxy_file.write_text(source)
+    return subprocess.run([sys.executable] + args + [str(oxy_file)], cwd=SRC, capture_output=True,
+                          text=True, timeout=120, **kwargs)
+
+
+@pytest.fixture
+def run_program(tmp_path):
+    def run(source, **kwargs):
+        return oxygen_process(['oxygenc.py', 'run'], source, tmp_path, **kwargs)
+    return run
+
+
+@pytest.fixture
+def realloc_sizes(tmp_path):
+    # Runs a program and returns its stdout and the byte count of every realloc it made, in order
+    def sizes(source):
+        result = oxygen_process(['-c', COUNT_REALLOCS], source, tmp_path)
+        assert result.returncode == 0, result.stdout + result.stderr
+        return result.stdout, [int(line.split()[1]) for line in result.stderr.splitlines() if line.startswith('realloc ')]
+    return sizes
+
+
+@pytest.fixture
+def start_program(tmp_path):
+    # Runs a program with piped stdin and unbuffered pipes, for tests that interleave input and output
+    def start(source):
+        oxy_file = tmp_path / 'program.oxy'
+        oxy_file.write_text(source)
+        return subprocess.Popen([sys.executable, 'oxygenc.py', 'run', str(oxy_file)], cwd=SRC, stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+    return start
+
+
+@pytest.fixture
+def function_blocks(tmp_path):
+    # Unoptimized IR of one function, as its instruction lines grouped by block label
+    def blocks(source, name='main'):
+        result = oxygen_process(['-c', 'import sys, oxygenc; print(oxygenc.process_file(sys.argv[1]).module)'],
+                                source, tmp_path)
+        assert result.returncode == 0, result.stdout + result.stderr
+        lines = result.stdout.splitlines()
+        start = next(i for i, line in enumerate(lines) if line.startswith('define') and '@"{}"('.format(name) in line)
+        function = OrderedDict()
+        label = None
+        for line in lines[start + 1:]:
+            if line == '}':
+                break
+            match = LABEL.match(line)
+            if match:
+                label = match.group(1)
+                function[label] = []
+            elif label is not None and line.strip():
+                function[label].append(line.strip())
+        return function
+    return blocks
@@ -0,0 +1,15 @@
+def test_index_after_range_loop_is_checked(run_program):
+    result = run_program('a = [1, 2, 3]\nfor i in 0..3\n    print(a[i])\ni = 100000\nprint(a[i])\n')
+    assert result.returncode == 1
+    assert result.stdout.split('\n')[:4] == ['1', '2', '3', 'Array index out of bounds']
+
+
+def test_index_after_empty_range_loop_is_checked(run_program):
+    result = run_program('a = [1, 2, 3]\nfor i in 9..3\n    print(a[i])\nprint(a[i])\n')
+    assert result.returncode == 1
+    assert result.stdout.strip() == 'Array index out of bounds'
+
+
+def test_range_loop_body_index_has_no_check(function_blocks):
+    blocks = function_blocks('a = [1, 2, 3]\nfor i in 0..3\n    print(a[i])\n')
+    assert 'index_out_of_bounds' not in blocks
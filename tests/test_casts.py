@@ -0,0 +1,20 @@
+def output_lines(result):
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout.split()
+
+
+def test_unsigned_cast_leaves_signed_values_alone(run_program):
+    result = run_program('a = 5 as u64\nprint(a)\nc = 0 - 3\nprint(c < 1)\nprint(c)\n')
+    assert output_lines(result) == ['5', 'true', '-3']
+
+
+def test_narrowing_to_unsigned_keeps_the_sign(run_program):
+    result = run_program('b = (200 as u8) as str\nprint(b)\nd = (250 as u8) as u32\nprint(d)\n'
+                         'x = 200.5\ny = x as u8\nz = y as int\nprint(z)\n')
+    assert output_lines(result) == ['200', '250', '200']
+
+
+def test_same_width_casts_reinterpret_the_bits(run_program):
+    result = run_program('e = (0 - 1) as u64\nprint(e)\nf = e as i64\nprint(f)\n'
+                         'w = (0 - 56) as i8\nv = w as u8\nu = v as int\nprint(u)\n')
+    assert output_lines(result) == ['18446744073709551615', '-1', '200']
@@ -0,0 +1,30 @@
+CONVERSIONS = ('zext', 'sext', 'trunc', 'uitofp', 'sitofp', 'fptoui', 'fptosi')
+
+
+def condition_block(function_blocks, source):
+    blocks = function_blocks(source)
+    return next(instructions for label, instructions in blocks.items() if label.startswith('while.cond'))
+
+
+def assert_single_compare_feeds_branch(instructions, opcode):
+    compares = [line for line in instructions if ' = {} '.format(opcode) in line]
+    assert len(compares) == 1, instructions
+    result = compares[0].split(' = ')[0]
+    assert instructions[-1].startswith('br i1 {},'.format(result)), instructions
+    assert not [line for line in instructions if any(' = {} '.format(op) in line for op in CONVERSIONS)], instructions
+
+
+def test_int_while_condition_is_one_icmp_feeding_br(function_blocks):
+    instructions = condition_block(function_blocks, 'n = 10\ni = 0\nwhile i < n\n    i += 1\nprint(i)\n')
+    assert_single_compare_feeds_branch(instructions, 'icmp')
+
+
+def test_float_while_condition_is_one_fcmp_feeding_br(function_blocks):
+    instructions = condition_block(function_blocks, 'f = 0.0\nwhile f < 2.5\n    f += 1.0\nprint(f)\n')
+    assert_single_compare_feeds_branch(instructions, 'fcmp')
+
+
+def test_comparison_results_widen_to_one(run_program):
+    result = run_program('x = (3 < 4) as int\nprint(x)\nb = 2.0 < 4.0\ny = b as int\nprint(y)\nz = (1 < 2) as float\nprint(z)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.split() == ['1', '1', '1']
@@ -0,0 +1,57 @@
+# Elements live one slot past their index, so an array with room for n elements holds n + 1 slots
+
+
+def test_declared_list_is_bound_to_its_array(run_program):
+    result = run_program('a: list<int>\na.append(4)\na.append(5)\nprint(a[0])\nprint(a[1])\nn: int = a.length()\nprint(n)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.split() == ['4', '5', '2']
+
+
+def test_list_literals_are_allocated_exactly_once(realloc_sizes):
+    stdout, sizes = realloc_sizes('a = [1, 2, 3]\nprint(a[2])\nx = 7 as i8\nb = [x, x]\nc = b[1] as int\nprint(c)\n'
+                                  'p = 5 as i128\nd = [p, p, p, p]\ne = d[3] as int\nprint(e)\n')
+    assert stdout.split() == ['3', '7', '5']
+    assert sizes == [4 * 8, 3 * 1, 5 * 16]
+
+
+def test_growth_is_sized_by_element_type(realloc_sizes):
+    source = 'a: list<{0}>\nfor i in 0..20\n    a.append(i as {0})\nlast = a[19] as int\nprint(last)\n'
+    for element_type, size in (('int', 8), ('i8', 1), ('i128', 16)):
+        stdout, sizes = realloc_sizes(source.format(element_type))
+        assert stdout.split() == ['19']
+        assert sizes == [17 * size, 33 * size]
+
+
+def test_appends_fill_the_last_slot_before_growing(run_program):
+    result = run_program('a: list<i8>\nfor i in 0..16\n    a.append(i as i8)\ntotal = 0\nfor i in 0..16\n'
+                         '    total += a[i] as int\nprint(total)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.split() == [str(sum(range(16)))]
+
+
+def test_reserve_allocates_once_up_front(realloc_sizes):
+    stdout, sizes = realloc_sizes('a: list<int>\na.reserve(100)\nfor i in 0..100\n    a.append(i)\nprint(a[99])\n'
+                                  'b: list<int>\nb.reserve(10)\nb.append(1)\nprint(b[0])\n')
+    assert stdout.split() == ['99', '1']
+    assert sizes == [17 * 8, 101 * 8, 17 * 8]
+
+
+def test_reserve_grows_geometrically(realloc_sizes):
+    stdout, sizes = realloc_sizes('a: list<int>\nfor i in 0..16\n    a.append(i)\na.reserve(1)\nprint(a[15])\n')
+    assert stdout.split() == ['15']
+    assert sizes == [17 * 8, 33 * 8]
+
+
+def test_shrink_to_fit_trims_to_the_length(realloc_sizes):
+    stdout, sizes = realloc_sizes('a: list<int>\nfor i in 0..20\n    a.append(i)\na.shrink_to_fit()\nprint(a[19])\n'
+                                  'a.append(20)\nprint(a[20])\nn: int = a.length()\nprint(n)\n')
+    assert stdout.split() == ['19', '20', '21']
+    assert sizes == [17 * 8, 33 * 8, 21 * 8, 41 * 8]
+
+
+def test_append_after_shrinking_an_empty_list(realloc_sizes):
+    for element_type, size in (('int', 8), ('i8', 1), ('i128', 16)):
+        stdout, sizes = realloc_sizes('a: list<{0}>\na.shrink_to_fit()\na.append(5 as {0})\nb = a[0] as int\nprint(b)\n'
+                                      .format(element_type))
+        assert stdout.split() == ['5']
+        assert sizes == [17 * size, 1 * size, 17 * size]
@@ -0,0 +1,5 @@
+def test_loop_over_literal_of_parameters_and_constants(run_program):
+    result = run_program('fun f(a: int, b: int) -> int\n    total = 0\n    values = [a, b, 3]\n'
+                         '    for value in values\n        total += value\n    return total\n\nprint(f(1, 2))\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.split() == ['6']
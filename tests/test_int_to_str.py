@@ -0,0 +1,34 @@
+def converted(run_program, source):
+    result = run_program(source)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout.split('\n')[:-1]
+
+
+def test_zero_and_small_values(run_program):
+    source = ''.join('s{0} = {0} as str\nprint(s{0})\n'.format(value) for value in (0, 7, 10, 99, 100, 101, 1000))
+    assert converted(run_program, source) == ['0', '7', '10', '99', '100', '101', '1000']
+
+
+def test_negative_values(run_program):
+    source = 'a = (0 - 7) as str\nprint(a)\nb = (0 - 100) as str\nprint(b)\n' \
+             'c = (0 - 9223372036854775807 - 1) as str\nprint(c)\nd = (0 - 128) as i8\ne = d as str\nprint(e)\n'
+    assert converted(run_program, source) == ['-7', '-100', '-9223372036854775808', '-128']
+
+
+def test_unsigned_maxima(run_program):
+    source = 'u = (0 - 1) as u64\na = u as str\nprint(a)\nw = (0 - 1) as u128\nb = w as str\nprint(b)\n' \
+             'v = (0 - 1) as u8\nc = v as str\nprint(c)\n'
+    assert converted(run_program, source) == [str(2 ** 64 - 1), str(2 ** 128 - 1), '255']
+
+
+def test_zero_digits_inside_values(run_program):
+    source = 'a = 1000000000000000005 as str\nprint(a)\nbig = 10000000000 as i128\nk = big * big + (5 as i128)\n' \
+             'b = k as str\nprint(b)\nn = (0 - 1) as i128\nc = (k * n) as str\nprint(c)\n' \
+             'm = k * (1000000000 as i128) + (7 as i128)\nd = m as str\nprint(d)\n'
+    assert converted(run_program, source) == [
+        '1000000000000000005', str(10 ** 20 + 5), str(-(10 ** 20 + 5)), str((10 ** 20 + 5) * 10 ** 9 + 7)]
+
+
+def test_converted_values_concatenate(run_program):
+    source = 'x = 0 - 42\ns = "x=" + (x as str) + ";"\nprint(s)\n'
+    assert converted(run_program, source) == ['x=-42;']
@@ -0,0 +1,33 @@
+from oxygen.lexer import Lexer
+from oxygen.parser import Parser
+
+# Lookahead for multi-word operators and keywords ("not" before a name, "else" before a newline),
+# nested calls and tuples, where the parser used to re-lex ahead of itself
+SOURCE = '''
+fun f(a: int, b: int) -> int
+    return a + b
+
+x = (f(1, 2) + (3), 4)
+y = (1 + (2 * (3 + f(4, (5)))))
+t = true
+if not t
+    print(1)
+else
+    print(y)
+'''
+
+
+def test_parser_lexes_every_token_once(monkeypatch):
+    tokens = sum(1 for _ in Lexer(SOURCE, 'program.oxy').analyse_tokens())
+    invocations = 0
+    get_next_token = Lexer.get_next_token
+
+    def counted(self):
+        nonlocal invocations
+        if not self.pending:
+            invocations += 1
+        return get_next_token(self)
+
+    monkeypatch.setattr(Lexer, 'get_next_token', counted)
+    Parser(Lexer(SOURCE, 'program.oxy')).parse()
+    assert invocations == tokens
@@ -0,0 +1,111 @@
+import random
+
+from oxygen.compiler.builtins import RADIX_SORT_THRESHOLD
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def output(run_program, source):
+    result = run_program(source)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout.split()
+
+
+def literal(value):
+    # The language has no unary minus, and a parenthesized argument would be read as a tuple
+    return '0 - {} - 1'.format(-value - 1) if value < 0 else str(value)
+
+
+def sorted_output(run_program, element_type, appends, show='a[i]'):
+    lines = ['a: list<{}>'.format(element_type)] + appends
+    lines += ['a.sort()', 'for i in 0..{}'.format(len(appends)), '    v = {}'.format(show), '    print(v)']
+    return output(run_program, '\n'.join(lines) + '\n')
+
+
+def test_pop_from_an_empty_list(run_program):
+    result = run_program('a = [1]\nb: int = a.pop()\nprint(b)\nc: int = a.pop()\nprint(c)\n')
+    assert result.returncode == 1
+    assert result.stdout.split('\n')[:2] == ['1', 'Array index out of bounds']
+
+
+def test_pop_out_of_range(run_program):
+    for index in ('2', '0 - 3'):
+        result = run_program('a = [1, 2]\nc: int = a.pop({})\nprint(c)\n'.format(index))
+        assert result.returncode == 1
+        assert result.stdout.strip() == 'Array index out of bounds'
+
+
+def test_pop_and_insert_positions(run_program):
+    source = 'a = [1, 2, 3, 4]\na.insert(100, 9)\na.insert(0 - 100, 7)\na.insert(0 - 1, 8)\na.insert(2, 5)\n' \
+             'for v in a\n    print(v)\nx: int = a.pop(0 - 2)\nprint(x)\ny: int = a.pop()\nprint(y)\n' \
+             'z: int = a.pop(0)\nprint(z)\nfor v in a\n    print(v)\n'
+    values = [1, 2, 3, 4]
+    for index, value in ((100, 9), (-100, 7), (-1, 8), (2, 5)):
+        values.insert(index, value)
+    popped = [values.pop(-2), values.pop(), values.pop(0)]
+    assert output(run_program, source) == [str(v) for v in [7, 1, 5, 2, 3, 4, 8, 9] + popped + values]
+
+
+def test_extend_with_itself(run_program):
+    source = 'a = [1, 2, 3]\na.extend(a)\na.extend(a)\nfor v in a\n    print(v)\nn: int = a.length()\nprint(n)\n'
+    assert output(run_program, source) == [str(v) for v in [1, 2, 3] * 4] + ['12']
+
+
+def test_index_count_and_remove(run_program):
+    source = 'a = [4, 2, 7, 2]\ni: int = a.index(2)\nprint(i)\nc: int = a.count(2)\nprint(c)\na.remove(2)\n' \
+             'for v in a\n    print(v)\n'
+    assert output(run_program, source) == ['1', '2', '4', '7', '2']
+
+
+def test_index_of_a_missing_value(run_program):
+    result = run_program('a = [1, 2]\nprint(0)\nc: int = a.index(3)\nprint(c)\n')
+    assert result.returncode == 1
+    assert result.stdout.split('\n')[:2] == ['0', 'Array value not found']
+
+
+def test_remove_of_a_missing_value(run_program):
+    result = run_program('a = [1, 2]\na.remove(3)\nprint(1)\n')
+    assert result.returncode == 1
+    assert result.stdout.strip() == 'Array value not found'
+
+
+def test_int_sorts_around_the_radix_threshold(run_program):
+    rng = random.Random(20)
+    for size in (RADIX_SORT_THRESHOLD - 1, RADIX_SORT_THRESHOLD, RADIX_SORT_THRESHOLD + 1, 4 * RADIX_SORT_THRESHOLD):
+        values = [rng.randint(-10 ** 12, 10 ** 12) for _ in range(size - 4)] + [INT64_MIN, INT64_MAX, -1, 0]
+        rng.shuffle(values)
+        appends = ['a.append({})'.format(literal(v)) for v in values]
+        assert sorted_output(run_program, 'int', appends) == [str(v) for v in sorted(values)]
+
+
+def test_int_sorts_of_repeated_and_ordered_values(run_program):
+    size = 2 * RADIX_SORT_THRESHOLD
+    for values in ([5] * size, list(range(size)), list(range(size, 0, -1)), [v % 3 - 1 for v in range(size)]):
+        appends = ['a.append({})'.format(literal(v)) for v in values]
+        assert sorted_output(run_program, 'int', appends) == [str(v) for v in sorted(values)]
+
+
+def test_i8_sorts(run_program):
+    rng = random.Random(8)
+    for size in (10, 3 * RADIX_SORT_THRESHOLD):
+        values = [rng.randint(-128, 127) for _ in range(size - 2)] + [-128, 127]
+        rng.shuffle(values)
+        appends = ['x = {}\na.append(x as i8)'.format(literal(v)) for v in values]
+        assert sorted_output(run_program, 'i8', appends, 'a[i] as int') == [str(v) for v in sorted(values)]
+
+
+def test_float_sorts(run_program):
+    rng = random.Random(64)
+    for size in (10, 3 * RADIX_SORT_THRESHOLD):
+        values = [rng.randint(-4000, 4000) / 8 for _ in range(size)]
+        appends = ['a.append({}{:.3f})'.format('0.0 - ' if v < 0 else '', abs(v)) for v in values]
+        assert sorted_output(run_program, 'float', appends) == ['{:g}'.format(v) for v in sorted(values)]
+
+
+def test_str_sorts(run_program):
+    rng = random.Random(3)
+    words = ['b', 'a', 'ab', 'abc', 'ba', 'z', 'zz', 'm', 'mm', 'abd', 'Z', '0']
+    values = [rng.choice(words) + rng.choice(words) for _ in range(3 * RADIX_SORT_THRESHOLD)]
+    appends = ['a.append("{}")'.format(v) for v in values]
+    assert sorted_output(run_program, 'str', appends) == sorted(values)
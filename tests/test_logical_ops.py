@@ -0,0 +1,50 @@
+CALLS = '''
+fun f(x: int) -> bool
+    print(x)
+    return false
+
+fun g(x: int) -> bool
+    print(x)
+    return true
+
+'''
+
+
+def output_lines(result):
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout.split()
+
+
+def test_and_skips_right_operand_when_left_is_false(run_program):
+    result = run_program(CALLS + 'if f(1) and g(2)\n    print(3)\nprint(4)\n')
+    assert output_lines(result) == ['1', '4']
+
+
+def test_or_skips_right_operand_when_left_is_true(run_program):
+    result = run_program(CALLS + 'if g(1) or f(2)\n    print(3)\nprint(4)\n')
+    assert output_lines(result) == ['1', '3', '4']
+
+
+def test_right_operand_runs_when_left_does_not_decide(run_program):
+    result = run_program(CALLS + 'if g(1) and f(2)\n    print(3)\nif f(4) or g(5)\n    print(6)\n')
+    assert output_lines(result) == ['1', '2', '4', '5', '6']
+
+
+def test_guard_skips_out_of_bounds_access(run_program):
+    result = run_program('a = [1, 2, 3]\nn = 3\ni = 3\nif i < n and a[i] > 0\n    print(1)\nelse\n    print(2)\n')
+    assert output_lines(result) == ['2']
+
+
+def test_and_binds_tighter_than_or(run_program):
+    result = run_program(CALLS + 't = true\nfl = false\nif fl or fl and g(1)\n    print(2)\nif t or fl and g(3)\n    print(4)\n')
+    assert output_lines(result) == ['4']
+
+
+def test_comparisons_bind_tighter_than_and(run_program):
+    result = run_program('x = 1 + 2 < 4 and 3 > 2\nprint(x)\ny = 5 < 3 or 2 * 3 == 6\nprint(y)\n')
+    assert output_lines(result) == ['true', 'true']
+
+
+def test_not_applies_to_one_comparison(run_program):
+    result = run_program('t = true\nfl = false\nx = not fl and t\nprint(x)\ny = not 1 < 2 or 2 > 1\nprint(y)\n')
+    assert output_lines(result) == ['true', 'true']
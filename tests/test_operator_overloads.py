@@ -0,0 +1,34 @@
+def output(run_program, source):
+    result = run_program(source)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout.split()
+
+
+def test_binary_overloads_on_int_and_double(run_program):
+    source = 'fun operator % (a: int, b: int) -> int\n    return a * 100 + b\n\n' \
+             'fun operator + (a: double, b: double) -> double\n    return a * b\n\n' \
+             'x = 3 % 4\nprint(x)\ny = 1.5 + 4.0\nprint(y)\nk = 3.0\nq = k + y\nprint(q)\n' \
+             'a = 3 + 4\nprint(a)\nb = 7.5 % 2.0\nprint(b)\n'
+    assert output(run_program, source) == ['304', '6', '18', '7', '1.5']
+
+
+def test_binary_overload_on_str(run_program):
+    source = 'fun operator * (a: str, b: str) -> str\n    return b + a + b\n\n' \
+             's = "ab" * "cd"\nprint(s)\nt = "x" + s\nprint(t)\n'
+    assert output(run_program, source) == ['cdabcd', 'xcdabcd']
+
+
+def test_unary_overloads_on_int_double_and_str(run_program):
+    source = 'fun operator - (a: int) -> int\n    return -a + 1\n\n' \
+             'fun operator - (a: double) -> double\n    return -a * 2.0\n\n' \
+             'fun operator - (a: str) -> str\n    return a + a\n\n' \
+             'n = 5\nz = -n\nprint(z)\nk = 3.0\nq = -k\nprint(q)\ns = "ab"\nt = -s\nprint(t)\n' \
+             'w = 7 - 2\nprint(w)\nr = 1.0 - k\nprint(r)\n'
+    assert output(run_program, source) == ['-4', '-6', 'abab', '5', '-2']
+
+
+def test_unary_overload_uses_the_builtin_operator_in_its_own_body(function_blocks):
+    source = 'fun operator - (a: int) -> int\n    return -a + 1\n\nn = 5\nz = -n\nprint(z)\n'
+    body = function_blocks(source, 'operator.-.i64')
+    assert not [line for lines in body.values() for line in lines if 'call ' in line]
+    assert [line for line in function_blocks(source)['entry'] if '@"operator.-.i64"(' in line]
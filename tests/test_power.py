@@ -0,0 +1,57 @@
+def output(run_program, source):
+    result = run_program(source)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout.split()
+
+
+def calls(blocks, name):
+    return [line for lines in blocks.values() for line in lines if ' @"{}"('.format(name) in line]
+
+
+def test_runtime_exponents(run_program):
+    source = 'for e in 0..12\n    p = 3 ^ e\n    print(p)\n    q = (0 - 2) ^ e\n    print(q)\n'
+    assert output(run_program, source) == [str(v) for e in range(12) for v in (3 ** e, (-2) ** e)]
+
+
+def test_negative_exponents(run_program):
+    source = 'for e in 0..6\n    n = e - 5\n    a = 2 ^ n\n    print(a)\n    b = 1 ^ n\n    print(b)\n' \
+             '    c = (0 - 1) ^ n\n    print(c)\n    d = 0 ^ n\n    print(d)\n' \
+             'm = 0 - 9223372036854775807 - 1\nf = (0 - 1) ^ m\nprint(f)\ng = (0 - 3) ^ m\nprint(g)\n'
+    expected = []
+    for n in range(-5, 1):
+        expected += [2 ** n if n >= 0 else 0, 1, (-1) ** abs(n), 0 ** n if n >= 0 else 0]
+    assert output(run_program, source) == [str(v) for v in expected + [1, 0]]
+
+
+def test_unsigned_powers_wrap(run_program):
+    source = 'b = 3 as u8\ne = 5 as u8\np = (b ^ e) as int\nprint(p)\n'
+    assert output(run_program, source) == [str(3 ** 5 % 256)]
+
+
+def test_power_assign_with_an_expression(run_program):
+    source = 'x = 2\nn = 3\nx ^= n + 2\nprint(x)\ny = 1.5\ny ^= n - 1\nprint(y)\nz = 10\nz ^= n - 4\nprint(z)\n'
+    assert output(run_program, source) == ['32', '2.25', '0']
+
+
+def test_large_constant_exponent_emits_a_fixed_loop(function_blocks, run_program):
+    source = 'x = 1\nn = 0 - 1\np = x ^ {}\nprint(p)\nq = n ^ {}\nprint(q)\n'
+    small = function_blocks(source.format(3, 5))
+    large = function_blocks(source.format(1000000, 1000001))
+    assert [len(lines) for lines in small.values()] == [len(lines) for lines in large.values()]
+    assert output(run_program, source.format(1000000, 1000001)) == ['1', '-1']
+
+
+def test_float_powers_use_powi_for_i32_exponents(function_blocks, run_program):
+    source = 'x = 1.5\nk = 2 as i32\na = x ^ k\nprint(a)\nb = x ^ 3\nprint(b)\nm = 0 - 2\nc = 2.0 ^ m\nprint(c)\n'
+    blocks = function_blocks(source)
+    assert len(calls(blocks, 'llvm.powi.f64')) == 2
+    assert len(calls(blocks, 'llvm.pow.f64')) == 1
+    assert output(run_program, source) == ['2.25', '3.375', '0.25']
+
+
+def test_float_powers_use_pow_for_other_exponents(function_blocks, run_program):
+    source = 'x = 4.0\na = x ^ 0.5\nprint(a)\nn = 3\nb = x ^ n\nprint(b)\nc = x ^ 4294967296\nd = c > 1.0\nprint(d)\n'
+    blocks = function_blocks(source)
+    assert not calls(blocks, 'llvm.powi.f64')
+    assert len(calls(blocks, 'llvm.pow.f64')) == 3
+    assert output(run_program, source) == ['2', '64', 'true']
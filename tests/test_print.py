@@ -0,0 +1,68 @@
+import os
+import select
+import time
+
+
+def test_print_128_bit_integers(run_program):
+    result = run_program('a = 9223372036854775807 as i128\nk = 1000 as i128\nb = a * k\nprint(b)\n'
+                         'c = (0 - 5) as i128\nd = c * a\nprint(d)\nprint(c)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.split() == [str(9223372036854775807 * 1000), str(-5 * 9223372036854775807), '-5']
+
+
+def read_until(process, text, timeout=60):
+    # Output the program has handed to the kernel so far, waiting until it contains text
+    output = b''
+    deadline = time.monotonic() + timeout
+    while text not in output:
+        ready, _, _ = select.select([process.stdout], [], [], max(0, deadline - time.monotonic()))
+        if not ready:
+            break
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            break
+        output += chunk
+    return output
+
+
+def test_output_is_flushed_before_input(start_program):
+    process = start_program('print(7)\nprint("ready")\nx: int = input("number?")\nprint(x)\n')
+    try:
+        assert read_until(process, b'number?') == b'7\nready\nnumber?\n'
+        stdout, stderr = process.communicate(b'21\n', timeout=60)
+    finally:
+        process.kill()
+    assert process.returncode == 0, stderr
+    assert stdout == b'21\n'
+
+
+def test_output_before_runtime_error_keeps_its_order(run_program):
+    result = run_program('print(1)\nprint("two")\nprint(2.5)\nprint(true)\na = [1]\ni = 5\nprint(a[i])\nprint(3)\n')
+    assert result.returncode == 1
+    assert result.stdout == '1\ntwo\n2.5\ntrue\nArray index out of bounds\n'
+
+
+def test_print_without_argument_writes_a_newline(run_program):
+    result = run_program('print(1)\nprint()\nprint(2)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout == '1\n\n2\n'
+
+
+def test_print_floats(run_program):
+    result = run_program('print(1.5)\nx: float = 2.25\nprint(x)\ny = 0.1 + 0.2\nprint(y)\nz = 0.0 - 1.0 / 3.0\nprint(z)\n'
+                         'big = 123456789.0\nprint(big)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout == '1.5\n2.25\n0.3\n-0.333333\n1.23457e+08\n'
+
+
+def test_print_bools(run_program):
+    result = run_program('print(true)\nprint(false)\nt = 3 < 4\nprint(t)\nprint(4 < 3)\nprint(not t)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout == 'true\nfalse\ntrue\nfalse\nfalse\n'
+
+
+def test_output_larger_than_the_buffer_keeps_its_order(run_program):
+    text = 'ab' * 40000
+    result = run_program('for i in 0..20000\n    print(i)\nprint("{}")\nprint(1)\n'.format(text))
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr
+    assert result.stdout.split('\n') == [str(i) for i in range(20000)] + [text, '1', '']
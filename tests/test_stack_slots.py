@@ -0,0 +1,52 @@
+import resource
+
+LOOP_LOCALS = '''
+fun total(n: int) -> int
+    s = 0
+    for i in 0..n
+        square = i * i
+        s += square
+    return s
+
+i = 0
+while i < 10
+    doubled = i * 2
+    label = "x"
+    p = doubled ^ 2
+    i += 1
+t = total(4)
+print(t)
+'''
+
+
+def stack_limit(size):
+    def set_limit():
+        resource.setrlimit(resource.RLIMIT_STACK, (size, size))
+    return set_limit
+
+
+def assert_allocas_only_in_entry(blocks):
+    labels = list(blocks)
+    assert labels[0] == 'entry'
+    misplaced = [(label, line) for label in labels[1:] for line in blocks[label] if ' = alloca ' in line]
+    assert not misplaced
+    assert any(' = alloca ' in line for line in blocks['entry'])
+
+
+def test_loop_body_allocas_are_in_main_entry_block(function_blocks):
+    assert_allocas_only_in_entry(function_blocks(LOOP_LOCALS))
+
+
+def test_loop_body_allocas_are_in_function_entry_block(function_blocks):
+    assert_allocas_only_in_entry(function_blocks(LOOP_LOCALS, 'total'))
+
+
+def test_long_print_loop_runs_in_constant_stack(run_program):
+    # One stack slot per iteration would need about 24MB here, three times the limit
+    iterations = 3000000
+    source = 'i = 0\nwhile i < {}\n    j = i + 1\n    print(i)\n    i = j\n'.format(iterations)
+    result = run_program(source, preexec_fn=stack_limit(8 * 1024 * 1024))
+    assert result.returncode == 0, result.stderr[-2000:]
+    lines = result.stdout.splitlines()
+    assert len(lines) == iterations
+    assert lines[-1] == str(iterations - 1)
@@ -0,0 +1,10 @@
+def test_rebound_constant_tuple_can_grow(run_program):
+    result = run_program('t = (1, 2, 3)\nu = t\nu.append(4)\nn: int = u.length()\nprint(n)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.split() == ['4']
+
+
+def test_confined_constant_tuple_reads_its_table(run_program):
+    result = run_program('t = (1, 2, 3)\nprint(t[2])\nfor x in t\n    print(x)\n')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.split() == ['3', '1', '2', '3']